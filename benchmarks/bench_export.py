@@ -0,0 +1,43 @@
+# benchmarks/bench_export.py
+"""
+Сравнение экспорта в Excel: openpyxl (get_export_data + write_output_excel_simple)
+против потоковой записи (export_project_xlsx).
+
+    python -m benchmarks.bench_export --rows 100000
+"""
+import argparse
+import os
+import tempfile
+
+from utils.excel_processor import export_project_xlsx, write_output_excel_simple
+from benchmarks.generator import make_project
+from benchmarks.run import measure
+
+
+def report(label, run, repeat):
+    elapsed, peak_mb = measure(run, repeat=repeat)
+    print(f"{label:<12} {elapsed:8.2f} с   пик памяти {peak_mb:8.1f} МБ")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=1, help="запусков на замер, берётся лучший")
+    parser.add_argument("--skip-openpyxl", action="store_true", help="не запускать старый путь")
+    args = parser.parse_args()
+
+    project = make_project(args.rows)
+    print(f"Договоров: {args.rows}")
+    with tempfile.TemporaryDirectory() as tmp:
+        stream_path = os.path.join(tmp, "stream.xlsx")
+        stream = report("stream", lambda: export_project_xlsx(project, stream_path), args.repeat)
+        if not args.skip_openpyxl:
+            legacy_path = os.path.join(tmp, "openpyxl.xlsx")
+            legacy = report("openpyxl", lambda: write_output_excel_simple(project.get_export_data(), legacy_path),
+                            args.repeat)
+            print(f"Ускорение: ×{legacy / stream:.1f}")
+
+
+if __name__ == "__main__":
+    main()
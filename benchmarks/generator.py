@@ -0,0 +1,70 @@
+# benchmarks/generator.py
+"""
+Детерминированный генератор синтетических данных для бенчмарков: проекты,
+папки проектов и входные реестры (Excel и CSV). Одинаковые (rows, seed) дают одинаковые данные.
+"""
+import csv
+import random
+from pathlib import Path
+
+from core.project_manager import VATProject
+from core.storage import ProjectStore
+from utils.xlsx_writer import XlsxStreamWriter
+
+INPUT_HEADERS = ["Название договора", "№ договора", "", "Сумма договора", "Факт на 31.12.2025"]
+
+# Договоров с одинаковым названием много — как в реальных реестрах
+NAME_VARIANTS = 5000
+
+
+def make_columns(rows, seed=42):
+    """Колонки договоров: (названия, номера, суммы, факт, отметки)."""
+    rnd = random.Random(seed)
+    totals = [round(rnd.uniform(1_000, 10_000_000), 2) for _ in range(rows)]
+    return (
+        [f"Договор поставки №{i % NAME_VARIANTS}" for i in range(rows)],
+        [f"{seed}-{i:07d}" for i in range(rows)],
+        totals,
+        [round(t * rnd.random(), 2) for t in totals],
+        [rnd.random() < 0.3 for _ in range(rows)],
+    )
+
+
+def make_project(rows, seed=42, name="bench"):
+    """Проект в памяти с rows договорами."""
+    project = VATProject(name)
+    project.contracts.extend_columns(*make_columns(rows, seed))
+    return project
+
+
+def write_project(project, project_dir):
+    """Записывает проект в папку project_dir напрямую, минуя настройки (папку проектов)."""
+    ProjectStore(project_dir).write_full(project.to_data())
+    return Path(project_dir) / "project.vat"
+
+
+def make_projects_dir(root, count, rows, seed=42):
+    """Папка с count проектами по rows договоров — как папка проектов приложения."""
+    root = Path(root)
+    for n in range(count):
+        write_project(make_project(rows, seed + n, f"Проект {n + 1}"), root / f"project_{n + 1:03d}")
+    return root
+
+
+def write_input_workbook(path, rows, seed=42):
+    """Входной реестр в формате импорта (5 колонок), записанный потоково."""
+    names, numbers, totals, remainings, _ = make_columns(rows, seed)
+    with XlsxStreamWriter(path) as writer:
+        writer.add_sheet("Реестр", INPUT_HEADERS, zip(names, numbers, [""] * rows, totals, remainings))
+    return Path(path)
+
+
+def write_input_csv(path, rows, seed=42):
+    """Тот же реестр в CSV, как его сохраняет русский Excel: «;» и дробная часть через запятую."""
+    names, numbers, totals, remainings, _ = make_columns(rows, seed)
+    money = lambda value: f"{value:.2f}".replace(".", ",")
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(INPUT_HEADERS)
+        writer.writerows(zip(names, numbers, [""] * rows, map(money, totals), map(money, remainings)))
+    return Path(path)
@@ -0,0 +1,249 @@
+# benchmarks/run.py
+"""
+Набор бенчмарков по этапам работы с проектом на синтетических данных.
+
+    python -m benchmarks.run                                  # 1k, 10k, 100k договоров
+    python -m benchmarks.run --sizes 1000,1000000 --stages load,save
+    python -m benchmarks.run --output new.json --baseline benchmarks/baseline.json --threshold 0.25
+
+Для каждого этапа и размера — лучшее время из --repeat запусков и пик памяти (tracemalloc,
+отдельным запуском). Результаты пишутся в JSON. С --baseline этапы сравниваются с прошлым
+результатом, и при замедлении (или росте памяти) больше порога код выхода — 1.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import core.config as config
+from core.contract_table import ContractTable
+from core.importer import import_files
+from core.project_index import INDEX_FILE_NAME
+from core.project_manager import VATProject
+from utils.csv_processor import write_project_csv
+from utils.excel_processor import (export_project_xlsx, read_input_excel,
+                                   write_output_excel_simple)
+from benchmarks.generator import make_project, make_projects_dir, write_input_csv, write_input_workbook
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "latest.json"
+
+# Разница меньше этих значений считается шумом, а не регрессией
+MIN_SECONDS_DELTA = 0.02
+MIN_MEMORY_DELTA_MB = 1.0
+
+# Сколько проектов лежит в папке для list_projects (договоры делятся между ними)
+LIST_PROJECTS_COUNT = 10
+
+
+def use_projects_dir(path):
+    """Перенаправляет папку проектов (настройки приложения) во временную папку."""
+    config._config_cache = dict(config._load_config(), projects_dir=str(path))
+
+
+class Stage:
+    """Этап: prepare готовит данные один раз, before() вызывается перед каждым запуском, run() замеряется."""
+
+    def __init__(self, name, prepare, default_max_rows=None):
+        self.name = name
+        self.prepare = prepare                    # (rows, tmp) -> (run, before)
+        self.default_max_rows = default_max_rows  # Выше — пропускается, если не задан --max-rows
+
+
+def _save(rows, tmp):
+    use_projects_dir(tmp / "save")
+    project = make_project(rows)
+
+    def before():
+        project._full_save_needed = True   # Каждый запуск — полная запись, как у нового проекта
+    return project.save, before
+
+
+def _load(rows, tmp):
+    use_projects_dir(tmp / "load")
+    project = make_project(rows)
+    project.save()
+    return lambda: VATProject.load(project.project_file), None
+
+
+def _list_projects(cold):
+    def prepare(rows, tmp):
+        root = make_projects_dir(tmp / ("cold" if cold else "warm"), LIST_PROJECTS_COUNT,
+                                 max(1, rows // LIST_PROJECTS_COUNT))
+        use_projects_dir(root)
+        index_file = root / INDEX_FILE_NAME
+        if cold:
+            return VATProject.list_projects, lambda: index_file.unlink(missing_ok=True)
+        VATProject.list_projects()   # Индекс построен — замеряется обычный запуск программы
+        return VATProject.list_projects, None
+    return prepare
+
+
+def _read_input_excel(rows, tmp):
+    path = write_input_workbook(tmp / "input.xlsx", rows)
+    return lambda: read_input_excel(path), None
+
+
+def _import_csv(rows, tmp):
+    path = write_input_csv(tmp / "input.csv", rows)
+    return lambda: import_files(ContractTable(), [path]), None
+
+
+def _get_export_data(rows, tmp):
+    project = make_project(rows)
+    return project.get_export_data, project.contracts._touch   # Без кеша расчётов
+
+
+def _write_output_excel_simple(rows, tmp):
+    data = make_project(rows).get_export_data()
+    return lambda: write_output_excel_simple(data, tmp / "simple.xlsx"), None
+
+
+def _export_project_xlsx(rows, tmp):
+    project = make_project(rows)
+    return lambda: export_project_xlsx(project, tmp / "stream.xlsx"), project.contracts._touch
+
+
+def _write_project_csv(rows, tmp):
+    project = make_project(rows)
+    return lambda: write_project_csv(project, tmp / "stream.csv"), project.contracts._touch
+
+
+STAGES = [
+    Stage("save", _save),
+    Stage("load", _load),
+    Stage("list_projects_cold", _list_projects(cold=True)),
+    Stage("list_projects_warm", _list_projects(cold=False)),
+    Stage("read_input_excel", _read_input_excel, default_max_rows=100_000),
+    Stage("import_csv", _import_csv),
+    Stage("get_export_data", _get_export_data),
+    # openpyxl держит всю книгу в памяти: 100k строк — минуты и сотни МБ
+    Stage("write_output_excel_simple", _write_output_excel_simple, default_max_rows=10_000),
+    Stage("export_project_xlsx", _export_project_xlsx),
+    Stage("write_project_csv", _write_project_csv),
+]
+
+
+def measure(run, before=None, repeat=3, memory=True):
+    """(лучшее время в секундах, пик памяти в МБ или None)."""
+    best = float("inf")
+    for _ in range(repeat):
+        if before:
+            before()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        if before:
+            before()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = peak / 2**20
+    return best, peak_mb
+
+
+def run_suite(sizes, stage_names=None, repeat=3, memory=True, max_rows=None):
+    results = []
+    for stage in STAGES:
+        if stage_names and stage.name not in stage_names:
+            continue
+        limit = max_rows if max_rows is not None else stage.default_max_rows
+        for rows in sizes:
+            if limit is not None and rows > limit:
+                print(f"{stage.name:<28} {rows:>9}   пропущено (больше {limit} строк, см. --max-rows)")
+                continue
+            with tempfile.TemporaryDirectory() as tmp:
+                run, before = stage.prepare(rows, Path(tmp))
+                seconds, peak_mb = measure(run, before, repeat, memory)
+            results.append({"stage": stage.name, "rows": rows, "seconds": round(seconds, 4),
+                            "peak_mb": None if peak_mb is None else round(peak_mb, 2)})
+            memory_text = "" if peak_mb is None else f"   пик памяти {peak_mb:9.1f} МБ"
+            print(f"{stage.name:<28} {rows:>9} {seconds:9.3f} с{memory_text}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Список регрессий относительно baseline: строки для вывода."""
+    previous = {(r["stage"], r["rows"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result["stage"], result["rows"]))
+        if old is None:
+            continue
+        label = f"{result['stage']} ({result['rows']})"
+        if (result["seconds"] > old["seconds"] * (1 + threshold)
+                and result["seconds"] - old["seconds"] > MIN_SECONDS_DELTA):
+            regressions.append(f"{label}: время {old['seconds']:.3f} → {result['seconds']:.3f} с")
+        if (result.get("peak_mb") is not None and old.get("peak_mb") is not None
+                and result["peak_mb"] > old["peak_mb"] * (1 + threshold)
+                and result["peak_mb"] - old["peak_mb"] > MIN_MEMORY_DELTA_MB):
+            regressions.append(f"{label}: память {old['peak_mb']:.1f} → {result['peak_mb']:.1f} МБ")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"числа договоров через запятую (по умолчанию {DEFAULT_SIZES})")
+    parser.add_argument("--stages", default="", help="этапы через запятую: " + ", ".join(s.name for s in STAGES))
+    parser.add_argument("--repeat", type=int, default=3, help="запусков на этап (берётся лучший)")
+    parser.add_argument("--no-memory", action="store_true", help="не замерять память")
+    parser.add_argument("--max-rows", type=int, default=None, help="снять ограничение размера для медленных этапов")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="файл результатов JSON")
+    parser.add_argument("--baseline", help="JSON прошлого запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимое замедление (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s.replace("_", "")) for s in args.sizes.split(",") if s.strip()]
+    stage_names = {s.strip() for s in args.stages.split(",") if s.strip()}
+    unknown = stage_names - {s.name for s in STAGES}
+    if unknown:
+        parser.error(f"неизвестные этапы: {', '.join(sorted(unknown))}")
+
+    baseline = None
+    if args.baseline:   # Читаем до записи результатов: --output может указывать на тот же файл
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run_suite(sizes, stage_names, max(1, args.repeat), not args.no_memory, args.max_rows)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": RESULTS_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }, f, ensure_ascii=False, indent=1)
+    print(f"Результаты: {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Регрессии (порог +{args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"Регрессий нет (порог +{args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# core/batch.py
+"""
+Пакетный расчёт без GUI:
+
+    python main.py batch ПАПКА_ИЛИ_ФАЙЛЫ... --output ПАПКА [--workers N] [--summary-only]
+
+Входные данные — Excel-реестры (5 колонок, как при импорте) и сохранённые проекты
+(project.vat). Каждый файл обрабатывается в отдельном процессе; для каждого пишется
+экспорт в .xlsx, а общий итог — в summary.csv. tkinter не импортируется.
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+SUMMARY_FILE = "summary.csv"
+SUMMARY_HEADERS = ["Источник", "Проект", "Договоров", "Отмечено", "Доп. НДС",
+                   "Доп. НДС (отмеченные)", "Новая стоимость", "Ошибок в строках", "Ошибка"]
+SUMMARY_MONEY = {"Доп. НДС", "Доп. НДС (отмеченные)", "Новая стоимость"}
+
+
+def collect_inputs(paths):
+    """Раскрывает папки в список файлов: *.xlsx и */project.vat (рекурсивно)."""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.extend(sorted(p for p in path.rglob("*.xlsx") if not p.name.startswith("~$")))
+            found.extend(sorted(path.rglob("project.vat")))
+        elif path.is_file():
+            found.append(path)
+        else:
+            print(f"[batch] Не найдено: {path}", file=sys.stderr)
+    return found
+
+
+def load_source(path: Path):
+    """Загружает проект из project.vat или Excel-реестра. Возвращает (проект, число ошибочных строк)."""
+    from core.project_manager import VATProject
+
+    if path.suffix.lower() == ".vat":
+        return VATProject.load(path), 0
+
+    from core.importer import import_rows
+    from utils.excel_processor import iter_input_rows
+    project = VATProject(path.stem)
+    report = import_rows(project.contracts, iter_input_rows(path))
+    return project, report.failed
+
+
+def output_names(files):
+    """Уникальные (без учёта регистра) имена файлов экспорта для входных файлов."""
+    names, used = [], set()
+    for path in files:
+        # Для project.vat имя файла одинаковое — берём имя папки проекта
+        base = path.parent.name if path.suffix.lower() == ".vat" else path.stem
+        name, n = base, 2
+        while name.lower() in used:
+            name = f"{base}_{n}"
+            n += 1
+        used.add(name.lower())
+        names.append(f"{name}.xlsx")
+    return names
+
+
+def process_file(path, output_file=None):
+    """Обрабатывает один файл (в рабочем процессе) и возвращает строку сводки. Без output_file — только сводка."""
+    path = Path(path)
+    row = {"Источник": str(path)}
+    try:
+        project, failed_rows = load_source(path)
+        totals = project.totals
+        if output_file:
+            from utils.excel_processor import write_project_xlsx
+            write_project_xlsx(project, output_file)
+        row.update({
+            "Проект": project.name,
+            "Договоров": totals.count,
+            "Отмечено": totals.checked_count,
+            "Доп. НДС": round(totals.vat_difference, 2),
+            "Доп. НДС (отмеченные)": round(totals.checked_vat_difference, 2),
+            "Новая стоимость": round(totals.new_cost, 2),
+            "Ошибок в строках": failed_rows,
+            "Ошибка": "",
+        })
+    except Exception as e:
+        row["Ошибка"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def write_summary(rows, path):
+    """
+    CSV в кодировке utf-8-sig с разделителем «;» и суммами с запятой —
+    открывается в русском Excel без настройки.
+    """
+    from utils.csv_processor import csv_money
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_HEADERS, delimiter=";")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: csv_money(value) if key in SUMMARY_MONEY else value
+                             for key, value in row.items()})
+
+
+def run_batch(inputs, output_dir, workers=None, summary_only=False):
+    """Обрабатывает все файлы пулом процессов. Возвращает строки сводки в порядке входных файлов."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Результаты прошлых запусков в выходной папке не считаются входными файлами
+    resolved_output = output_dir.resolve()
+    files = [f for f in collect_inputs(inputs) if resolved_output not in f.resolve().parents]
+    if not files:
+        return []
+
+    outputs = [None] * len(files) if summary_only else [str(output_dir / n) for n in output_names(files)]
+    workers = workers or min(len(files), os.cpu_count() or 1)
+    results = {}
+
+    def report(path, row):
+        results[path] = row
+        print(f"[batch] {path}: {row['Ошибка'] or 'доп. НДС ' + str(row['Доп. НДС'])}")
+
+    if workers == 1:
+        for path, output_file in zip(files, outputs):
+            report(path, process_file(path, output_file))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_file, str(path), output_file): path
+                       for path, output_file in zip(files, outputs)}
+            for future in as_completed(futures):
+                report(futures[future], future.result())
+
+    rows = [results[path] for path in files]
+    write_summary(rows, output_dir / SUMMARY_FILE)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py batch", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="папки или файлы (.xlsx, project.vat)")
+    parser.add_argument("-o", "--output", required=True, help="папка для экспорта и summary.csv")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="число процессов (по умолчанию — по числу ядер)")
+    parser.add_argument("--summary-only", action="store_true", help="только summary.csv, без экспорта по файлам")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.inputs, args.output, args.workers, args.summary_only)
+    if not rows:
+        print("[batch] Нет входных файлов", file=sys.stderr)
+        return 1
+    failed = sum(1 for row in rows if row["Ошибка"])
+    print(f"[batch] Обработано файлов: {len(rows)}, с ошибками: {failed}. "
+          f"Сводка: {Path(args.output) / SUMMARY_FILE}")
+    return 1 if failed else 0
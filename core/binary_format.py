@@ -0,0 +1,178 @@
+# core/binary_format.py
+"""
+Двоичный колоночный формат project.vat (версия 1).
+
+    [заголовок фиксированного размера]
+    [meta: JSON utf-8 — имя, даты, настройки]
+    [ids: int64 × N] [total: float64 × N] [remaining: float64 × N] [checked: int8 × N]
+    [names: uint32 × N] [numbers: uint32 × N]   — индексы в таблице строк
+    [таблица строк: смещения uint64 × (K + 1), затем utf-8 данные через \0]
+
+Все числа little-endian, каждая секция выровнена на 8 байт. Файл читается через mmap:
+числовые колонки копируются в array одним memcpy, а строки декодируются по одному разу
+на уникальное значение — без построения объекта на каждую строку.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b"VATC"
+VERSION = 1
+NO_STRING = 0xFFFFFFFF      # Индекс «нет значения» (None) в колонках строк
+
+# Секции по порядку: (смещение, длина в байтах) каждой
+SECTIONS = ('meta', 'ids', 'total', 'remaining', 'checked', 'names', 'numbers', 'string_offsets', 'strings')
+HEADER = struct.Struct('<4sHHQQQ' + 'QQ' * len(SECTIONS))
+
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+class FormatError(ValueError):
+    """Файл повреждён или записан более новой версией программы."""
+
+
+def is_columnar(path) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _le(column: array) -> bytes:
+    if _BIG_ENDIAN and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _uint32_array():
+    for code in ('I', 'L'):
+        if array(code).itemsize == 4:
+            return code
+    raise RuntimeError("Нет 32-битного беззнакового типа array")
+
+
+_U32 = _uint32_array()
+
+
+def write_columnar(f, data):
+    """Записывает ProjectData (core.storage) в открытый двоичный файл f."""
+    strings = {}
+
+    def encode(column):
+        return array(_U32, [NO_STRING if v is None else strings.setdefault(v, len(strings)) for v in column])
+
+    names = encode(data.names)
+    numbers = encode(data.numbers)
+    blobs = [s.encode('utf-8') for s in strings]   # dict сохраняет порядок индексов
+    # Строки разделены \0: обычно таблица разбирается одним split, смещения нужны,
+    # если \0 встретится внутри строки. offsets[i + 1] - 1 — конец i-й строки.
+    offsets = array('Q', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob) + 1)
+
+    meta = json.dumps({
+        'name': data.name,
+        'created': data.created.isoformat(),
+        'modified': data.modified.isoformat(),
+        'settings': data.settings,
+    }, ensure_ascii=False).encode('utf-8')
+
+    payloads = [
+        meta,
+        _le(array('q', data.ids)),
+        _le(array('d', data.totals)),
+        _le(array('d', data.remainings)),
+        bytes(array('b', (bool(c) for c in data.checked))),
+        _le(names),
+        _le(numbers),
+        _le(offsets),
+        b"\0".join(blobs),
+    ]
+
+    position = HEADER.size
+    layout = []
+    for payload in payloads:
+        position += -position % 8
+        layout.extend((position, len(payload)))
+        position += len(payload)
+
+    f.write(HEADER.pack(MAGIC, VERSION, 0, len(data.ids), data.next_id, len(blobs), *layout))
+    written = HEADER.size
+    for payload, offset in zip(payloads, layout[::2]):
+        f.write(b"\0" * (offset - written))
+        f.write(payload)
+        written = offset + len(payload)
+
+
+def read_columnar(path) -> dict:
+    """Читает файл формата VATC через mmap. Возвращает поля для ProjectData (даты — строками ISO)."""
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size < HEADER.size:
+            raise FormatError("Файл проекта повреждён (короткий заголовок)")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return _read(view, size)
+            finally:
+                view.release()
+
+
+def _read(view, size) -> dict:
+    magic, version, _, rows, next_id, string_count, *layout = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise FormatError("Это не файл проекта VATC")
+    if version > VERSION:
+        raise FormatError(f"Файл записан более новой версией программы (формат {version})")
+
+    sections = {}
+    for name, offset, length in zip(SECTIONS, layout[::2], layout[1::2]):
+        if offset + length > size:
+            raise FormatError(f"Файл проекта повреждён (секция {name})")
+        sections[name] = view[offset:offset + length]
+
+    def column(name, typecode, count):
+        result = array(typecode)
+        if result.itemsize * count != len(sections[name]):
+            raise FormatError(f"Файл проекта повреждён (колонка {name})")
+        result.frombytes(sections[name])
+        if _BIG_ENDIAN and result.itemsize > 1:
+            result.byteswap()
+        return result
+
+    meta = json.loads(bytes(sections['meta']).decode('utf-8'))
+    ids = column('ids', 'q', rows)
+    totals = column('total', 'd', rows)
+    remainings = column('remaining', 'd', rows)
+    checked = column('checked', 'b', rows)
+    name_idx = column('names', _U32, rows)
+    number_idx = column('numbers', _U32, rows)
+    offsets = column('string_offsets', 'Q', string_count + 1)
+
+    blob = bytes(sections['strings'])
+    if len(blob) != max(offsets[-1] - 1, 0):
+        raise FormatError("Файл проекта повреждён (таблица строк)")
+    strings = blob.decode('utf-8').split('\0') if string_count else []
+    if len(strings) != string_count:
+        strings = [blob[offsets[i]:offsets[i + 1] - 1].decode('utf-8') for i in range(string_count)]
+    strings = list(map(sys.intern, strings))
+    strings_or_none = strings + [None]    # NO_STRING → последний элемент
+
+    def decode(indexes):
+        last = len(strings)
+        return [strings_or_none[i if i != NO_STRING else last] for i in indexes]
+
+    return dict(
+        name=meta.get('name', "Без имени"),
+        created=meta.get('created'),
+        modified=meta.get('modified'),
+        settings=meta.get('settings', {}),
+        next_id=next_id,
+        ids=ids,
+        names=decode(name_idx),
+        numbers=decode(number_idx),
+        totals=totals,
+        remainings=remainings,
+        checked=checked,
+    )
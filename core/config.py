@@ -7,10 +7,13 @@ import re
 BASE_DIR = Path.home() / "Documents" / "vat"
 PROJECTS_DIR = BASE_DIR / "projects"
 CONFIG_FILE = BASE_DIR / "config.json"
+RECOVERY_DIR = BASE_DIR / "recovery"   # Копии несохранённых проектов — локально, даже если папка проектов общая
 
 # Значения по умолчанию
 DEFAULT_CURRENT_VAT = 20.0
 DEFAULT_FUTURE_VAT = 22.0
+DEFAULT_WATCH_PROJECTS_DIR = True
+DEFAULT_AUTOSAVE = True
 
 # Кеш конфигурации (будет заполнен при первом обращении)
 _config_cache = None
@@ -41,6 +44,12 @@ def _load_config():
     return _config_cache
 
 
+def reload_config():
+    """Сбрасывает кеш — следующее обращение перечитает config.json (после сохранения настроек)."""
+    global _config_cache
+    _config_cache = None
+
+
 def get_projects_dir() -> Path:
     """Возвращает путь к папке проектов."""
     path_str = _load_config().get('projects_dir', str(PROJECTS_DIR))
@@ -55,6 +64,16 @@ def get_future_vat() -> float:
     return float(_load_config().get('default_future_vat', DEFAULT_FUTURE_VAT))
 
 
+def get_watch_projects_dir() -> bool:
+    """Следить ли в фоне за изменениями в папке проектов (например, общей сетевой)."""
+    return bool(_load_config().get('watch_projects_dir', DEFAULT_WATCH_PROJECTS_DIR))
+
+
+def get_autosave() -> bool:
+    """Сохранять ли изменения проекта в фоне после паузы в правках."""
+    return bool(_load_config().get('autosave', DEFAULT_AUTOSAVE))
+
+
 # ========================
 # Валидация имён проектов
 # ========================
@@ -0,0 +1,60 @@
+# core/contract_search.py
+"""
+Поиск договоров проекта по названию и номеру: подстрока без учёта регистра,
+несколько слов через пробел — все должны встретиться.
+"""
+
+
+class ContractSearch:
+    """
+    Индекс поиска по ContractTable.
+
+    Номера приводятся к нижнему регистру одним вызовом на всю колонку, названия — по одному
+    разу на различное название (их обычно намного меньше, чем договоров). Индекс
+    перестраивается, только когда меняются строки, названия или номера (ContractTable.version).
+    Если запрос лишь дописан («дог» → «договор»), поиск идёт только среди прошлых совпадений.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._names = {}      # Название → оно же в нижнем регистре
+        self._numbers = []    # Номера в нижнем регистре, по строкам
+        self._version = None
+        self._query = None
+        self._result = None
+
+    def search(self, query):
+        """Индексы строк (по возрастанию), подходящих под запрос; None — запрос пуст (показывать всё)."""
+        query = " ".join(query.casefold().split())
+        if not query:
+            return None
+        self._ensure_index()
+        if query == self._query:
+            return self._result
+
+        # Запрос уточнён — совпадения только среди прошлых
+        candidates = self._result if self._query is not None and query.startswith(self._query) else None
+        names, numbers = self.table.names, self._numbers
+        for term in query.split():
+            hits = {name for name, folded in self._names.items() if term in folded}
+            if candidates is None:
+                candidates = [i for i, (name, number) in enumerate(zip(names, numbers))
+                              if name in hits or term in number]
+            else:
+                candidates = [i for i in candidates if names[i] in hits or term in numbers[i]]
+
+        self._query, self._result = query, candidates
+        return candidates
+
+    def _ensure_index(self):
+        table = self.table
+        if self._version == table.version:
+            return
+        self._names = {name: str(name).casefold() for name in set(table.names) if name}
+        numbers = ["" if number is None else str(number) for number in table.numbers]
+        folded = "\n".join(numbers).casefold().split("\n")
+        if len(folded) != len(numbers):   # Перевод строки внутри номера
+            folded = [number.casefold() for number in numbers]
+        self._numbers = folded
+        self._version = table.version
+        self._query = self._result = None
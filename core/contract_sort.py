@@ -0,0 +1,94 @@
+# core/contract_sort.py
+"""
+Сортировка договоров проекта по любой колонке без перестановки самих строк:
+результат — перестановка индексов ContractTable, кешированная по колонке.
+"""
+from core.contracts import Contract
+
+# Колонка → вид данных ContractTable.revisions, от которого она зависит (кроме состава строк)
+SORT_COLUMNS = {
+    'checked': 'checked',
+    'name': 'name',
+    'number': 'number',
+    'total': 'amounts',
+    'remaining': 'amounts',
+    'difference': 'amounts',
+    'without': 'amounts',
+    'vat': 'amounts',
+    'vat_future': 'amounts',
+    'new_cost': 'amounts',
+    'vat_difference': 'amounts',
+}
+
+
+class ContractSorter:
+    """
+    Кеш перестановок сортировки по колонкам ContractTable.
+
+    Ключи берутся прямо из колонок (суммы — из кешированных копеечных колонок compute(),
+    строки — в нижнем регистре). Перестановка колонки сбрасывается, только когда
+    меняются её данные или состав строк: правка суммы не трогает сортировку по названию,
+    а повторная сортировка по той же колонке берётся из кеша.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._orders = {}   # (колонка, по убыванию) -> (отметка ревизий, перестановка)
+
+    def order(self, column, descending=False, subset=None) -> list:
+        """
+        Индексы строк в порядке сортировки. subset — индексы, которыми ограничиться
+        (например, найденные поиском); None — все строки.
+        """
+        stamp = self._stamp(column)
+        cached = self._orders.get((column, descending))
+        if cached is None or cached[0] != stamp:
+            if descending:
+                # Обратный порядок — разворот возрастающего, без повторной сортировки
+                order = self.order(column)[::-1]
+            else:
+                order = sorted(range(len(self.table)), key=self._key(column))
+            cached = self._orders[(column, descending)] = stamp, order
+        order = cached[1]
+        if subset is None:
+            return order
+        mask = bytearray(len(order))
+        for index in subset:
+            mask[index] = 1
+        return [index for index in order if mask[index]]
+
+    def _stamp(self, column):
+        revisions = self.table.revisions
+        source = SORT_COLUMNS[column]
+        stamp = (revisions['rows'], revisions[source])
+        if source == 'amounts' and column not in ('total', 'remaining'):
+            stamp += (Contract.current_vat_rate, Contract.future_vat_rate)
+        return stamp
+
+    def _key(self, column):
+        table = self.table
+        if column == 'checked':
+            return table.checked.__getitem__
+        if column in ('name', 'number'):
+            return _folded(table.names if column == 'name' else table.numbers).__getitem__
+        if column == 'total':
+            return table.total.__getitem__
+        if column == 'remaining':
+            return table.remaining.__getitem__
+        return getattr(table.compute(), column).__getitem__
+
+
+def _folded(values) -> list:
+    """
+    Строки колонки в нижнем регистре (None → ""). Повторяющиеся значения (названия)
+    приводятся по одному разу, почти уникальные (номера) — одним casefold на всю колонку.
+    """
+    distinct = set(values)
+    if len(distinct) * 2 < len(values):
+        folded = {value: "" if value is None else str(value).casefold() for value in distinct}
+        return list(map(folded.__getitem__, values))
+    values = ["" if value is None else str(value) for value in values]
+    folded = "\n".join(values).casefold().split("\n")
+    if len(folded) != len(values):   # Перевод строки внутри значения
+        folded = [value.casefold() for value in values]
+    return folded
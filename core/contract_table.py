@@ -0,0 +1,382 @@
+# core/contract_table.py
+import sys
+from array import array
+from collections.abc import MutableSequence
+from typing import NamedTuple
+
+from core.contracts import Contract
+from core.money import calc_columns, kopeck_column, rate_units
+from core.totals import ProjectTotals
+
+
+def _intern(value):
+    """Одинаковые названия/номера хранятся одной строкой."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class DerivedColumns(NamedTuple):
+    """Производные колонки проекта — по одному значению на договор, в копейках (int64)."""
+    difference: array       # Остаток на 2026
+    without: array          # Остаток без НДС
+    vat: array              # НДС по текущей ставке
+    vat_future: array       # НДС по будущей ставке
+    new_cost: array         # Новая стоимость (она же остаток с будущим НДС)
+    vat_difference: array   # Доп. НДС
+
+
+class ContractTable(MutableSequence):
+    """
+    Колоночное хранилище договоров проекта.
+
+    Суммы и отметки лежат в непрерывных массивах, названия и номера — в списках
+    интернированных строк. Все производные колонки считаются за один проход
+    по всему проекту (compute), а Contract остаётся тонким «окном» на строку.
+    """
+
+    def __init__(self, contracts=()):
+        self.total = array('d')        # Сумма договора с НДС
+        self.remaining = array('d')    # Факт на 31.12.2025
+        self.checked = array('b')      # Отметка «выполнено»
+        self.names = []
+        self.numbers = []
+        self.ids = array('q')          # Постоянные идентификаторы строк (для журнала сохранений)
+        self._next_id = 1
+        self._dirty = set()            # id изменённых/добавленных строк с последнего сохранения
+        self._deleted = set()          # id удалённых строк с последнего сохранения
+        self._rows = []                # Созданные окна-Contract (None, пока строку не запрашивали)
+        self._derived = None
+        self._derived_rates = None
+        # Счётчики изменений по видам данных — для кешей поиска и сортировки
+        self.revisions = dict.fromkeys(('rows', 'name', 'number', 'amounts', 'checked'), 0)
+        self.totals = ProjectTotals(self)  # Итоги, обновляемые по ходу изменений
+        for contract in contracts:
+            self.append(contract)
+
+    # ========================
+    # Протокол последовательности
+    # ========================
+
+    def __len__(self):
+        return len(self.total)
+
+    @property
+    def version(self) -> int:
+        """Растёт при изменении состава строк, названий и номеров (для индекса поиска)."""
+        revisions = self.revisions
+        return revisions['rows'] + revisions['name'] + revisions['number']
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        row = self._rows[index]
+        if row is None:
+            row = Contract()
+            row._table = self
+            row._row = index
+            self._rows[index] = row
+        return row
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __contains__(self, contract):
+        return isinstance(contract, Contract) and contract._table is self
+
+    def index(self, contract, start=0, stop=None):
+        if contract in self:
+            row = contract._row
+            if row >= start and (stop is None or row < stop):
+                return row
+        raise ValueError("Договор не входит в проект")
+
+    def __setitem__(self, index, contract):
+        if isinstance(index, slice):
+            raise TypeError("ContractTable не поддерживает присваивание срезов")
+        if index < 0:
+            index += len(self)
+        contract = self._adoptable(contract)
+        self._detach(index)
+        self.totals.remove(self.total[index], self.remaining[index], self.checked[index])
+        self.totals.add(contract._total, contract._remaining, contract._is_modified)
+        self.checked[index] = bool(contract._is_modified)
+        self.names[index] = _intern(contract._name)
+        self.numbers[index] = _intern(contract._number)
+        self.total[index] = contract._total
+        self.remaining[index] = contract._remaining
+        self._dirty.add(self.ids[index])
+        self._attach(contract, index)
+        self._touch()
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            for i in sorted(range(*index.indices(len(self))), reverse=True):
+                del self[i]
+            return
+        if index < 0:
+            index += len(self)
+        self._detach(index)
+        self.totals.remove(self.total[index], self.remaining[index], self.checked[index])
+        self._mark_deleted(self.ids[index])
+        del self.ids[index]
+        del self.total[index]
+        del self.remaining[index]
+        del self.checked[index]
+        del self.names[index]
+        del self.numbers[index]
+        del self._rows[index]
+        self._renumber(index)
+        self._touch()
+
+    def insert(self, index, contract):
+        contract = self._adoptable(contract)
+        size = len(self)
+        if index < 0:
+            index = max(0, index + size)
+        index = min(index, size)
+        self.total.insert(index, contract._total)
+        self.remaining.insert(index, contract._remaining)
+        self.checked.insert(index, bool(contract._is_modified))
+        self.names.insert(index, _intern(contract._name))
+        self.numbers.insert(index, _intern(contract._number))
+        self._rows.insert(index, None)
+        self.ids.insert(index, self._new_id())
+        self.totals.add(contract._total, contract._remaining, contract._is_modified)
+        self._attach(contract, index)
+        self._renumber(index + 1)
+        self._touch()
+
+    def append(self, contract):
+        self.insert(len(self), contract)
+
+    def clear(self):
+        for index in range(len(self)):
+            self._detach(index)
+        for row_id in self.ids:
+            self._mark_deleted(row_id)
+        for column in (self.total, self.remaining, self.checked, self.names, self.numbers, self.ids, self._rows):
+            del column[:]
+        self.totals.reset()
+        self._touch()
+
+    def extend_columns(self, names, numbers, totals, remainings, checked, ids=None, interned=False):
+        """
+        Массовое добавление строк без создания объектов Contract.
+        ids передаются только при загрузке сохранённого проекта — иначе строкам выдаются новые.
+        interned=True — строки уже интернированы (прочитаны из файла проекта).
+        """
+        if not interned:
+            names = [_intern(n) for n in names]
+            numbers = [_intern(n) for n in numbers]
+        count = len(names)
+        if not (len(numbers) == len(totals) == len(remainings) == len(checked) == count):
+            raise ValueError("Колонки разной длины")
+        # Колонки array того же типа (например, прочитанные из файла) копируются одним блоком
+        totals = array('d', totals)
+        remainings = array('d', remainings)
+        checked = array('b', checked) if isinstance(checked, array) else array('b', (bool(c) for c in checked))
+        # Большую пачку (загрузка проекта) выгоднее учесть одним пересчётом колонок
+        bulk = count >= len(self)
+        self.names.extend(names)
+        self.numbers.extend(numbers)
+        self.total.extend(totals)
+        self.remaining.extend(remainings)
+        self.checked.extend(checked)
+        if not bulk:
+            add = self.totals.add
+            for row in zip(totals, remainings, checked):
+                add(*row)
+        if ids is None:
+            start = self._next_id
+            self._next_id += count
+            new_ids = range(start, start + count)
+            self._dirty.update(new_ids)
+            self.ids.extend(array('q', new_ids))
+        else:
+            ids = array('q', ids)
+            if len(ids) != count:
+                raise ValueError("Колонки разной длины")
+            self.ids.extend(ids)
+            if count:
+                self._next_id = max(self._next_id, max(ids) + 1)
+        self._rows.extend([None] * count)
+        self._touch()
+        if bulk:
+            self.totals.rebuild()
+
+    def extend_table(self, other):
+        """Добавляет все строки другой таблицы (например, подготовленной в фоне при импорте)."""
+        self.extend_columns(other.names, other.numbers, other.total, other.remaining, other.checked)
+
+    def copy(self):
+        """Независимая копия колонок (с теми же id строк) — снимок для фоновых задач."""
+        table = ContractTable()
+        table.extend_columns(self.names, self.numbers, self.total, self.remaining, self.checked, ids=self.ids)
+        table._next_id = self._next_id
+        return table
+
+    # ========================
+    # Запись отдельных полей (используется окнами Contract)
+    # ========================
+
+    def set_checked(self, index, value):
+        value = bool(value)
+        if self.checked[index] != value:
+            self.checked[index] = value
+            self._dirty.add(self.ids[index])
+            self.totals.toggle(self.total[index], self.remaining[index], value)
+            self.revisions['checked'] += 1
+
+    def set_name(self, index, value):
+        self.names[index] = _intern(value)
+        self._dirty.add(self.ids[index])
+        self.revisions['name'] += 1
+
+    def set_number(self, index, value):
+        self.numbers[index] = _intern(value)
+        self._dirty.add(self.ids[index])
+        self.revisions['number'] += 1
+
+    def set_total(self, index, value):
+        self._set_amounts(index, float(value), self.remaining[index])
+
+    def set_remaining(self, index, value):
+        self._set_amounts(index, self.total[index], float(value))
+
+    def update_amounts(self, indices, totals, remainings):
+        """
+        Новые суммы сразу для многих строк (обновление договоров при импорте).
+        Отметки «выполнено» не меняются; при большой доле строк итоги пересчитываются один раз.
+        """
+        if len(indices) * 8 < len(self):
+            for index, total, remaining in zip(indices, totals, remainings):
+                self._set_amounts(index, float(total), float(remaining))
+            return
+        for index, total, remaining in zip(indices, totals, remainings):
+            self.total[index] = total
+            self.remaining[index] = remaining
+            self._dirty.add(self.ids[index])
+            row = self._rows[index]
+            if row is not None:
+                row._derived = None
+        self._derived = None
+        self.revisions['amounts'] += 1
+        self.totals.rebuild()
+
+    def _set_amounts(self, index, total, remaining):
+        checked = self.checked[index]
+        self.totals.remove(self.total[index], self.remaining[index], checked)
+        self.total[index] = total
+        self.remaining[index] = remaining
+        self.totals.add(total, remaining, checked)
+        self._dirty.add(self.ids[index])
+        self._touch(index)
+
+    # ========================
+    # Расчёты по всему проекту
+    # ========================
+
+    def compute(self, current_vat_rate=None, future_vat_rate=None) -> DerivedColumns:
+        """
+        Считает все производные колонки за один проход в целых копейках (core.money).
+        Формулы совпадают с методами Contract, результат кешируется до первого изменения сумм.
+        """
+        cur = Contract.current_vat_rate if current_vat_rate is None else current_vat_rate
+        fut = Contract.future_vat_rate if future_vat_rate is None else future_vat_rate
+        if self._derived is not None and self._derived_rates == (cur, fut):
+            return self._derived
+
+        self._derived = DerivedColumns(*calc_columns(
+            kopeck_column(self.total), kopeck_column(self.remaining), rate_units(cur), rate_units(fut)))
+        self._derived_rates = (cur, fut)
+        return self._derived
+
+    # ========================
+    # Учёт изменений для журнала сохранений
+    # ========================
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._dirty or self._deleted)
+
+    def take_changes(self):
+        """
+        Забирает накопленные изменения: (список изменённых строк, список id удалённых).
+        Строка — словарь {'id', 'name', 'number', 'total', 'remaining', 'checked'}.
+        """
+        dirty, deleted = self._dirty, self._deleted
+        self._dirty, self._deleted = set(), set()
+        if not dirty:
+            return [], sorted(deleted)
+        puts = [
+            {'id': row_id, 'name': self.names[i], 'number': self.numbers[i],
+             'total': self.total[i], 'remaining': self.remaining[i], 'checked': bool(self.checked[i])}
+            for i, row_id in enumerate(self.ids) if row_id in dirty
+        ]
+        return puts, sorted(deleted)
+
+    def mark_clean(self):
+        """Всё текущее состояние сохранено (после загрузки или полной записи)."""
+        self._dirty.clear()
+        self._deleted.clear()
+
+    # ========================
+    # Служебное
+    # ========================
+
+    def _new_id(self):
+        row_id = self._next_id
+        self._next_id += 1
+        self._dirty.add(row_id)
+        return row_id
+
+    def _mark_deleted(self, row_id):
+        self._dirty.discard(row_id)
+        self._deleted.add(row_id)
+
+    def _touch(self, index=None):
+        """Сбрасывает кеш колонок и, если указана строка, кеш её окна (иначе изменился состав строк)."""
+        self._derived = None
+        if index is None:
+            self.revisions['rows'] += 1
+        else:
+            self.revisions['amounts'] += 1
+            row = self._rows[index]
+            if row is not None:
+                row._derived = None
+
+    def _adoptable(self, contract):
+        """Договор из другой таблицы (или этой же) копируется, свободный — присоединяется как есть."""
+        if not isinstance(contract, Contract):
+            raise TypeError(f"Ожидался Contract, получено {type(contract).__name__}")
+        if contract._table is not None:
+            return contract.copy()
+        return contract
+
+    def _attach(self, contract, index):
+        contract._table = self
+        contract._row = index
+        self._rows[index] = contract
+
+    def _detach(self, index):
+        """Отвязывает окно строки: значения копируются обратно в сам объект."""
+        row = self._rows[index]
+        if row is None:
+            return
+        row._is_modified = bool(self.checked[index])
+        row._name = self.names[index]
+        row._number = self.numbers[index]
+        row._total = self.total[index]
+        row._remaining = self.remaining[index]
+        row._table = None
+        row._row = -1
+        self._rows[index] = None
+
+    def _renumber(self, start):
+        rows = self._rows
+        for i in range(start, len(rows)):
+            row = rows[i]
+            if row is not None:
+                row._row = i
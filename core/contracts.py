@@ -1,34 +1,166 @@
-from dataclasses import dataclass, field
 from core.config import get_current_vat, get_future_vat
+from core.money import calc_row, rate_units, to_kopecks, to_rubles
+
 
-@dataclass
 class Contract:
-    is_modified: bool = field(default=False, metadata={"save": True})
-    name: str = "Новый договор"
-    number: str = ""                    # № договора
-    total_cost_with_vat: float = 0.0    # Полная сумма договора
-    remaining_cost: float = 0.0         # Факт на 31.12.2025 (то, что будет облагаться новым НДС)
+    """
+    Договор. Пока договор не добавлен в проект, значения хранятся в самом объекте;
+    после добавления в ContractTable объект становится «окном» на строку таблицы.
+
+    Производные суммы считаются один раз и кешируются; кеш сбрасывается при изменении
+    сумм договора, а при смене ставок НДС (атрибуты класса) считается устаревшим.
+    """
+    __slots__ = ('_table', '_row', '_is_modified', '_name', '_number', '_total', '_remaining', '_derived')
+
     current_vat_rate = 1 + get_current_vat() / 100
     future_vat_rate = 1 + get_future_vat() / 100
 
+    def __init__(self, is_modified=False, name="Новый договор", number="",
+                 total_cost_with_vat=0.0, remaining_cost=0.0):
+        self._table = None
+        self._row = -1
+        self._is_modified = bool(is_modified)
+        self._name = name
+        self._number = number                          # № договора
+        self._total = float(total_cost_with_vat)       # Полная сумма договора
+        self._remaining = float(remaining_cost)        # Факт на 31.12.2025 (то, что будет облагаться новым НДС)
+        self._derived = None                           # Кеш расчётов, см. _calc()
+
+    # ========================
+    # Хранимые поля
+    # ========================
+
+    @property
+    def is_modified(self) -> bool:
+        if self._table is None:
+            return self._is_modified
+        return bool(self._table.checked[self._row])
+
+    @is_modified.setter
+    def is_modified(self, value):
+        if self._table is None:
+            self._is_modified = bool(value)
+        else:
+            self._table.set_checked(self._row, value)
+
+    @property
+    def name(self) -> str:
+        if self._table is None:
+            return self._name
+        return self._table.names[self._row]
+
+    @name.setter
+    def name(self, value):
+        if self._table is None:
+            self._name = value
+        else:
+            self._table.set_name(self._row, value)
+
+    @property
+    def number(self) -> str:
+        if self._table is None:
+            return self._number
+        return self._table.numbers[self._row]
+
+    @number.setter
+    def number(self, value):
+        if self._table is None:
+            self._number = value
+        else:
+            self._table.set_number(self._row, value)
+
+    @property
+    def total_cost_with_vat(self) -> float:
+        if self._table is None:
+            return self._total
+        return self._table.total[self._row]
+
+    @total_cost_with_vat.setter
+    def total_cost_with_vat(self, value):
+        if self._table is None:
+            self._total = float(value)
+            self._derived = None
+        else:
+            self._table.set_total(self._row, value)
+
+    @property
+    def remaining_cost(self) -> float:
+        if self._table is None:
+            return self._remaining
+        return self._table.remaining[self._row]
+
+    @remaining_cost.setter
+    def remaining_cost(self, value):
+        if self._table is None:
+            self._remaining = float(value)
+            self._derived = None
+        else:
+            self._table.set_remaining(self._row, value)
+
+    def to_dict(self) -> dict:
+        """Поля договора для сохранения."""
+        return {
+            'is_modified': self.is_modified,
+            'name': self.name,
+            'number': self.number,
+            'total_cost_with_vat': self.total_cost_with_vat,
+            'remaining_cost': self.remaining_cost,
+        }
+
+    def copy(self) -> "Contract":
+        """Отвязанная от таблицы копия договора."""
+        return Contract(**self.to_dict())
+
+    def __repr__(self):
+        return (f"Contract(is_modified={self.is_modified!r}, name={self.name!r}, number={self.number!r}, "
+                f"total_cost_with_vat={self.total_cost_with_vat!r}, remaining_cost={self.remaining_cost!r})")
+
+    # ========================
+    # Расчёты
+    # ========================
+
+    def _calc(self) -> tuple:
+        """
+        (ставка текущая, ставка будущая, остаток, без НДС, НДС, НДС будущий, доп. НДС).
+        Суммы считаются в копейках (core.money) и возвращаются в рублях.
+        Пересчитывается только если суммы или ставки изменились.
+        """
+        cur = self.current_vat_rate
+        fut = self.future_vat_rate
+        derived = self._derived
+        if derived is None or derived[0] != cur or derived[1] != fut:
+            row = calc_row(to_kopecks(self.total_cost_with_vat), to_kopecks(self.remaining_cost),
+                           rate_units(cur), rate_units(fut))
+            derived = self._derived = (cur, fut) + tuple(map(to_rubles, row))
+        return derived
+
     def get_without(self) -> float:
-        return self.get_difference() / self.current_vat_rate
+        return self._calc()[3]
 
     def getVATfut(self) -> float:
-        return self.get_without() * (self.future_vat_rate - 1)
+        return self._calc()[5]
 
     def getNewCost(self) -> float:
-        return self.get_without() + self.getVATfut()
+        derived = self._calc()
+        return derived[3] + derived[5]
 
     def getDiffWith(self) -> float:
-        return self.get_without() + self.getVATfut()
+        return self.getNewCost()
 
     def get_difference(self) -> float:
-        return self.total_cost_with_vat - self.remaining_cost
+        return self._calc()[2]
 
     def getVAT(self) -> float:
-        return self.get_difference() - self.get_without()
+        return self._calc()[4]
 
     def get_vat_difference(self) -> float:
-        difference = self.getVATfut() - self.getVAT()
-        return round(difference, 2)
\ No newline at end of file
+        return self._calc()[6]
+
+
+def reload_vat_rates():
+    """
+    Ставки НДС из настроек → атрибуты класса Contract (после сохранения настроек).
+    Кеши договоров, итоги проектов, сортировка и сводки индекса замечают смену ставок сами.
+    """
+    Contract.current_vat_rate = 1 + get_current_vat() / 100
+    Contract.future_vat_rate = 1 + get_future_vat() / 100
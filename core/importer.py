@@ -0,0 +1,327 @@
+# core/importer.py
+import math
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+from utils.diagnostics import timed
+from utils.format import format_money, parse_money
+
+# Формат входного файла (5 колонок): название, № договора, (не используется), сумма с НДС, факт на 31.12.2025
+INPUT_COLUMNS = 5
+DEFAULT_BATCH_SIZE = 5000
+
+
+class RowError(Exception):
+    """Строка входного файла не прошла проверку."""
+
+
+class FileImport(NamedTuple):
+    """Итог чтения одного файла при импорте нескольких (import_files)."""
+    path: str
+    sheets: int       # Прочитано листов
+    rows: int         # Принято строк
+    failed: int       # Строк с ошибками
+    error: str        # Файл не прочитан ("" — прочитан)
+
+
+class ImportReport:
+    """Итог импорта: сколько добавлено, обновлено (merge_table) и какие строки отклонены."""
+
+    def __init__(self):
+        self.added = 0
+        self.skipped = 0          # Пустые строки
+        self.errors = []          # [(номер строки, сообщение)]
+        self.updated = []         # [(название, номер, (сумма, факт) было, (сумма, факт) стало)]
+        self.unchanged = 0        # Найдены в проекте, суммы те же
+        self.duplicates = 0       # Повторы ключа внутри файла (берётся последняя строка)
+        self.files = []           # [FileImport] — при импорте нескольких файлов
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    @property
+    def unreadable(self) -> list:
+        """Файлы, которые не удалось прочитать (import_files)."""
+        return [f for f in self.files if f.error]
+
+    def summary(self, max_errors=10) -> str:
+        lines = [f"Добавлено {self.added} договоров"]
+        if self.files:
+            lines.append(f"Файлов: {len(self.files)}, листов: {sum(f.sheets for f in self.files)}")
+            for f in self.files[:max_errors]:
+                name = Path(f.path).name
+                if f.error:
+                    lines.append(f"  {name}: не прочитан — {f.error}")
+                else:
+                    lines.append(f"  {name}: строк {f.rows}" + (f", с ошибками {f.failed}" if f.failed else ""))
+            if len(self.files) > max_errors:
+                lines.append(f"  … и ещё {len(self.files) - max_errors}")
+        if self.updated or self.unchanged:
+            lines.append(f"Обновлено: {len(self.updated)}, без изменений: {self.unchanged}")
+            for name, number, (old_total, old_remaining), (total, remaining) in self.updated[:max_errors]:
+                lines.append(f"  {number or name}: {format_money(old_total)} / {format_money(old_remaining)} → "
+                             f"{format_money(total)} / {format_money(remaining)}")
+            if len(self.updated) > max_errors:
+                lines.append(f"  … и ещё {len(self.updated) - max_errors}")
+        if self.duplicates:
+            lines.append(f"Повторов в файле: {self.duplicates} (учтена последняя строка)")
+        if self.errors:
+            lines.append(f"Пропущено строк с ошибками: {self.failed}")
+            for row_number, message in self.errors[:max_errors]:
+                lines.append(f"  строка {row_number}: {message}")
+            if self.failed > max_errors:
+                lines.append(f"  … и ещё {self.failed - max_errors}")
+        return "\n".join(lines)
+
+
+def _parse_amount(value, column_name):
+    if value is None or value == "":
+        return 0.0
+    try:
+        # Текст (CSV, текстовые ячейки Excel) — в русском или английском формате
+        amount = parse_money(value) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{column_name}: не число ({value!r})")
+    # Отрицательные суммы (корректировки, кредит-ноты) принимаются, как и раньше
+    if not math.isfinite(amount):
+        raise RowError(f"{column_name}: не число ({value!r})")
+    return amount
+
+
+def parse_input_row(row):
+    """Проверяет строку входного файла и возвращает (название, номер, сумма, факт)."""
+    if len(row) < INPUT_COLUMNS:
+        raise RowError(f"ожидалось {INPUT_COLUMNS} колонок, найдено {len(row)}")
+    name = str(row[0]).strip() if row[0] not in (None, "") else "Договор"
+    number = str(row[1]).strip() if row[1] not in (None, "") else ""
+    total = _parse_amount(row[3], "Сумма договора")
+    remaining = _parse_amount(row[4], "Факт на 31.12.2025")
+    return name or "Договор", number, total, remaining
+
+
+def import_rows(contracts, rows, batch_size=DEFAULT_BATCH_SIZE, has_header=True, progress=None):
+    """
+    Добавляет договоры в таблицу contracts (ContractTable) из потока строк (номер строки, значения).
+
+    Строки проверяются и добавляются пачками по batch_size, поэтому память не растёт
+    с размером файла. Ошибочные строки не прерывают импорт, а попадают в отчёт.
+    progress(обработано строк) вызывается после каждой пачки.
+    """
+    report = ImportReport()
+    names, numbers, totals, remainings = [], [], [], []
+
+    def flush():
+        if names:
+            contracts.extend_columns(names, numbers, totals, remainings, [False] * len(names))
+            report.added += len(names)
+            names.clear(); numbers.clear(); totals.clear(); remainings.clear()
+
+    row_number = 0
+    for row_number, row in rows:
+        if has_header and row_number == 1:
+            continue
+        if row is None or all(v in (None, "") for v in row):
+            report.skipped += 1
+            continue
+        try:
+            name, number, total, remaining = parse_input_row(row)
+        except RowError as e:
+            report.errors.append((row_number, str(e)))
+            continue
+        names.append(name)
+        numbers.append(number)
+        totals.append(total)
+        remainings.append(remaining)
+        if len(names) >= batch_size:
+            flush()
+            if progress:
+                progress(row_number)
+    flush()
+    if progress:
+        progress(row_number)
+    return report
+
+
+def iter_input_sheets(path, all_sheets=False):
+    """
+    Листы входного файла: (название листа, поток (номер строки, значения)).
+    CSV/TSV — один лист без названия, Excel — активный лист (all_sheets=True — все листы).
+    """
+    from utils.csv_processor import is_csv_path, iter_input_csv
+    if is_csv_path(path):
+        return [("", iter_input_csv(path))]
+    from utils.excel_processor import iter_input_sheets as iter_excel_sheets
+    return iter_excel_sheets(path, all_sheets)
+
+
+class StagingColumns:
+    """
+    Приёмник import_rows в рабочем процессе: только колонки, без итогов и окон-Contract.
+    Одинаковые названия интернируются — при передаче в основной процесс pickle отправит
+    каждое название один раз.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.numbers = []
+        self.total = array('d')
+        self.remaining = array('d')
+
+    def extend_columns(self, names, numbers, totals, remainings, checked):
+        self.names.extend(map(sys.intern, names))
+        self.numbers.extend(numbers)
+        self.total.extend(totals)
+        self.remaining.extend(remainings)
+
+
+def read_input_file(path, all_sheets=False, progress=None):
+    """
+    Читает и проверяет один входной файл (Excel или CSV/TSV); каждый лист — отдельный реестр
+    с шапкой. Выполняется в рабочем процессе import_files, поэтому возвращает только простые
+    данные: [(лист, (названия, номера, суммы, факт), ImportReport)].
+    """
+    sheets = []
+    for sheet, rows in iter_input_sheets(path, all_sheets):
+        staging = StagingColumns()
+        report = import_rows(staging, rows, progress=progress)
+        sheets.append((sheet, (staging.names, staging.numbers, staging.total, staging.remaining), report))
+    return sheets
+
+
+def _file_import(path, sheets, error=""):
+    reports = [report for _, _, report in sheets]
+    return FileImport(path, len(reports), sum(r.added for r in reports), sum(r.failed for r in reports), error)
+
+
+@timed("import_files", rows=lambda report, *_, **__: report.added)
+def import_files(contracts, paths, workers=None, all_sheets=False, progress=None, row_progress=None) -> ImportReport:
+    """
+    Импорт нескольких файлов (Excel, CSV/TSV) в таблицу contracts (ContractTable). Из книги
+    Excel читается активный лист, с all_sheets=True — все листы, каждый как отдельный реестр.
+
+    Файлы разбираются пулом процессов, как в core.batch; проверенные строки возвращаются
+    колонками и добавляются в contracts одним extend_columns в порядке файлов и листов —
+    итоги пересчитываются один раз. Нечитаемый файл не прерывает импорт, а попадает
+    в report.files. progress(FileImport, готово файлов, всего) вызывается после каждого файла;
+    исключение из него (отмена) снимает ещё не начатые файлы. Один файл читается без пула,
+    и тогда row_progress(прочитано строк) вызывается по ходу чтения; исключение из row_progress
+    тоже прерывает импорт, а не записывается ошибкой чтения файла.
+    """
+    paths = [str(path) for path in paths]
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    results = {}    # Файл -> [(лист, колонки, ImportReport)]
+    files = {}      # Файл -> FileImport
+
+    def finish(path, sheets, error=""):
+        results[path] = sheets
+        files[path] = _file_import(path, sheets, error)
+        if progress:
+            progress(files[path], len(files), len(paths))
+
+    aborted = []    # Исключение из row_progress (отмена)
+
+    def rows_read(count):
+        try:
+            row_progress(count)
+        except BaseException as e:
+            aborted.append(e)
+            raise
+
+    if workers <= 1 or len(paths) == 1:
+        for path in paths:
+            try:
+                sheets = read_input_file(path, all_sheets, rows_read if row_progress else None)
+            except Exception as e:
+                if aborted:
+                    raise
+                finish(path, [], f"{type(e).__name__}: {e}")
+            else:
+                finish(path, sheets)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = {pool.submit(read_input_file, path, all_sheets): path for path in paths}
+            for future in as_completed(futures):
+                try:
+                    sheets = future.result()
+                except Exception as e:
+                    finish(futures[future], [], f"{type(e).__name__}: {e}")
+                else:
+                    finish(futures[future], sheets)
+        finally:
+            # При отмене не ждём файлы, которые ещё не начали читаться
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    report = ImportReport()
+    names, numbers, totals, remainings = [], [], array('d'), array('d')
+    for path in paths:
+        report.files.append(files[path])
+        for sheet, columns, sheet_report in results[path]:
+            names.extend(columns[0])
+            numbers.extend(columns[1])
+            totals.extend(columns[2])
+            remainings.extend(columns[3])
+            report.skipped += sheet_report.skipped
+            source = f"{Path(path).name} / {sheet}" if sheet else Path(path).name
+            report.errors.extend((row_number, f"{source}: {message}") for row_number, message in sheet_report.errors)
+    contracts.extend_columns(names, numbers, totals, remainings, [False] * len(names))
+    report.added = len(names)
+    return report
+
+
+def contract_key(name, number):
+    """
+    Ключ сопоставления договора при обновлении: № договора, а если номера нет — название.
+    Регистр и пробелы по краям не учитываются.
+    """
+    if number not in (None, ""):
+        return 0, str(number).strip().casefold()
+    return 1, str(name or "").strip().casefold()
+
+
+def merge_table(contracts, staging, report=None) -> ImportReport:
+    """
+    Сливает прочитанные из файла строки staging (ContractTable) в contracts: договоры,
+    найденные по contract_key, получают новые суммы (отметка «выполнено» сохраняется),
+    остальные добавляются. Повторы ключа внутри файла схлопываются — берётся последняя строка.
+    Один проход по проекту (хеш-индекс ключей) и один по файлу.
+    """
+    report = report or ImportReport()
+    index = {}
+    for i, key in enumerate(map(contract_key, contracts.names, contracts.numbers)):
+        index.setdefault(key, i)
+
+    matched = {}    # строка проекта -> (сумма, факт) из файла
+    added = {}      # ключ -> (название, номер, сумма, факт)
+    seen = set()
+    for name, number, total, remaining in zip(staging.names, staging.numbers, staging.total, staging.remaining):
+        key = contract_key(name, number)
+        if key in seen:
+            report.duplicates += 1
+        else:
+            seen.add(key)
+        row = index.get(key)
+        if row is None:
+            added[key] = (name, number, total, remaining)
+        else:
+            matched[row] = (total, remaining)
+
+    changed = [(row, amounts) for row, amounts in matched.items()
+               if amounts != (contracts.total[row], contracts.remaining[row])]
+    report.updated = [(contracts.names[row], contracts.numbers[row],
+                       (contracts.total[row], contracts.remaining[row]), amounts) for row, amounts in changed]
+    report.unchanged = len(matched) - len(changed)
+    if changed:
+        rows, amounts = zip(*changed)
+        contracts.update_amounts(rows, *zip(*amounts))
+
+    report.added = len(added)
+    if added:
+        names, numbers, totals, remainings = zip(*added.values())
+        contracts.extend_columns(names, numbers, totals, remainings, [False] * len(names))
+    return report
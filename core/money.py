@@ -0,0 +1,94 @@
+# core/money.py
+"""
+Денежная арифметика в целых копейках.
+
+Все расчёты по договорам ведутся в копейках (int), ставки НДС — в десятитысячных
+долях (1.22 → 12200). Правила округления (половина — от нуля):
+
+    остаток       = сумма − факт                              (точно)
+    без НДС       = остаток / ставка_текущая                  → до копейки
+    НДС           = остаток − без НДС                         (точно, без НДС + НДС = остаток)
+    НДС будущий   = без НДС × (ставка_будущая − 1)            → до копейки
+    новая стоим.  = без НДС + НДС будущий                     (точно)
+    доп. НДС      = НДС будущий − НДС                         (точно)
+
+Поэтому итог по проекту — сумма целых — совпадает с суммой показанных строк.
+"""
+from array import array
+from operator import add, sub
+
+RATE_SCALE = 10000      # Ставка 1.22 хранится как 12200
+
+
+# Поправка на двоичное представление: 0.285 * 100 = 28.499999999999996
+_HALF = 0.5 + 1e-7
+
+
+def to_kopecks(value) -> int:
+    """Рубли (float/int) → копейки, половина копейки округляется от нуля."""
+    cents = value * 100
+    if cents >= 0:
+        return int(cents + _HALF)
+    return -int(_HALF - cents)
+
+
+def to_rubles(kopecks: int) -> float:
+    return kopecks / 100
+
+
+def rate_units(rate: float) -> int:
+    """Множитель ставки (1.2) → целое в десятитысячных (12000)."""
+    return int(round(rate * RATE_SCALE))
+
+
+def div_round(a: int, b: int) -> int:
+    """a / b с округлением половины от нуля (b > 0)."""
+    if a >= 0:
+        return (2 * a + b) // (2 * b)
+    return -((-2 * a + b) // (2 * b))
+
+
+def calc_row(total_k, remaining_k, cur_u, fut_u) -> tuple:
+    """Расчёт одного договора в копейках: (остаток, без НДС, НДС, НДС будущий, доп. НДС)."""
+    difference = total_k - remaining_k
+    without = div_round(difference * RATE_SCALE, cur_u)
+    vat = difference - without
+    vat_future = div_round(without * (fut_u - RATE_SCALE), RATE_SCALE)
+    return difference, without, vat, vat_future, vat_future - vat
+
+
+def base_columns(total_k, remaining_k, cur_u) -> tuple:
+    """Колонки, зависящие только от текущей ставки: (остаток, без НДС, НДС), int64 копейки."""
+    # div_round встроен в генераторы списков: колонки — сотни тысяч строк
+    double_cur = 2 * cur_u
+    double_scale = 2 * RATE_SCALE
+    difference = array('q', map(sub, total_k, remaining_k))
+    without = array('q', [(double_scale * d + cur_u) // double_cur if d >= 0
+                          else -((-double_scale * d + cur_u) // double_cur) for d in difference])
+    vat = array('q', map(sub, difference, without))
+    return difference, without, vat
+
+
+def future_vat_column(without, fut_u) -> array:
+    """НДС по будущей ставке от колонки «без НДС»."""
+    fut_part = fut_u - RATE_SCALE
+    double_scale = 2 * RATE_SCALE
+    return array('q', [(2 * p + RATE_SCALE) // double_scale if (p := w * fut_part) >= 0
+                       else -((-2 * p + RATE_SCALE) // double_scale) for w in without])
+
+
+def calc_columns(total_k, remaining_k, cur_u, fut_u) -> tuple:
+    """
+    То же, что calc_row, по целым колонкам за один проход: возвращает int64-массивы
+    (остаток, без НДС, НДС, НДС будущий, новая стоимость, доп. НДС).
+    """
+    difference, without, vat = base_columns(total_k, remaining_k, cur_u)
+    vat_future = future_vat_column(without, fut_u)
+    new_cost = array('q', map(add, without, vat_future))
+    vat_difference = array('q', map(sub, vat_future, vat))
+    return difference, without, vat, vat_future, new_cost, vat_difference
+
+
+def kopeck_column(values) -> array:
+    """Колонка сумм в рублях → int64-массив копеек (правило to_kopecks)."""
+    return array('q', [int(c + _HALF) if c >= 0 else -int(_HALF - c) for c in [v * 100 for v in values]])
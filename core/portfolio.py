@@ -0,0 +1,42 @@
+# core/portfolio.py
+from core.money import to_kopecks
+
+PORTFOLIO_HEADERS = ["Проект", "Договоров", "Отмечено", "Доп. НДС", "Доп. НДС (отмеченные)",
+                     "Доп. НДС (неотмеченные)", "Новая стоимость"]
+
+
+class PortfolioTotals:
+    """
+    Итоги по всем проектам (портфелю). Считаются по сводкам ProjectSummary из индекса,
+    поэтому договоры проектов не загружаются.
+    """
+
+    def __init__(self, summaries):
+        self.summaries = list(summaries)
+        self.project_count = len(self.summaries)
+        self.contract_count = sum(s.contract_count for s in self.summaries)
+        self.checked_count = sum(s.checked_count for s in self.summaries)
+        # Суммы в сводках — до копеек, складываем в копейках, чтобы итог не «уплывал»
+        self.vat_difference = _sum_money(s.total_vat_difference for s in self.summaries)
+        self.new_cost = _sum_money(s.new_cost for s in self.summaries)
+        self.checked_vat_difference = _sum_money(s.checked_vat_difference for s in self.summaries)
+
+    @property
+    def unchecked_count(self) -> int:
+        return self.contract_count - self.checked_count
+
+    @property
+    def unchecked_vat_difference(self) -> float:
+        return round(self.vat_difference - self.checked_vat_difference, 2)
+
+    def iter_rows(self):
+        """Строки сводки для экспорта (PORTFOLIO_HEADERS) и последняя — ИТОГО."""
+        for s in self.summaries:
+            yield (s.name, s.contract_count, s.checked_count, s.total_vat_difference,
+                   s.checked_vat_difference, s.unchecked_vat_difference, s.new_cost)
+        yield ("ИТОГО", self.contract_count, self.checked_count, self.vat_difference,
+               self.checked_vat_difference, self.unchecked_vat_difference, self.new_cost)
+
+
+def _sum_money(values) -> float:
+    return sum(map(to_kopecks, values)) / 100
@@ -0,0 +1,258 @@
+# core/project_index.py
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from core.config import get_projects_dir
+from core.contracts import Contract
+from core.storage import ProjectStore
+
+INDEX_FILE_NAME = "index.json"
+INDEX_VERSION = 2
+
+# Изменённые проекты загружаются пулом процессов, только если их суммарный размер
+# окупает запуск процессов; мелкие читаются прямо в текущем процессе.
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+# Индекс могут записывать одновременно фоновое сканирование и сохранение проекта
+_save_lock = threading.Lock()
+
+
+class ProjectSummary:
+    """
+    Краткие сведения о проекте для списка проектов и итогов портфеля — без договоров.
+    Полный проект загружается через ProjectManager.load_project.
+    """
+    __slots__ = ('folder', 'name', 'created', 'modified', 'contract_count',
+                 'total_vat_difference', 'new_cost', 'checked_count', 'checked_vat_difference',
+                 'rates', 'mtime', 'size')
+
+    def __init__(self, folder, name, created, modified, contract_count=0,
+                 total_vat_difference=0.0, new_cost=0.0, checked_count=0, checked_vat_difference=0.0,
+                 rates=(0.0, 0.0), mtime=0, size=0):
+        self.folder = folder                              # Имя папки проекта
+        self.name = name
+        self.created = created
+        self.modified = modified
+        self.contract_count = contract_count
+        self.total_vat_difference = total_vat_difference  # Доп. НДС по всему проекту
+        self.new_cost = new_cost                          # Новая общая стоимость
+        self.checked_count = checked_count
+        self.checked_vat_difference = checked_vat_difference  # Доп. НДС по отмеченным
+        self.rates = tuple(rates)                         # Ставки, по которым посчитаны суммы
+        self.mtime = mtime                                # Наибольший st_mtime_ns файлов проекта
+        self.size = size                                  # Суммарный размер файлов проекта
+
+    @property
+    def unchecked_count(self) -> int:
+        return self.contract_count - self.checked_count
+
+    @property
+    def unchecked_vat_difference(self) -> float:
+        return round(self.total_vat_difference - self.checked_vat_difference, 2)
+
+    @property
+    def project_dir(self) -> Path:
+        return get_projects_dir() / self.folder
+
+    @property
+    def project_file(self) -> Path:
+        return self.project_dir / "project.vat"
+
+    @classmethod
+    def from_project(cls, project, signature=(0, 0)):
+        """Сводка по загруженному проекту и подписи его файлов (ProjectStore.signature; record() ставит её сам)."""
+        totals = project.totals
+        return cls(
+            folder=project.project_dir.name,
+            name=project.name,
+            created=project.created,
+            modified=project.modified,
+            contract_count=totals.count,
+            total_vat_difference=totals.vat_difference,
+            new_cost=totals.new_cost,
+            checked_count=totals.checked_count,
+            checked_vat_difference=totals.checked_vat_difference,
+            rates=(Contract.current_vat_rate, Contract.future_vat_rate),
+            mtime=signature[0],
+            size=signature[1],
+        )
+
+    def matches(self, signature) -> bool:
+        """
+        Совпадает ли сводка с текущим состоянием файлов на диске (основной файл + журналы)
+        и с текущими ставками НДС — после смены ставок суммы надо пересчитать.
+        """
+        return ((self.mtime, self.size) == tuple(signature)
+                and self.rates == (Contract.current_vat_rate, Contract.future_vat_rate))
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'created': self.created.isoformat(),
+            'modified': self.modified.isoformat(),
+            'contract_count': self.contract_count,
+            'total_vat_difference': self.total_vat_difference,
+            'new_cost': self.new_cost,
+            'checked_count': self.checked_count,
+            'checked_vat_difference': self.checked_vat_difference,
+            'rates': list(self.rates),
+            'mtime': self.mtime,
+            'size': self.size,
+        }
+
+    @classmethod
+    def from_dict(cls, folder, data):
+        return cls(
+            folder=folder,
+            name=data['name'],
+            created=datetime.fromisoformat(data['created']),
+            modified=datetime.fromisoformat(data['modified']),
+            contract_count=int(data.get('contract_count', 0)),
+            total_vat_difference=float(data.get('total_vat_difference', 0.0)),
+            new_cost=float(data.get('new_cost', 0.0)),
+            checked_count=int(data.get('checked_count', 0)),
+            checked_vat_difference=float(data.get('checked_vat_difference', 0.0)),
+            rates=tuple(map(float, data.get('rates', (0.0, 0.0)))),
+            mtime=int(data.get('mtime', 0)),
+            size=int(data.get('size', 0)),
+        )
+
+
+class ProjectIndex:
+    """
+    Общий индекс проектов (index.json в папке проектов).
+
+    Запись о проекте действительна, пока совпадают mtime и размер его файлов;
+    устаревшие и новые проекты перечитываются один раз и индекс обновляется.
+    """
+
+    def __init__(self, projects_dir=None):
+        self.projects_dir = Path(projects_dir) if projects_dir else get_projects_dir()
+        self.index_file = self.projects_dir / INDEX_FILE_NAME
+        self.entries = {}  # folder -> ProjectSummary
+        self.last_changes = {}  # Итог последнего scan(): folder -> 'added' | 'changed' | 'removed'
+        self._lock = threading.RLock()   # scan() может идти в фоне, пока сохраняется проект
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                return
+            for folder, entry in data.get('projects', {}).items():
+                try:
+                    self.entries[folder] = ProjectSummary.from_dict(folder, entry)
+                except (KeyError, TypeError, ValueError):
+                    continue
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            # Повреждённый индекс просто строится заново
+            print(f"[ProjectIndex] Не удалось прочитать индекс: {e}")
+
+    def save(self):
+        """Атомарно записывает индекс (временный файл + замена)."""
+        self.projects_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': INDEX_VERSION,
+            'projects': {folder: s.to_dict() for folder, s in self.entries.items()},
+        }
+        tmp_file = self.index_file.with_suffix('.tmp')
+        with _save_lock:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_file, self.index_file)
+
+    def update(self, project):
+        """Обновляет запись о только что сохранённом проекте."""
+        return self.record(ProjectSummary.from_project(project))
+
+    def record(self, summary):
+        """
+        Записывает сводку только что сохранённого проекта с подписью его файлов на диске.
+        Сводку собирают в главном потоке (ProjectSummary.from_project), запись можно вести в фоне.
+        """
+        summary.mtime, summary.size = ProjectStore(summary.project_dir).signature()
+        with self._lock:
+            self.entries[summary.folder] = summary
+            self.save()
+        return summary
+
+    def remove(self, folder):
+        with self._lock:
+            if self.entries.pop(folder, None) is not None:
+                self.save()
+
+    def scan(self, summarize, workers=None):
+        """
+        Сверяет индекс с папкой проектов и возвращает сводки, новые сверху.
+        summarize(path, signature, rates) загружает проект и возвращает его ProjectSummary —
+        вызывается только для новых и изменённых проектов, при большом объёме — в пуле процессов
+        (поэтому это должна быть функция уровня модуля). Что изменилось — в last_changes.
+        """
+        changes = {}
+        seen = set()
+        stale = []      # (папка, файл проекта, подпись)
+        for proj_file in self.projects_dir.glob("*/project.vat"):
+            folder = proj_file.parent.name
+            seen.add(folder)
+            try:
+                signature = ProjectStore(proj_file.parent).signature()
+            except OSError:
+                continue
+            entry = self.entries.get(folder)
+            if entry is None or not entry.matches(signature):
+                stale.append((folder, proj_file, signature))
+
+        rates = (Contract.current_vat_rate, Contract.future_vat_rate)
+        summaries = list(self._summarize(stale, summarize, rates, workers))
+
+        with self._lock:
+            for folder, summary in summaries:
+                if summary is not None:
+                    summary.folder = folder
+                    changes[folder] = 'changed' if folder in self.entries else 'added'
+                    self.entries[folder] = summary
+                elif self.entries.pop(folder, None) is not None:
+                    changes[folder] = 'removed'
+
+            for folder in set(self.entries) - seen:
+                del self.entries[folder]
+                changes[folder] = 'removed'
+
+            if changes:
+                try:
+                    self.save()
+                except OSError as e:
+                    print(f"[ProjectIndex] Не удалось сохранить индекс: {e}")
+
+            self.last_changes = changes
+            return sorted(self.entries.values(), key=lambda s: s.modified, reverse=True)
+
+    @staticmethod
+    def _summarize(stale, summarize, rates, workers):
+        """Сводки по изменённым проектам: (папка, ProjectSummary или None при ошибке чтения)."""
+        total_size = sum(signature[1] for _, _, signature in stale)
+        workers = workers or min(len(stale), os.cpu_count() or 1)
+        if workers < 2 or len(stale) < 2 or total_size < PARALLEL_MIN_BYTES:
+            for folder, proj_file, signature in stale:
+                try:
+                    yield folder, summarize(proj_file, signature, rates)
+                except Exception as e:
+                    print(f"[ProjectIndex] Не удалось прочитать проект {folder}: {e}")
+                    yield folder, None
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(folder, pool.submit(summarize, proj_file, signature, rates))
+                       for folder, proj_file, signature in stale]
+            for folder, future in futures:
+                try:
+                    yield folder, future.result()
+                except Exception as e:
+                    print(f"[ProjectIndex] Не удалось прочитать проект {folder}: {e}")
+                    yield folder, None
@@ -1,12 +1,35 @@
 # core/project_manager.py
-import pickle
-import zlib
 import shutil
 from datetime import datetime
 from pathlib import Path
 from core.config import get_projects_dir, get_current_vat, get_future_vat
+from core.contract_table import ContractTable
 from core.contracts import Contract
-from utils.format import format_money
+from core.project_index import ProjectIndex, ProjectSummary
+from core.portfolio import PortfolioTotals
+from core.storage import ProjectData, ProjectStore
+from utils.diagnostics import timed
+from utils.format import format_money, format_money_column
+
+
+def export_headers(current_vat=None, future_vat=None):
+    """Шапка экспорта — 12 колонок, как в таблице редактора. Ставки — в процентах (по умолчанию из настроек)."""
+    current_vat = get_current_vat() if current_vat is None else current_vat
+    future_vat = get_future_vat() if future_vat is None else future_vat
+    return [
+        "Выполнено",
+        "Название договора",
+        "№ договора",
+        "Сумма договора",
+        "Факт на 31.12.2025",
+        "Остаток на 2026",
+        "Остаток без НДС",
+        f"НДС - {current_vat:g}%",
+        f"НДС - {future_vat:g}%",
+        "Остаток с будущим НДС",
+        "Новая стоимость договора",
+        "Сумма увеличения по ДС",
+    ]
 
 
 class VATProject:
@@ -14,8 +37,15 @@ class VATProject:
         self.name = name or f"Проект_{datetime.now():%Y%m%d_%H%M%S}"
         self.created = datetime.now()
         self.modified = datetime.now()
-        self.contracts = []  # List[Contract]
+        self.contracts = ContractTable()
         self.settings = {'current_vat': 20.0, 'future_vat': 22.0}
+        self._saved_dir = None            # Папка, с которой синхронизировано состояние на диске
+        self._full_save_needed = False    # Прошлая запись не удалась — журналу доверять нельзя
+
+    @property
+    def totals(self):
+        """Итоги проекта (ProjectTotals), обновляются при каждом изменении договоров."""
+        return self.contracts.totals
 
     @property
     def folder_name(self):
@@ -31,100 +61,220 @@ class VATProject:
     def project_file(self):
         return self.project_dir / "project.vat"
 
+    @property
+    def is_saved(self) -> bool:
+        """Проект записан в свою папку под текущим именем — изменения можно дописывать журналом."""
+        return self._saved_dir is not None and self._saved_dir == self.project_dir
+
+    def snapshot(self):
+        """
+        Копия проекта для фоновой задачи (сохранение, экспорт):
+        пока задача идёт, пользователь может продолжать править оригинал.
+        """
+        copy = VATProject(self.name)
+        copy.created = self.created
+        copy.modified = self.modified
+        copy.settings = dict(self.settings)
+        copy.contracts = self.contracts.copy()
+        copy._full_save_needed = True
+        return copy
+
+    def to_data(self) -> ProjectData:
+        """Полное состояние проекта для записи на диск."""
+        table = self.contracts
+        return ProjectData(
+            name=self.name,
+            created=self.created,
+            modified=self.modified,
+            settings=dict(self.settings),
+            next_id=table._next_id,
+            ids=table.ids,
+            names=table.names,
+            numbers=table.numbers,
+            totals=table.total,
+            remainings=table.remaining,
+            checked=table.checked,
+        )
+
+    def prepare_save(self) -> "SaveTask":
+        """
+        Собирает то, что нужно записать, в главном потоке; саму запись (SaveTask.run)
+        можно выполнять в фоне. Обычно это только изменённые договоры для журнала.
+        Полные данные (to_data) — копия колонок, так что запись не зависит от правок,
+        которые идут параллельно с ней (автосохранение).
+        """
+        store = ProjectStore(self.project_dir)
+        full = self._full_save_needed or self._saved_dir != store.project_dir or not store.exists()
+        compact = not full and store.needs_compaction()
+        if full:
+            task = SaveTask(self, store, full_data=self.to_data())
+        else:
+            puts, deleted = self.contracts.take_changes()
+            meta = {
+                'name': self.name,
+                'modified': self.modified.isoformat(),
+                'settings': self.settings,
+                'next_id': self.contracts._next_id,
+            }
+            compact_data = self.to_data() if compact else None
+            task = SaveTask(self, store, meta=meta, puts=puts, deleted=deleted, compact_data=compact_data)
+        self.contracts.mark_clean()
+        self._full_save_needed = False
+        self._saved_dir = store.project_dir
+        return task
+
     def save(self):
-        self.project_dir.mkdir(parents=True, exist_ok=True)
-        data = {
-            'name': self.name,
-            'created': self.created,
-            'modified': self.modified,
-            'contracts': [c.__dict__ for c in self.contracts],
-            'settings': self.settings
-        }
-        compressed = zlib.compress(pickle.dumps(data))
-        with open(self.project_file, "wb") as f:
-            f.write(compressed)
+        self.prepare_save().run()
 
     @classmethod
+    @timed("VATProject.load", rows=lambda project, *_: len(project.contracts))
     def load(cls, project_path: Path):
-        with open(project_path, "rb") as f:
-            data = pickle.loads(zlib.decompress(f.read()))
-
-        project = cls(data.get("name", "Без имени"))
-        project.created = data.get("created", datetime.now())
-        project.modified = data.get("modified", datetime.now())
-        project.settings = data.get("settings", {})
-
-        for c_dict in data.get("contracts", []):
-            # Восстанавливаем ВСЕ поля, включая is_modified
-            contract = Contract(
-                is_modified=c_dict.get("is_modified", False),
-                name=c_dict.get("name", "Договор"),
-                number=c_dict.get("number", ""),
-                total_cost_with_vat=c_dict.get("total_cost_with_vat", 0.0),
-                remaining_cost=c_dict.get("remaining_cost", 0.0),
-            )
-            project.contracts.append(contract)
+        store = ProjectStore(Path(project_path).parent)
+        data = store.read()
+
+        project = cls(data.name)
+        project.created = data.created
+        project.modified = data.modified
+        project.settings = data.settings
+
+        # Восстанавливаем ВСЕ поля, включая is_modified — сразу колонками
+        project.contracts.extend_columns(data.names, data.numbers, data.totals, data.remainings,
+                                         data.checked, ids=data.ids, interned=True)
+        project.contracts._next_id = max(project.contracts._next_id, data.next_id)
+        project.contracts.mark_clean()
+        project._saved_dir = store.project_dir
+        # Файл старого формата переписываем в новый при первом же сохранении
+        project._full_save_needed = data.legacy
         return project
 
     @classmethod
-    def list_projects(cls):
-        projects = []
-        for proj_file in get_projects_dir().glob("*/project.vat"):
-            try:
-                projects.append(cls.load(proj_file))
-            except:
-                continue
-        return sorted(projects, key=lambda p: p.modified, reverse=True)
+    @timed("VATProject.list_projects", rows=lambda projects, *_: len(projects))
+    def list_projects(cls, index=None):
+        """
+        Сводки (ProjectSummary) по всем проектам, новые сверху.
+        Полностью загружаются только проекты, изменённые с прошлого обновления индекса.
+        """
+        index = index or ProjectIndex()
+        return index.scan(summarize_project)
 
+    def iter_export_rows(self, rates=None):
+        """
+        Строки экспорта в порядке export_headers(): суммы — числами, без форматирования.
+        Последняя строка — ИТОГО с суммой доп. НДС.
+        rates — (текущая, будущая) ставки-множители для сценария; по умолчанию ставки Contract.
+        """
+        table = self.contracts
+        derived = table.compute(*(rates or ()))   # В копейках
+        for checked, name, number, total, remaining, difference, without, vat, vat_future, new_cost, diff in zip(
+                table.checked, table.names, table.numbers, table.total, table.remaining, *derived):
+            new_cost /= 100
+            yield ("✓" if checked else "-", name, number or "", total, remaining, difference / 100,
+                   without / 100, vat / 100, vat_future / 100, new_cost, new_cost, diff / 100)
+        total = self.totals.vat_difference if rates is None else sum(derived.vat_difference) / 100
+        yield ("ИТОГО",) + ("",) * 10 + (total,)
+
+    @timed("VATProject.get_export_data", rows=lambda data, *_: len(data) - 1)
     def get_export_data(self):
         """
         Возвращает список словарей для экспорта в Excel с расширенными расчётами
         """
-        data = []
-        total_diff = 0.0
-
-        for contract in self.contracts:
-            diff = contract.get_vat_difference()
-            total_diff += diff
-
-            data.append({
-                "Выполнено": "✓" if contract.is_modified else "-",
-                "Название договора": contract.name,
-                "№ договора": contract.number or "",
-                "Сумма договора": format_money(contract.total_cost_with_vat),
-                "Факт на 31.12.2025": format_money(contract.remaining_cost),
-                "Остаток на 2026": format_money(contract.get_difference()),
-                "Остаток без НДС": format_money(contract.get_without()),
-                f"НДС - {int(get_current_vat())}%": format_money(contract.getVAT()),
-                f"НДС - {int(get_future_vat())}%": format_money(contract.getVATfut()),
-                "Остаток с будущим НДС": format_money(contract.getDiffWith()),
-                "Новая стоимость договора": format_money(contract.getNewCost()),
-                "Сумма увеличения по ДС": format_money(diff),
-            })
-
-        # Итоговая строка
-        data.append({
-            "Выполнено": 'ИТОГО',
-            "Название договора": "",
-            "№ договора": "",
-            "Сумма договора": "",
-            "Факт на 31.12.2025": "",
-            "Остаток на 2026": "",
-            "Остаток без НДС": "",
-            f"НДС - {int(get_current_vat())}%": "",
-            f"НДС - {int(get_future_vat())}%": "",
-            "Остаток с будущим НДС": "",
-            "Новая стоимость договора": "",
-            "Сумма увеличения по ДС": format_money(total_diff),
-        })
-
+        headers = export_headers()
+        *rows, total_row = self.iter_export_rows()
+        # Денежные колонки форматируются целиком, по колонке за вызов
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in headers]
+        for i in range(3, len(headers)):
+            columns[i] = format_money_column(columns[i])
+        data = [dict(zip(headers, row)) for row in zip(*columns)]
+        total_row = list(total_row)
+        total_row[-1] = format_money(total_row[-1])
+        data.append(dict(zip(headers, total_row)))
         return data
 
 
+def summarize_project(project_file, signature, rates):
+    """
+    Загружает проект и возвращает его ProjectSummary (для ProjectIndex.scan).
+    Может выполняться в рабочем процессе — ставки НДС передаются явно.
+    """
+    if (Contract.current_vat_rate, Contract.future_vat_rate) != tuple(rates):
+        Contract.current_vat_rate, Contract.future_vat_rate = rates
+    project = VATProject.load(project_file)
+    return ProjectSummary.from_project(project, signature)
+
+
+class SaveTask:
+    """
+    Запись проекта, подготовленная VATProject.prepare_save(). run() не обращается к живому
+    проекту и может выполняться в фоновом потоке.
+    """
+
+    def __init__(self, project, store, full_data=None, meta=None, puts=(), deleted=(), compact_data=None):
+        self.project = project
+        self.store = store
+        self.full_data = full_data
+        self.meta = meta
+        self.puts = puts
+        self.deleted = deleted
+        self.compact_data = compact_data
+        self.compaction = None    # Поток фонового сжатия журнала, если оно запущено
+
+    @property
+    def change_count(self) -> int:
+        if self.full_data is not None:
+            return len(self.full_data.ids)
+        return len(self.puts) + len(self.deleted)
+
+    @timed("VATProject.save", rows=lambda task, *_: task.change_count)
+    def run(self):
+        try:
+            if self.full_data is not None:
+                with self.store.exclusive():
+                    self.store.write_full(self.full_data)
+                    self.store.remove_journals()
+            else:
+                self.store.append(self.meta, self.puts, self.deleted)
+                if self.compact_data is not None:
+                    self.compaction = self.store.start_compaction(self.compact_data)
+        except BaseException:
+            # Изменения уже забраны из таблицы — следующая запись будет полной
+            self.project._full_save_needed = True
+            raise
+        return self
+
+
 class ProjectManager:
-    def __init__(self):
-        self.projects = VATProject.list_projects()
+    def __init__(self, scan=True):
+        """scan=False — список проектов не читается сразу: его заполняет apply_scan(scan()) из фона."""
+        self.index = None
+        self.projects = []  # List[ProjectSummary]
         self.current_project = None
+        self.loaded = False
+        self.revision = 0   # Растёт при каждом сохранении и удалении: фоновое сканирование могло устареть
+        if scan:
+            self.refresh()
+
+    def scan(self):
+        """
+        Сверяет индекс с папкой проектов: перечитываются только добавленные и изменённые
+        проекты (по mtime и размеру файлов). Сам менеджер не меняется — результат
+        применяет apply_scan(), поэтому scan() можно вызывать в фоновом потоке.
+        """
+        index = self.index
+        if index is None or index.projects_dir != get_projects_dir():
+            index = ProjectIndex()   # Первый запуск или сменилась папка проектов
+        projects = VATProject.list_projects(index)
+        return index, projects, dict(index.last_changes)
+
+    def apply_scan(self, result) -> dict:
+        """Применяет результат scan(); возвращает изменения: folder -> 'added' | 'changed' | 'removed'."""
+        self.index, self.projects, changes = result
+        self.loaded = True
+        return changes
+
+    def refresh(self):
+        """Сверяет список проектов с папкой (через индекс)."""
+        self.apply_scan(self.scan())
+        return self.projects
 
     def create_project_in_memory(self, name="Новый проект"):
         return VATProject(name)
@@ -132,19 +282,51 @@ class ProjectManager:
     def create_project(self, name):
         project = VATProject(name)
         project.save()
-        self.projects.insert(0, project)
+        self.project_saved(project)
         self.current_project = project
         return project
 
+    def save_project(self, project):
+        project.save()
+        return self.project_saved(project)
+
+    def prepare_index_update(self, project):
+        """
+        Для сохранения в фоне: сводка проекта собирается сейчас, в главном потоке, а возвращённая
+        функция записывает её в индекс (index.json) — её вызывают в фоновой задаче после записи
+        проекта, а результат передают в project_saved(project, summary).
+        """
+        summary = ProjectSummary.from_project(project)
+        return lambda: (self.index or ProjectIndex()).record(summary)
+
+    def project_saved(self, project, summary=None):
+        """
+        Обновляет индекс и список после сохранения проекта — без пересканирования папки.
+        summary — сводка, уже записанная в индекс в фоне (prepare_index_update).
+        """
+        self.revision += 1
+        if summary is None:
+            summary = (self.index or ProjectIndex()).update(project)
+        self.projects = [s for s in self.projects if s.folder != summary.folder]
+        self.projects.insert(0, summary)
+        return summary
+
+    def portfolio(self) -> PortfolioTotals:
+        """Итоги по всем проектам — из сводок индекса, без загрузки договоров."""
+        return PortfolioTotals(self.projects)
+
     def load_project(self, project):
         reloaded = VATProject.load(project.project_file)
         self.current_project = reloaded
         return reloaded
 
     def delete_project(self, project):
-        if project.project_dir.exists():
-            shutil.rmtree(project.project_dir)
-        if project in self.projects:
-            self.projects.remove(project)
-        if self.current_project == project:
-            self.current_project = None
\ No newline at end of file
+        with ProjectStore(project.project_dir).exclusive():   # Не во время сжатия журнала
+            if project.project_dir.exists():
+                shutil.rmtree(project.project_dir)
+        folder = project.project_dir.name
+        self.revision += 1
+        (self.index or ProjectIndex()).remove(folder)
+        self.projects = [s for s in self.projects if s.folder != folder]
+        if self.current_project is not None and self.current_project.project_dir == project.project_dir:
+            self.current_project = None
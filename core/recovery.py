@@ -0,0 +1,45 @@
+# core/recovery.py
+"""
+Копии для восстановления после сбоя: состояние проекта, которое автосохранение ещё не может
+дописать в папку проекта (новый проект или переименованный, но не сохранённый).
+
+Копии лежат в локальной папке приложения (config.RECOVERY_DIR), а не в папке проектов —
+та может быть общей. Одна копия на окно редактора, ключ выдаёт new_recovery_key();
+при сохранении проекта или закрытии окна копия удаляется, после сбоя — остаётся.
+"""
+import shutil
+import time
+
+from core.config import RECOVERY_DIR
+from core.storage import BASE_FILE, ProjectStore
+
+
+def new_recovery_key() -> str:
+    return str(time.time_ns())
+
+
+def write_recovery(key, data):
+    """Атомарно перезаписывает копию ProjectData (вызывается в фоне)."""
+    ProjectStore(RECOVERY_DIR / key).write_full(data)
+
+
+def remove_recovery(key):
+    shutil.rmtree(RECOVERY_DIR / key, ignore_errors=True)
+
+
+def list_recovery() -> list:
+    """Ключи оставшихся копий, от новых к старым."""
+    if not RECOVERY_DIR.is_dir():
+        return []
+    paths = [path for path in RECOVERY_DIR.iterdir() if (path / BASE_FILE).is_file()]
+    paths.sort(key=lambda path: (path / BASE_FILE).stat().st_mtime, reverse=True)
+    return [path.name for path in paths]
+
+
+def load_recovery(key):
+    """Проект из копии — как новый, ещё не записанный в папку проектов."""
+    from core.project_manager import VATProject
+    project = VATProject.load(RECOVERY_DIR / key / BASE_FILE)
+    project._saved_dir = None
+    project._full_save_needed = True
+    return project
@@ -0,0 +1,129 @@
+# core/scenarios.py
+"""
+Сценарии ставок НДС: расчёт доп. НДС каждого договора сразу для нескольких пар
+(текущая ставка, будущая ставка) без смены ставок Contract и перезапуска программы.
+"""
+import re
+from array import array
+from operator import sub
+from typing import NamedTuple
+
+from core.money import base_columns, future_vat_column, kopeck_column, rate_units
+
+DEFAULT_SCENARIOS_TEXT = "18→20; 20→22; 20→25"
+
+# Пара ставок и следующая за ней запятая-разделитель. Дробная часть может быть через запятую:
+# «18,5→20,5» — если после числа нет запятой-разделителя, возврат к короткому числу даёт «18→20,20→22»
+_PAIR = re.compile(r'[\s,]*(\d+(?:[.,]\d+)?)\s*%?\s*(?:→|->|-|>|/)\s*(\d+(?:[.,]\d+)?)\s*%?\s*(?:,|$)')
+
+
+class Scenario(NamedTuple):
+    """Пара ставок в процентах: 20 → 22."""
+    current: float
+    future: float
+
+    @property
+    def label(self) -> str:
+        return f"{self.current:g}→{self.future:g}%"
+
+    @property
+    def rates(self) -> tuple:
+        """Множители, как Contract.current_vat_rate / future_vat_rate: (1.2, 1.22)."""
+        return 1 + self.current / 100, 1 + self.future / 100
+
+
+def parse_scenarios(text: str) -> list:
+    """
+    «18→20; 20-22, 20/25» или «18→20,20→22» → [Scenario(18, 20), ...].
+    Сценарии разделяются «;», переводом строки или запятой. Повторы убираются, порядок сохраняется.
+    """
+    scenarios = []
+    for line in re.split(r'[;\n]', text):
+        pos = 0
+        while line[pos:].strip(" \t,"):
+            match = _PAIR.match(line, pos)
+            if not match:
+                part = line[pos:].strip(" \t,").split(',')[0].strip()
+                raise ValueError(f"Не удалось разобрать сценарий «{part}». Формат: 20→22")
+            pos = match.end()
+            current, future = (float(v.replace(',', '.')) for v in match.groups())
+            if not (0 <= current < 100 and 0 <= future < 100):
+                raise ValueError(f"Ставка вне диапазона 0–100%: «{match.group(0).strip(' ,')}»")
+            scenario = Scenario(current, future)
+            if scenario not in scenarios:
+                scenarios.append(scenario)
+    if not scenarios:
+        raise ValueError("Не задано ни одного сценария")
+    return scenarios
+
+
+class ScenarioTotals(NamedTuple):
+    """Итоги сценария в рублях."""
+    without: float
+    vat: float
+    vat_future: float
+    new_cost: float
+    vat_difference: float
+    checked_vat_difference: float
+
+
+class ScenarioMatrix:
+    """
+    Доп. НДС по всем договорам × всем сценариям (в копейках).
+
+    Суммы переводятся в копейки один раз; база без НДС и текущий НДС считаются один раз
+    на каждую различную текущую ставку, а для каждого сценария добавляется только
+    будущий НДС — так 20→22 и 20→25 делят общий проход.
+    """
+
+    def __init__(self, table, scenarios):
+        self.scenarios = list(scenarios)
+        self.names = list(table.names)
+        self.numbers = list(table.numbers)
+        self.checked = array('b', table.checked)
+        self.total_k = kopeck_column(table.total)
+        self.remaining_k = kopeck_column(table.remaining)
+
+        base = {}           # текущая ставка → (без НДС, НДС)
+        self.difference = array('q')
+        self.columns = []   # доп. НДС по сценариям
+        self.totals = []
+        for scenario in self.scenarios:
+            cur_u, fut_u = (rate_units(rate) for rate in scenario.rates)
+            if cur_u not in base:
+                self.difference, without, vat = base_columns(self.total_k, self.remaining_k, cur_u)
+                base[cur_u] = without, vat
+            without, vat = base[cur_u]
+            vat_future = future_vat_column(without, fut_u)
+            vat_difference = array('q', map(sub, vat_future, vat))
+            self.columns.append(vat_difference)
+
+            without_sum, vat_future_sum = sum(without), sum(vat_future)
+            self.totals.append(ScenarioTotals(
+                without=without_sum / 100,
+                vat=sum(vat) / 100,
+                vat_future=vat_future_sum / 100,
+                new_cost=(without_sum + vat_future_sum) / 100,
+                vat_difference=sum(vat_difference) / 100,
+                checked_vat_difference=sum(d for d, c in zip(vat_difference, self.checked) if c) / 100,
+            ))
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, index) -> tuple:
+        """Доп. НДС строки по всем сценариям, в рублях."""
+        return tuple(column[index] / 100 for column in self.columns)
+
+    def iter_rows(self):
+        """Строки сравнения: название, №, остаток на 2026 и доп. НДС по сценариям (в рублях)."""
+        for i, (name, number, difference) in enumerate(zip(self.names, self.numbers, self.difference)):
+            yield (name, number or "", difference / 100) + self.row(i)
+
+    def headers(self) -> list:
+        return ["Название договора", "№ договора", "Остаток на 2026"] + [
+            f"Доп. НДС {s.label}" for s in self.scenarios]
+
+    def total_row(self) -> tuple:
+        return ("ИТОГО", "", sum(self.difference) / 100) + tuple(t.vat_difference for t in self.totals)
+
@@ -0,0 +1,344 @@
+# core/storage.py
+import io
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from core.binary_format import is_columnar, read_columnar, write_columnar
+
+BASE_FILE = "project.vat"
+JOURNAL_FILE = "journal.jsonl"
+OLD_JOURNAL_PATTERN = "journal.*.old.jsonl"   # Журналы, поглощаемые сжатием: journal.<номер>.old.jsonl
+
+# Сжатие журнала запускается, когда он больше половины основного файла (но не меньше порога)
+COMPACT_MIN_BYTES = 256 * 1024
+COMPACT_RATIO = 0.5
+
+# Сколько раз перечитывать проект, если фоновое сжатие меняет его прямо во время чтения
+READ_ATTEMPTS = 5
+
+
+class ProjectData:
+    """
+    Состояние проекта на диске в нейтральном виде: метаданные и колонки договоров.
+    VATProject превращает его в ContractTable и обратно.
+    Числовые колонки — array (как в ContractTable), строковые — списки интернированных строк.
+    legacy=True — прочитан файл старого формата, следующее сохранение должно быть полным.
+    """
+    __slots__ = ('name', 'created', 'modified', 'settings', 'next_id',
+                 'ids', 'names', 'numbers', 'totals', 'remainings', 'checked', 'legacy')
+
+    def __init__(self, name, created, modified, settings, next_id=1,
+                 ids=(), names=(), numbers=(), totals=(), remainings=(), checked=(), legacy=False):
+        self.name = name
+        self.created = created
+        self.modified = modified
+        self.settings = settings
+        self.next_id = next_id
+        self.ids = array('q', ids)
+        self.names = list(names)
+        self.numbers = list(numbers)
+        self.totals = array('d', totals)
+        self.remainings = array('d', remainings)
+        self.checked = array('b', (bool(c) for c in checked)) if not isinstance(checked, array) else array('b', checked)
+        self.legacy = legacy
+
+    def apply_journal(self, records):
+        """Накатывает записи журнала: put — изменить/добавить строку по id, del — удалить."""
+        positions = {row_id: i for i, row_id in enumerate(self.ids)}
+        deleted = set()
+        for record in records:
+            op = record.get('op')
+            if op == 'put':
+                row_id = record['id']
+                values = (_intern(record['name']), _intern(record['number']), float(record['total']),
+                          float(record['remaining']), bool(record['checked']))
+                i = positions.get(row_id)
+                if i is None:
+                    positions[row_id] = len(self.ids)
+                    self.ids.append(row_id)
+                    for column, value in zip(self._value_columns(), values):
+                        column.append(value)
+                else:
+                    for column, value in zip(self._value_columns(), values):
+                        column[i] = value
+                deleted.discard(row_id)
+                self.next_id = max(self.next_id, row_id + 1)
+            elif op == 'del':
+                if record['id'] in positions:
+                    deleted.add(record['id'])
+            elif op == 'meta':
+                self.name = record.get('name', self.name)
+                self.modified = _parse_dt(record.get('modified'), self.modified)
+                self.settings = record.get('settings', self.settings)
+                self.next_id = max(self.next_id, record.get('next_id', 1))
+
+        if deleted:
+            keep = [i for i, row_id in enumerate(self.ids) if row_id not in deleted]
+            self.ids = array('q', (self.ids[i] for i in keep))
+            self.names = [self.names[i] for i in keep]
+            self.numbers = [self.numbers[i] for i in keep]
+            self.totals = array('d', (self.totals[i] for i in keep))
+            self.remainings = array('d', (self.remainings[i] for i in keep))
+            self.checked = array('b', (self.checked[i] for i in keep))
+
+    def _value_columns(self):
+        return self.names, self.numbers, self.totals, self.remainings, self.checked
+
+
+def _intern(value):
+    """Строки ProjectData интернированы, как в ContractTable."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _parse_dt(value, default):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _atomic_write(path: Path, write):
+    """Временный файл + fsync + os.replace: файл либо старый, либо полностью новый.
+    write(f) пишет содержимое в открытый двоичный файл."""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    """Старые project.vat — pickle словаря; разрешаем только datetime, чтобы чужой файл
+    не мог выполнить произвольный код при открытии."""
+    ALLOWED = {('datetime', 'datetime'), ('datetime', 'date'), ('datetime', 'timedelta')}
+
+    def find_class(self, module, name):
+        if (module, name) in self.ALLOWED:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Недопустимый объект в файле проекта: {module}.{name}")
+
+
+class ProjectStore:
+    """
+    Хранилище проекта в его папке: основной файл project.vat и журнал изменений.
+
+    Сохранение дописывает в журнал только изменённые договоры (одной пачкой с
+    завершающей записью commit), поэтому его стоимость зависит от размера изменения.
+    Недописанная при сбое пачка при чтении отбрасывается. Когда журнал разрастается,
+    он сжимается в фоне: основной файл переписывается атомарно, журнал удаляется.
+
+    Основной файл — двоичный колоночный формат (core.binary_format), читается через mmap.
+    Файлы прежнего формата (zlib + pickle) читаются и переписываются при следующем сохранении.
+    """
+    _compacting = set()         # Папки, где идёт фоновое сжатие (или полная запись/удаление — см. exclusive)
+    _lock = threading.Lock()
+    _idle = threading.Condition(_lock)
+
+    def __init__(self, project_dir):
+        self.project_dir = Path(project_dir)
+        self.base_file = self.project_dir / BASE_FILE
+        self.journal_file = self.project_dir / JOURNAL_FILE
+
+    # ========================
+    # Чтение
+    # ========================
+
+    def exists(self) -> bool:
+        return self.base_file.exists()
+
+    def read(self) -> ProjectData:
+        """
+        Основной файл и журналы. Журналы перечисляются до чтения основного файла; если за время
+        чтения фоновое сжатие заменило файл или перенесло журнал (изменились подпись или список
+        старых журналов), чтение повторяется — иначе поглощённые сжатием изменения потеряются.
+        """
+        for _ in range(READ_ATTEMPTS):
+            journals = self.old_journals()
+            state = (self.signature(), journals)
+            data = self.read_base()
+            for journal in journals + [self.journal_file]:
+                data.apply_journal(self.read_journal(journal))
+            if (self.signature(), self.old_journals()) == state:
+                break
+        return data
+
+    def old_journals(self):
+        """Журналы, отправленные на сжатие, по порядку. Повторное чтение уже сжатого безопасно:
+        записи в них — абсолютные значения, поэтому результат не меняется."""
+        def number(path):
+            try:
+                return int(path.name.split(".")[1])
+            except (IndexError, ValueError):
+                return 0
+        return sorted(self.project_dir.glob(OLD_JOURNAL_PATTERN), key=number)
+
+    def read_base(self) -> ProjectData:
+        if is_columnar(self.base_file):
+            fields = read_columnar(self.base_file)
+            now = datetime.now()
+            fields['created'] = _parse_dt(fields['created'], now)
+            fields['modified'] = _parse_dt(fields['modified'], now)
+            return ProjectData(**fields)
+        return self.read_legacy_base()
+
+    def read_legacy_base(self) -> ProjectData:
+        """Файл прежнего формата: zlib-сжатый pickle словаря с договорами."""
+        with open(self.base_file, "rb") as f:
+            raw = _LegacyUnpickler(io.BytesIO(zlib.decompress(f.read()))).load()
+        contracts = raw.get("contracts", [])
+        # В файлах старых версий у договоров нет id — нумеруем по порядку
+        ids = [c.get("id", i) for i, c in enumerate(contracts, 1)]
+        return ProjectData(
+            name=raw.get("name", "Без имени"),
+            created=raw.get("created", datetime.now()),
+            modified=raw.get("modified", datetime.now()),
+            settings=raw.get("settings", {}),
+            next_id=max(raw.get("next_id", 1), max(ids, default=0) + 1),
+            ids=ids,
+            names=[_intern(c.get("name", "Договор")) for c in contracts],
+            numbers=[_intern(c.get("number", "")) for c in contracts],
+            totals=[c.get("total_cost_with_vat", 0.0) for c in contracts],
+            remainings=[c.get("remaining_cost", 0.0) for c in contracts],
+            checked=[c.get("is_modified", False) for c in contracts],
+            legacy=True,
+        )
+
+    @staticmethod
+    def read_journal(path: Path):
+        """Записи журнала из завершённых пачек (до последнего commit)."""
+        records, pending = [], []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        pending = []  # Обрыв пачки при сбое — её записи не применяются
+                        continue
+                    if record.get('op') == 'commit':
+                        records.extend(pending)
+                        pending = []
+                    else:
+                        pending.append(record)
+        except FileNotFoundError:
+            pass
+        return records
+
+    def signature(self):
+        """(наибольший mtime, суммарный размер) файлов проекта — для индекса проектов."""
+        mtime = size = 0
+        for path in [self.base_file, self.journal_file] + self.old_journals():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            mtime = max(mtime, stat.st_mtime_ns)
+            size += stat.st_size
+        return mtime, size
+
+    # ========================
+    # Запись
+    # ========================
+
+    def write_full(self, data: ProjectData):
+        """Полная атомарная запись основного файла; журналы после неё не нужны."""
+        self.project_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.base_file, lambda f: write_columnar(f, data))
+
+    def append(self, meta, puts, deleted):
+        """Дописывает в журнал одну пачку изменений и принудительно сбрасывает её на диск."""
+        lines = [{'op': 'meta', **meta}]
+        lines.extend({'op': 'put', **row} for row in puts)
+        lines.extend({'op': 'del', 'id': row_id} for row_id in deleted)
+        lines.append({'op': 'commit'})
+        payload = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode("utf-8")
+        with open(self.journal_file, "a+b") as f:
+            # Если прошлая запись оборвалась посреди строки, начинаем с новой строки
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    payload = b"\n" + payload
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def needs_compaction(self) -> bool:
+        try:
+            journal_size = self.journal_file.stat().st_size
+        except FileNotFoundError:
+            return False
+        try:
+            base_size = self.base_file.stat().st_size
+        except FileNotFoundError:
+            base_size = 0
+        return journal_size > max(COMPACT_MIN_BYTES, base_size * COMPACT_RATIO)
+
+    def start_compaction(self, data: ProjectData):
+        """
+        Переносит текущий журнал в journal.<номер>.old и в фоне переписывает основной файл
+        состоянием data (data должно включать все изменения из журналов). Новые сохранения
+        идут в новый журнал. Возвращает поток сжатия или None, если сжатие уже идёт.
+        """
+        key = str(self.project_dir)
+        with self._lock:
+            if key in self._compacting:
+                return None
+            self._compacting.add(key)
+            rotated = self.project_dir / OLD_JOURNAL_PATTERN.replace("*", str(time.time_ns()))
+            os.replace(self.journal_file, rotated)
+            absorbed = self.old_journals()
+
+        def compact():
+            try:
+                self.write_full(data)
+                for path in absorbed:
+                    path.unlink(missing_ok=True)
+            except Exception as e:
+                # Старые журналы остаются и будут прочитаны при загрузке — данные не теряются
+                print(f"[ProjectStore] Не удалось сжать журнал: {e}")
+            finally:
+                with self._idle:
+                    self._compacting.discard(key)
+                    self._idle.notify_all()
+
+        thread = threading.Thread(target=compact, name="vat-compact", daemon=False)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Для полной записи и удаления папки: ждёт окончания фонового сжатия и не даёт начаться
+        новому, пока блок выполняется. Иначе сжатие перезапишет более новые данные
+        устаревшими или заново создаст удалённую папку.
+        """
+        key = str(self.project_dir)
+        with self._idle:
+            self._idle.wait_for(lambda: key not in self._compacting)
+            self._compacting.add(key)
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._compacting.discard(key)
+                self._idle.notify_all()
+
+    def remove_journals(self):
+        for path in [self.journal_file] + self.old_journals():
+            path.unlink(missing_ok=True)
@@ -0,0 +1,155 @@
+# core/totals.py
+from itertools import compress
+from operator import itemgetter
+from typing import NamedTuple
+
+from core.contracts import Contract
+from core.money import calc_row, rate_units, to_kopecks
+
+
+class ProjectTotals:
+    """
+    Итоги проекта, которые поддерживаются по ходу изменений.
+
+    ContractTable сообщает о каждой добавленной, удалённой, изменённой или отмеченной
+    строке, и итоги сдвигаются на вклад этой строки — без прохода по всему проекту.
+    При смене ставок НДС итоги один раз пересчитываются целиком при следующем чтении.
+
+    Суммы копятся в целых копейках, поэтому итог в точности равен сумме показанных строк
+    и не «уплывает» от многих добавлений и удалений.
+    """
+    __slots__ = ('_table', '_rates', '_units', '_count', '_vat_difference', '_new_cost', '_without',
+                 '_checked_count', '_checked_vat_difference')
+
+    def __init__(self, table):
+        self._table = table
+        self.rebuild()
+
+    # ========================
+    # Чтение
+    # ========================
+
+    @property
+    def count(self) -> int:
+        self._ensure_rates()
+        return self._count
+
+    @property
+    def vat_difference(self) -> float:
+        """Доп. НДС по всему проекту."""
+        self._ensure_rates()
+        return self._vat_difference / 100
+
+    @property
+    def new_cost(self) -> float:
+        """Новая общая стоимость."""
+        self._ensure_rates()
+        return self._new_cost / 100
+
+    @property
+    def without(self) -> float:
+        """Общая база без НДС."""
+        self._ensure_rates()
+        return self._without / 100
+
+    @property
+    def checked_count(self) -> int:
+        self._ensure_rates()
+        return self._checked_count
+
+    @property
+    def checked_vat_difference(self) -> float:
+        """Доп. НДС только по отмеченным договорам."""
+        self._ensure_rates()
+        return self._checked_vat_difference / 100
+
+    # ========================
+    # Изменения (вызываются из ContractTable)
+    # ========================
+
+    def rebuild(self):
+        """Полный пересчёт по колонкам таблицы (целочисленные суммы — без накопления ошибки)."""
+        table = self._table
+        derived = table.compute()
+        self._rates = (Contract.current_vat_rate, Contract.future_vat_rate)
+        self._units = (rate_units(self._rates[0]), rate_units(self._rates[1]))
+        self._count = len(table)
+        self._vat_difference = sum(derived.vat_difference)
+        self._new_cost = sum(derived.new_cost)
+        self._without = sum(derived.without)
+        self._checked_count = sum(table.checked)
+        self._checked_vat_difference = sum(d for d, c in zip(derived.vat_difference, table.checked) if c)
+
+    def reset(self):
+        self._rates = (Contract.current_vat_rate, Contract.future_vat_rate)
+        self._units = (rate_units(self._rates[0]), rate_units(self._rates[1]))
+        self._count = 0
+        self._vat_difference = self._new_cost = self._without = 0
+        self._checked_count = 0
+        self._checked_vat_difference = 0
+
+    def add(self, total, remaining, checked, sign=1):
+        """Учитывает строку (sign=1) или убирает её вклад (sign=-1)."""
+        if not self._rates_current():
+            return
+        _, without, _, vat_future, vat_difference = calc_row(to_kopecks(total), to_kopecks(remaining), *self._units)
+        self._count += sign
+        self._vat_difference += sign * vat_difference
+        self._new_cost += sign * (without + vat_future)
+        self._without += sign * without
+        if checked:
+            self._checked_count += sign
+            self._checked_vat_difference += sign * vat_difference
+
+    def remove(self, total, remaining, checked):
+        self.add(total, remaining, checked, sign=-1)
+
+    def toggle(self, total, remaining, checked):
+        """Строка стала отмеченной (checked=True) или перестала."""
+        if not self._rates_current():
+            return
+        sign = 1 if checked else -1
+        self._checked_count += sign
+        self._checked_vat_difference += sign * calc_row(to_kopecks(total), to_kopecks(remaining), *self._units)[4]
+
+    def _rates_current(self) -> bool:
+        return self._rates == (Contract.current_vat_rate, Contract.future_vat_rate)
+
+    def _ensure_rates(self):
+        if not self._rates_current():
+            self.rebuild()
+
+
+class SubsetTotals(NamedTuple):
+    """Итоги по части договоров проекта, в рублях."""
+    count: int
+    vat_difference: float
+    new_cost: float
+    without: float
+    checked_count: int
+    checked_vat_difference: float
+
+
+def subset_totals(table, indices) -> SubsetTotals:
+    """
+    Итоги по строкам indices (например, найденным поиском) — суммы берутся из
+    кешированных колонок ContractTable.compute(), в копейках, как у ProjectTotals.
+    """
+    if not indices:
+        return SubsetTotals(0, 0.0, 0.0, 0.0, 0, 0.0)
+    derived = table.compute()
+    if len(indices) == 1:
+        index = indices[0]
+        pick = lambda column: (column[index],)
+    else:
+        pick = itemgetter(*indices)
+    vat_difference = pick(derived.vat_difference)
+    checked = pick(table.checked)
+    return SubsetTotals(
+        count=len(indices),
+        vat_difference=sum(vat_difference) / 100,
+        new_cost=sum(pick(derived.new_cost)) / 100,
+        without=sum(pick(derived.without)) / 100,
+        checked_count=sum(checked),
+        checked_vat_difference=sum(compress(vat_difference, checked)) / 100,
+    )
@@ -0,0 +1,135 @@
+# gui/job_runner.py
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 50
+
+
+class JobCancelled(Exception):
+    """Задача остановлена пользователем."""
+
+
+class Job:
+    """
+    Фоновая задача. Функция задачи получает Job и сообщает о ходе работы через progress();
+    если пользователь нажал «Отмена», progress() выбрасывает JobCancelled. Задача, которая
+    завершилась без JobCancelled, считается выполненной, даже если отмену успели нажать.
+    """
+
+    def __init__(self, runner, key=None):
+        self._runner = runner
+        self._cancel = threading.Event()
+        self.key = key
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, done, total=None, text=None):
+        """Вызывается из рабочего потока; UI обновится в главном потоке через after()."""
+        self.check_cancelled()
+        self._runner._post(self, 'progress', (done, total, text))
+
+
+class JobRunner:
+    """
+    Выполняет долгие операции (импорт, экспорт, сохранение) вне потока Tk.
+
+    Результаты и прогресс передаются в главный поток через очередь, которую виджет
+    опрашивает с помощью after(). Задачи с одинаковым key (например, папка проекта)
+    не могут выполняться одновременно — так исключаются параллельные записи в один проект.
+    """
+    _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vat-job")
+    _active_keys = set()
+    _keys_lock = threading.Lock()
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._queue = queue.Queue()
+        self._handlers = {}     # Job -> (on_done, on_error, on_progress, on_cancel)
+        self._polling = False
+
+    def is_busy(self, key) -> bool:
+        with self._keys_lock:
+            return key in self._active_keys
+
+    def submit(self, func, key=None, on_done=None, on_error=None, on_progress=None, on_cancel=None):
+        """
+        Запускает func(job) в фоне. Возвращает Job или None, если задача с таким key уже идёт.
+        Все обработчики вызываются в главном потоке.
+        """
+        if key is not None:
+            with self._keys_lock:
+                if key in self._active_keys:
+                    return None
+                self._active_keys.add(key)
+
+        job = Job(self, key)
+        self._handlers[job] = (on_done, on_error, on_progress, on_cancel)
+        self._executor.submit(self._run, job, func)
+        self._schedule_poll()
+        return job
+
+    def _run(self, job, func):
+        try:
+            result = func(job)
+        except JobCancelled:
+            self._post(job, 'cancel', None)
+        except Exception as e:
+            self._post(job, 'error', e)
+        else:
+            # Задача доработала до конца (например, запись не проверяет отмену) — результат не теряем
+            self._post(job, 'done', result)
+        finally:
+            if job.key is not None:
+                with self._keys_lock:
+                    self._active_keys.discard(job.key)
+
+    def _post(self, job, kind, payload):
+        self._queue.put((job, kind, payload))
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        try:
+            while True:
+                job, kind, payload = self._queue.get_nowait()
+                self._dispatch(job, kind, payload)
+        except queue.Empty:
+            pass
+        if self._handlers:
+            try:
+                self._schedule_poll()
+            except Exception:
+                # Окно уже закрыто — ждать результатов некому
+                self._handlers.clear()
+
+    def _dispatch(self, job, kind, payload):
+        handlers = self._handlers.get(job)
+        if handlers is None:
+            return
+        on_done, on_error, on_progress, on_cancel = handlers
+        if kind == 'progress':
+            if on_progress and not job.cancelled:
+                on_progress(*payload)
+            return
+
+        del self._handlers[job]
+        if kind == 'done' and on_done:
+            on_done(payload)
+        elif kind == 'error' and on_error:
+            on_error(payload)
+        elif kind == 'cancel' and on_cancel:
+            on_cancel()
@@ -1,11 +1,55 @@
+import json
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
 from gui.widgets.project_browser import ProjectBrowser
 from core.project_manager import ProjectManager
 from gui.widgets.settings_dialog import set_icon
+from utils import diagnostics
 
-def run_app():
+
+class StartupTimer:
+    """
+    Время запуска: до первой отрисовки окна и до заполнения списка проектов.
+    Замеры попадают в окно «Диагностика»; с report_path они пишутся в JSON и программа
+    закрывается — так время запуска проверяется и у собранного .exe, где нет консоли.
+    """
+    def __init__(self, root, started, report_path=None):
+        self.root = root
+        self.started = started
+        self.report_path = report_path
+        self.times = {}
+
+    def mark(self, name):
+        elapsed = time.perf_counter() - self.started
+        self.times[name] = elapsed
+        diagnostics.record(f"startup.{name}", self.started, elapsed)
+        if name == 'projects':
+            print(f"[Startup] окно: {self.times.get('window', 0) * 1000:.0f} мс, "
+                  f"список проектов: {elapsed * 1000:.0f} мс")
+            if self.report_path:
+                self._write_report()
+                self.root.after_idle(self.root.destroy)
+
+    def _write_report(self):
+        report = {f"{name}_ms": round(value * 1000, 1) for name, value in self.times.items()}
+        report.update(frozen=bool(getattr(sys, 'frozen', False)), python=sys.version.split()[0])
+        try:
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=1)
+        except OSError as e:
+            print(f"[Startup] Не удалось записать отчёт: {e}")
+
+
+def run_app(started=None, startup_report=None):
+    """
+    started — time.perf_counter() в начале main.py (по умолчанию — вызов run_app);
+    startup_report — путь JSON-отчёта о времени запуска (main.py --startup-report).
+    """
+    started = time.perf_counter() if started is None else started
     root = tk.Tk()
+    timer = StartupTimer(root, started, startup_report)
     root.title('VAT Calculator - Управление проектами')
     root.geometry('1200x800')
 
@@ -25,9 +69,11 @@ def run_app():
     style.map('Accent.TButton',
               background=[('active', '#1565c0')])
 
-    project_manager = ProjectManager()
-    project_browser = ProjectBrowser(root, project_manager)
+    # Список проектов читается в фоне уже после появления окна
+    project_manager = ProjectManager(scan=False)
+    project_browser = ProjectBrowser(root, project_manager, on_loaded=lambda: timer.mark('projects'))
     project_browser.pack(fill='both', expand=True, padx=10, pady=10)
 
     set_icon(root)
-    root.mainloop()
\ No newline at end of file
+    root.after(0, lambda: timer.mark('window'))   # Первый вызов из mainloop — окно уже отрисовано
+    root.mainloop()
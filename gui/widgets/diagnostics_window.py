@@ -0,0 +1,106 @@
+# gui/widgets/diagnostics_window.py
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+from utils import diagnostics
+from gui.widgets.settings_dialog import set_icon
+
+REFRESH_MS = 1000
+RECENT_LIMIT = 200
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """
+    Длительность последних операций (загрузка, сохранение, импорт, экспорт) и
+    сохранение трассировки в файл для разбора жалоб «программа тормозит».
+    """
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Диагностика")
+        self.geometry("900x600")
+        self.minsize(700, 400)
+        self._after_id = None
+        self._shown = None    # (число замеров, последний замер) — чтобы не перерисовывать без изменений
+
+        self._create_widgets()
+        set_icon(self)
+        self.refresh()
+
+    def _create_widgets(self):
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill='x', padx=12, pady=8)
+
+        self.enabled_var = tk.BooleanVar(value=diagnostics.is_enabled())
+        ttk.Checkbutton(toolbar, text="Замерять операции", variable=self.enabled_var,
+                        command=lambda: diagnostics.set_enabled(self.enabled_var.get())).pack(side='left')
+        ttk.Button(toolbar, text="Очистить", command=self.clear).pack(side='left', padx=8)
+        ttk.Button(toolbar, text="Сохранить трассировку…", command=self.save_trace).pack(side='right')
+
+        # === Сводка по операциям ===
+        summary_frame = ttk.LabelFrame(self, text=" По операциям ", padding=8)
+        summary_frame.pack(fill='x', padx=12, pady=(0, 8))
+        columns = ('name', 'count', 'last', 'mean', 'max')
+        self.summary_tree = ttk.Treeview(summary_frame, columns=columns, show='headings', height=6)
+        for column, text, width in (('name', "Операция", 280), ('count', "Вызовов", 80), ('last', "Последний, мс", 120),
+                                    ('mean', "Средний, мс", 120), ('max', "Максимум, мс", 120)):
+            self.summary_tree.heading(column, text=text)
+            self.summary_tree.column(column, width=width, anchor='w' if column == 'name' else 'e')
+        self.summary_tree.pack(fill='x')
+
+        # === Последние замеры ===
+        recent_frame = ttk.LabelFrame(self, text=f" Последние {RECENT_LIMIT} ", padding=8)
+        recent_frame.pack(fill='both', expand=True, padx=12, pady=(0, 12))
+        columns = ('time', 'name', 'duration', 'rows', 'thread')
+        self.recent_tree = ttk.Treeview(recent_frame, columns=columns, show='headings')
+        for column, text, width in (('time', "Начало, с", 90), ('name', "Операция", 280), ('duration', "Длительность, мс", 130),
+                                    ('rows', "Строк", 90), ('thread', "Поток", 160)):
+            self.recent_tree.heading(column, text=text)
+            self.recent_tree.column(column, width=width, anchor='e' if column in ('time', 'duration', 'rows') else 'w')
+        scrollbar = ttk.Scrollbar(recent_frame, orient='vertical', command=self.recent_tree.yview)
+        self.recent_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y')
+        self.recent_tree.pack(fill='both', expand=True)
+
+    def refresh(self):
+        """Перерисовывает таблицы, если появились новые замеры; повторяется, пока окно открыто."""
+        spans = diagnostics.recent()
+        state = (len(spans), spans[-1] if spans else None)
+        if state != self._shown:
+            self._shown = state
+            self.summary_tree.delete(*self.summary_tree.get_children())
+            for name, count, last, mean, longest in diagnostics.summary():
+                self.summary_tree.insert("", "end", values=(
+                    name, count, f"{last * 1000:.1f}", f"{mean * 1000:.1f}", f"{longest * 1000:.1f}"))
+
+            self.recent_tree.delete(*self.recent_tree.get_children())
+            for span in reversed(spans[-RECENT_LIMIT:]):
+                name = span.name if not span.error else f"{span.name} ({span.error})"
+                self.recent_tree.insert("", "end", values=(
+                    f"{span.start:.2f}", name, f"{span.duration * 1000:.1f}",
+                    "" if span.rows is None else span.rows, span.thread))
+        self._after_id = self.after(REFRESH_MS, self.refresh)
+
+    def clear(self):
+        diagnostics.clear()
+        self.after_cancel(self._after_id)
+        self.refresh()
+
+    def save_trace(self):
+        if not diagnostics.recent():
+            messagebox.showinfo("Диагностика", "Замеров пока нет. Включите «Замерять операции» и повторите действия.",
+                                parent=self)
+            return
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile=f"vat_trace_{datetime.now():%Y%m%d_%H%M%S}.json"
+        )
+        if not filename:
+            return
+        try:
+            count = diagnostics.dump_trace(filename)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить трассировку:\n{e}", parent=self)
+            return
+        messagebox.showinfo("Успех", f"Сохранено замеров: {count}\n{filename}", parent=self)
@@ -1,6 +1,11 @@
 import tkinter as tk
 from tkinter import filedialog
 
+# Форматы импорта и экспорта: CSV/TSV читаются и пишутся без openpyxl — быстрее на больших реестрах
+IMPORT_FILETYPES = [("Excel и CSV", "*.xlsx;*.xls;*.csv;*.tsv;*.txt"), ("Excel файлы", "*.xlsx;*.xls"),
+                    ("CSV/TSV", "*.csv;*.tsv;*.txt")]
+EXPORT_FILETYPES = [("Excel файлы", "*.xlsx"), ("CSV (разделитель «;»)", "*.csv"), ("TSV (табуляция)", "*.tsv")]
+
 class FileSelector(tk.Frame):
     """
     Компонент для выбора файла Excel.
@@ -15,6 +20,6 @@ class FileSelector(tk.Frame):
 
     def browse(self):
         """Открывает диалог выбора файла."""
-        path = filedialog.askopenfilename(filetypes=[('Excel files','*.xlsx;*.xls')])
+        path = filedialog.askopenfilename(filetypes=IMPORT_FILETYPES)
         if path:
             self.file_path.set(path)
\ No newline at end of file
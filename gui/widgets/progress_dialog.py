@@ -0,0 +1,100 @@
+# gui/widgets/progress_dialog.py
+import tkinter as tk
+from tkinter import ttk, messagebox
+from gui.widgets.settings_dialog import set_icon
+
+
+class ProgressDialog(tk.Toplevel):
+    """
+    Окно хода фоновой задачи с кнопкой «Отмена».
+    """
+    def __init__(self, parent, title, text=""):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("420x140")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.job = None
+
+        frame = ttk.Frame(self, padding=15)
+        frame.pack(fill='both', expand=True)
+
+        self.text_var = tk.StringVar(value=text)
+        ttk.Label(frame, textvariable=self.text_var).pack(anchor='w', pady=(0, 8))
+
+        self.bar = ttk.Progressbar(frame, mode='indeterminate', length=380)
+        self.bar.pack(fill='x')
+        self.bar.start(15)
+
+        self.cancel_btn = ttk.Button(frame, text="Отмена", command=self.cancel)
+        self.cancel_btn.pack(side='right', pady=(12, 0))
+
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        set_icon(self)
+        self.grab_set()
+
+    def attach(self, job):
+        """Привязывает задачу, которую отменяет кнопка «Отмена»."""
+        self.job = job
+
+    def update_progress(self, done, total=None, text=None):
+        if total:
+            if self.bar.cget('mode') != 'determinate':
+                self.bar.stop()
+                self.bar.configure(mode='determinate', maximum=total)
+            self.bar['value'] = done
+        if text is not None:
+            self.text_var.set(text)
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.text_var.set("Отмена…")
+            self.cancel_btn.state(['disabled'])
+        else:
+            self.close()
+
+    def close(self):
+        try:
+            self.grab_release()
+            self.destroy()
+        except tk.TclError:
+            pass
+
+
+def run_with_progress(parent, runner, title, text, func, on_done, key=None, error_text="Операция не выполнена",
+                      on_error=None):
+    """
+    Запускает func(job) через JobRunner и показывает ProgressDialog.
+    on_done(result) вызывается в главном потоке после успешного завершения,
+    on_error(exc) — после сообщения об ошибке.
+    Возвращает Job или None, если задача с таким key уже выполняется.
+    """
+    if key is not None and runner.is_busy(key):
+        messagebox.showwarning("Подождите", "Эта операция с проектом ещё выполняется", parent=parent)
+        return None
+
+    dialog = ProgressDialog(parent, title, text)
+
+    def done(result):
+        dialog.close()
+        on_done(result)
+
+    def error(exc):
+        dialog.close()
+        messagebox.showerror("Ошибка", f"{error_text}:\n{exc}", parent=parent)
+        if on_error:
+            on_error(exc)
+
+    def cancelled():
+        dialog.close()
+        messagebox.showinfo("Отменено", "Операция отменена", parent=parent)
+
+    job = runner.submit(func, key=key, on_done=done, on_error=error,
+                        on_progress=dialog.update_progress, on_cancel=cancelled)
+    if job is None:
+        dialog.close()
+        messagebox.showwarning("Подождите", "Эта операция с проектом ещё выполняется", parent=parent)
+        return None
+    dialog.attach(job)
+    return job
@@ -1,19 +1,37 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime
+from gui.job_runner import JobRunner
+from gui.widgets.progress_dialog import run_with_progress
 from gui.widgets.project_editor import ProjectEditor
 from gui.widgets.settings_dialog import SettingsDialog, set_icon
+from gui.widgets.diagnostics_window import DiagnosticsWindow
+from core.config import get_watch_projects_dir
+from core.portfolio import PortfolioTotals
+from core.project_manager import VATProject
+from core.recovery import list_recovery, load_recovery, remove_recovery
+from utils.format import format_money, format_rub
+
+# Как часто сверять список с папкой проектов (настройка «Следить за изменениями в папке»)
+WATCH_INTERVAL_MS = 5000
 
 class ProjectBrowser(tk.Frame):
     """
     Браузер проектов для просмотра и управления.
     """
-    def __init__(self, parent, project_manager):
+    def __init__(self, parent, project_manager, on_loaded=None):
+        """on_loaded() вызывается, когда список проектов заполнен (если он читается в фоне)."""
         super().__init__(parent)
         self.parent = parent
         self.project_manager = project_manager
         self.project_dict = {}
+        self.jobs = JobRunner(self)
+        self.diagnostics_window = None
         self._create_widgets()
         self.refresh_projects()
+        if not project_manager.loaded:
+            self.load_projects(on_loaded)
+        self.after(WATCH_INTERVAL_MS, self._watch_projects_dir)
         set_icon(self)
 
     def _create_widgets(self):
@@ -22,27 +40,44 @@ class ProjectBrowser(tk.Frame):
         control_frame.pack(fill='x', pady=(0, 10))
 
         ttk.Button(control_frame, text="Создать проект", command=self.create_project).pack(side='left', padx=5)
-        ttk.Button(control_frame, text="Обновить", command=self.refresh_projects).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="Обновить", command=self.reload_projects).pack(side='left', padx=5)
         ttk.Button(control_frame, text="Открыть", command=self.open_selected).pack(side='left', padx=5)
         ttk.Button(control_frame, text="Удалить", command=self.delete_selected).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="Отчёт по всем проектам", command=self.export_portfolio).pack(side='left', padx=5)
 
-        settings_btn = ttk.Button(control_frame, text='⚙ Настройки', command=lambda: SettingsDialog(self.parent))
+        settings_btn = ttk.Button(control_frame, text='⚙ Настройки', command=self.open_settings)
         settings_btn.pack(side='right', padx=5)
+        ttk.Button(control_frame, text="Диагностика", command=self.open_diagnostics).pack(side='right', padx=5)
 
-        self.tree = ttk.Treeview(self, columns=('name', 'contracts', 'created', 'modified'), show='headings', height=15)
+        self.tree = ttk.Treeview(self, columns=('name', 'contracts', 'vat_diff', 'created', 'modified'), show='headings', height=15)
         self.tree.heading('name', text='Название проекта')
         self.tree.heading('contracts', text='договоров')
+        self.tree.heading('vat_diff', text='Доп. НДС')
         self.tree.heading('created', text='Создан')
         self.tree.heading('modified', text='Изменен')
         self.tree.column('name', width=200)
         self.tree.column('contracts', width=80)
+        self.tree.column('vat_diff', width=130, anchor='e')
         self.tree.column('created', width=150)
         self.tree.column('modified', width=150)
         self.tree.pack(fill='both', expand=True)
         self.tree.bind('<Double-1>', lambda e: self.open_selected())
 
+        # === Итоги по всем проектам ===
+        totals_frame = ttk.LabelFrame(self, text=" Итоги по всем проектам ", padding=10)
+        totals_frame.pack(fill='x', pady=(10, 0))
+
+        self.lbl_portfolio_diff = ttk.Label(totals_frame, text="Дополнительный НДС: 0,00 ₽", font=('Segoe UI', 12, 'bold'), foreground='#d32f2f')
+        self.lbl_portfolio_diff.pack(anchor='w')
+        self.lbl_portfolio_cost = ttk.Label(totals_frame, text="Новая общая стоимость: 0,00 ₽", font=('Segoe UI', 10))
+        self.lbl_portfolio_cost.pack(anchor='w')
+        self.lbl_portfolio_checked = ttk.Label(totals_frame, text="", font=('Segoe UI', 10))
+        self.lbl_portfolio_checked.pack(anchor='w')
+
     def refresh_projects(self):
-        """Обновляет список проектов в таблице."""
+        """Обновляет список проектов в таблице; выделение и прокрутка сохраняются."""
+        selected = {self.project_dict[item].folder for item in self.tree.selection() if item in self.project_dict}
+        top = self.tree.yview()[0]
         self.project_dict.clear()
         for item in self.tree.get_children():
             self.tree.delete(item)
@@ -50,11 +85,156 @@ class ProjectBrowser(tk.Frame):
         for project in self.project_manager.projects:
             item_id = self.tree.insert('', 'end', values=(
                 project.name,
-                len(project.contracts),  # Общее количество договоров
+                project.contract_count,  # Общее количество договоров
+                format_rub(project.total_vat_difference),
                 project.created.strftime('%d.%m.%Y %H:%M'),
                 project.modified.strftime('%d.%m.%Y %H:%M')
             ))
             self.project_dict[item_id] = project
+            if project.folder in selected:
+                self.tree.selection_add(item_id)
+        self.tree.yview_moveto(top)
+        self.update_portfolio_totals()
+
+    def load_projects(self, on_loaded=None, quiet=False):
+        """
+        Сверяет список проектов с папкой в фоне — окно не ждёт. С диска читаются только
+        добавленные и изменённые проекты. quiet=True — проверка по таймеру: таблица
+        перерисовывается, только если что-то изменилось, а ошибки не показываются.
+        """
+        manager = self.project_manager
+        revision = manager.revision
+        first = not manager.loaded
+        if first:
+            self.lbl_portfolio_diff.config(text="Загрузка списка проектов…")
+            on_loaded = self._after_first_load(on_loaded)
+
+        def done(result):
+            if manager.revision != revision:
+                # Пока шло сканирование, проект сохранили или удалили — сверяем заново
+                self.load_projects(on_loaded, quiet)
+                return
+            changes = manager.apply_scan(result)
+            if changes or first or not quiet:
+                self.refresh_projects()
+            if on_loaded:
+                on_loaded()
+
+        def failed(e):
+            if quiet:
+                print(f"[ProjectBrowser] Не удалось проверить папку проектов: {e}")
+                return
+            if first:
+                self.lbl_portfolio_diff.config(text="Список проектов не загружен")
+            messagebox.showerror("Ошибка", f"Не удалось загрузить список проектов:\n{e}")
+
+        self.jobs.submit(lambda job: manager.scan(), key=('projects', id(manager)), on_done=done, on_error=failed)
+
+    def _after_first_load(self, on_loaded):
+        """После первой загрузки списка — ещё и предложение восстановить проекты после сбоя."""
+        def loaded():
+            if on_loaded:
+                on_loaded()
+            # Не из обработчика JobRunner: окна редактора модальные
+            self.after_idle(self.offer_recovery)
+        return loaded
+
+    def offer_recovery(self):
+        """Проекты, которые остались в копиях восстановления (core.recovery) после сбоя."""
+        for key in list_recovery():
+            try:
+                project = load_recovery(key)
+            except Exception as e:
+                print(f"[ProjectBrowser] Не удалось прочитать копию восстановления {key}: {e}")
+                continue
+            answer = messagebox.askyesnocancel(
+                "Восстановление",
+                f"После сбоя остался несохранённый проект «{project.name}» "
+                f"(договоров: {len(project.contracts)}, изменён {project.modified:%d.%m.%Y %H:%M}).\n\n"
+                "Да — открыть его, Нет — удалить копию, Отмена — спросить при следующем запуске.")
+            if answer is None:
+                continue
+            if answer:
+                self._open_editor(project, recovery_key=key)
+            else:
+                remove_recovery(key)
+
+    def _watch_projects_dir(self):
+        """Периодическая сверка с папкой проектов — чтобы общая папка оставалась актуальной."""
+        if get_watch_projects_dir() and self.project_manager.loaded:
+            self.load_projects(quiet=True)
+        self.after(WATCH_INTERVAL_MS, self._watch_projects_dir)
+
+    def update_portfolio_totals(self):
+        """Итоги портфеля — по сводкам из индекса, без загрузки проектов."""
+        portfolio = self.project_manager.portfolio()
+        self.lbl_portfolio_diff.config(
+            text=f"Дополнительный НДС: {format_money(portfolio.vat_difference)} ₽ "
+                 f"(проектов: {portfolio.project_count}, договоров: {portfolio.contract_count})")
+        self.lbl_portfolio_cost.config(text=f"Новая общая стоимость: {format_money(portfolio.new_cost)} ₽")
+        self.lbl_portfolio_checked.config(
+            text=f"Отмеченные: {format_money(portfolio.checked_vat_difference)} ₽ ({portfolio.checked_count})   •   "
+                 f"Неотмеченные: {format_money(portfolio.unchecked_vat_difference)} ₽ ({portfolio.unchecked_count})")
+
+    def export_portfolio(self):
+        """
+        Одна книга Excel по всем проектам: сводка и все договоры. Перед отчётом список
+        сверяется с папкой проектов — в той же фоновой задаче, окно не ждёт.
+        """
+        manager = self.project_manager
+        if manager.loaded and not manager.projects:
+            messagebox.showinfo("Отчёт", "Нет сохранённых проектов")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            initialfile=f"Портфель_доп_НДС_{datetime.now():%Y%m%d}.xlsx"
+        )
+        if not filename:
+            return
+
+        from utils.excel_processor import write_portfolio_xlsx
+        revision = manager.revision
+
+        def work(job):
+            job.progress(0, None, "Проверка папки проектов…")
+            scan = manager.scan()
+            portfolio = PortfolioTotals(scan[1])
+            if portfolio.project_count:
+                write_portfolio_xlsx(
+                    portfolio, filename, lambda summary: VATProject.load(summary.project_file),
+                    progress=lambda done, total: job.progress(done, total, f"Проектов обработано: {done} из {total}"))
+            return scan, portfolio.project_count
+
+        def done(result):
+            scan, project_count = result
+            if manager.revision == revision:
+                manager.apply_scan(scan)
+                self.refresh_projects()
+            else:   # Пока шёл отчёт, проект сохранили или удалили — сверяем список заново
+                self.load_projects(quiet=True)
+            if project_count:
+                messagebox.showinfo("Успех", f"Отчёт сохранён!\n{filename}")
+            else:
+                messagebox.showinfo("Отчёт", "Нет сохранённых проектов")
+
+        run_with_progress(self.winfo_toplevel(), self.jobs, "Отчёт по всем проектам", "Загрузка проектов…", work,
+                          done, key=filename, error_text="Не удалось сформировать отчёт")
+
+    def open_settings(self):
+        """Настройки; после сохранения список сверяется с папкой проектов — она могла смениться."""
+        SettingsDialog(self.parent, on_saved=self.load_projects)
+
+    def open_diagnostics(self):
+        """Окно замеров; если оно уже открыто — поднимает его."""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        self.diagnostics_window = DiagnosticsWindow(self.parent)
+
+    def reload_projects(self):
+        """Сверяет список с папкой проектов и обновляет таблицу."""
+        self.load_projects()
 
     def get_selected_project(self):
         """Возвращает выбранный проект."""
@@ -63,23 +243,28 @@ class ProjectBrowser(tk.Frame):
             return None
         return self.project_dict.get(selection[0])
 
-    def create_project(self):
-        """Создает новый проект."""
-        editor = ProjectEditor(self.parent, self.project_manager)
+    def _open_editor(self, project=None, recovery_key=None):
+        """Модальное окно редактора; после закрытия список обновляется."""
+        editor = ProjectEditor(self.parent, self.project_manager, project, recovery_key=recovery_key)
         editor.transient(self.parent)
         editor.grab_set()
         self.parent.wait_window(editor)
         self.refresh_projects()
 
+    def create_project(self):
+        """Создает новый проект."""
+        self._open_editor()
+
     def open_selected(self, event=None):
         """Открывает выбранный проект для редактирования."""
-        project = self.get_selected_project()
-        if project:
-            editor = ProjectEditor(self.parent, self.project_manager, project)
-            editor.transient(self.parent)
-            editor.grab_set()
-            self.parent.wait_window(editor)
-            self.refresh_projects()
+        summary = self.get_selected_project()
+        if summary:
+            try:
+                project = self.project_manager.load_project(summary)
+            except Exception as e:
+                messagebox.showerror("Ошибка", f"Не удалось открыть проект:\n{e}")
+                return
+            self._open_editor(project)
 
     def delete_selected(self):
         """Удаляет выбранный проект."""
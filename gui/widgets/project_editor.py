@@ -1,26 +1,71 @@
 # gui/widgets/project_editor.py
+import os
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from datetime import datetime
 from core.contracts import Contract
-from utils.excel_processor import read_input_excel
-from core.project_manager import VATProject
+from core.contract_search import ContractSearch
+from core.contract_sort import ContractSorter
+from core.contract_table import ContractTable
+from core.totals import subset_totals
+from core.importer import import_files, merge_table
 from gui.widgets.settings_dialog import set_icon
-from core.config import get_current_vat, get_future_vat
-from utils.format import format_money
+from gui.widgets.file_selector import EXPORT_FILETYPES, IMPORT_FILETYPES
+from gui.widgets.virtual_grid import VirtualGrid
+from gui.widgets.progress_dialog import run_with_progress
+from gui.widgets.scenario_window import ScenarioWindow
+from gui.job_runner import JobRunner
+from core.config import get_autosave, get_current_vat, get_future_vat
+from core.recovery import new_recovery_key, remove_recovery, write_recovery
+from utils.diagnostics import timed
+from utils.format import format_money, format_rub
+
+# Пауза после нажатия клавиши в поле поиска: быстрый набор фильтрует таблицу один раз
+SEARCH_DELAY_MS = 120
+
+# Автосохранение: запись после паузы в правках, но не реже чем раз в AUTOSAVE_MAX_DELAY_MS
+AUTOSAVE_DELAY_MS = 2000
+AUTOSAVE_MAX_DELAY_MS = 30000
+BUSY_POLL_MS = 100   # Ожидание фоновой записи перед закрытием окна
+
+# Колонка таблицы → колонка сортировки (core.contract_sort.SORT_COLUMNS)
+SORT_KEYS = {
+    'checkbox': 'checked', 'name': 'name', 'number': 'number', 'total': 'total', 'remaining': 'remaining',
+    'diff': 'difference', 'without': 'without', 'vat_now': 'vat', 'vat_fut': 'vat_future',
+    'diff_with': 'new_cost', 'new_cost': 'new_cost', 'vat_diff': 'vat_difference',
+}
 
 
 class ProjectEditor(tk.Toplevel):
-    def __init__(self, parent, project_manager, project=None):
+    def __init__(self, parent, project_manager, project=None, recovery_key=None):
+        """recovery_key — проект открыт из копии восстановления (core.recovery) с этим ключом."""
         super().__init__(parent)
         self.project_manager = project_manager
         self.project = project or project_manager.create_project_in_memory("Новый проект")
         self.title(f"Проект: {self.project.name}" + (" (новый)" if project is None else ""))
         self.geometry("1540x780")
         self.minsize(1200, 600)
+        self.jobs = JobRunner(self)
+        self.search = ContractSearch(self.project.contracts)
+        self.sorter = ContractSorter(self.project.contracts)
+        self.found = None         # Индексы строк, найденных поиском (None — поиск не задан)
+        self.visible = None       # Индексы строк в порядке показа (None — все строки по порядку)
+        self.sort_column = None
+        self.sort_descending = False
+        self._search_after = None
+        # Автосохранение: есть ли незаписанные изменения и когда появилось первое из них
+        self.dirty = recovery_key is not None
+        self._dirty_since = None
+        self._autosave_after = None
+        self._autosave_failures = 0     # Неудачных автосохранений подряд — для паузы перед повтором
+        self.recovery_key = recovery_key
 
         self.create_widgets()
         self.refresh_contracts()
+        if recovery_key is not None:
+            self.lbl_autosave.config(text="Восстановлен из копии — сохраните проект")
+        self.protocol("WM_DELETE_WINDOW", self.close)
         set_icon(self)
 
     def create_widgets(self):
@@ -32,17 +77,36 @@ class ProjectEditor(tk.Toplevel):
         self.name_var = tk.StringVar(value=self.project.name)
         ttk.Entry(toolbar, textvariable=self.name_var, width=50).pack(side='left', padx=8)
         self.name_var.trace('w', lambda *_: setattr(self.project, 'name', self.name_var.get()))
+        self.lbl_autosave = ttk.Label(toolbar, text="", foreground='#757575')
+        self.lbl_autosave.pack(side='left', padx=8)
 
         ttk.Button(toolbar, text="Сохранить проект", command=self.save_project).pack(side='right', padx=4)
         ttk.Button(toolbar, text="Добавить договор", command=self.add_contract).pack(side='right', padx=4)
-        ttk.Button(toolbar, text="Добавить из Excel", command=self.add_from_excel).pack(side='right', padx=4)
-        ttk.Button(toolbar, text="Экспорт в Excel", command=self.export_simple_excel).pack(side='right', padx=8)
+        ttk.Button(toolbar, text="Добавить из Excel/CSV", command=self.add_from_excel).pack(side='right', padx=4)
+        ttk.Button(toolbar, text="Экспорт в Excel/CSV", command=self.export_simple_excel).pack(side='right', padx=8)
+        ttk.Button(toolbar, text="Сценарии ставок", command=self.open_scenarios).pack(side='right', padx=4)
+
+        # === Поиск ===
+        search_bar = ttk.Frame(self)
+        search_bar.pack(fill='x', padx=12, pady=(0, 8))
+
+        ttk.Label(search_bar, text="Поиск (название или №):").pack(side='left')
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_bar, textvariable=self.search_var, width=50)
+        self.search_entry.pack(side='left', padx=8)
+        self.search_entry.bind('<Escape>', lambda e: self.search_var.set(""))
+        self.search_var.trace_add('write', lambda *_: self._schedule_search())
+        ttk.Button(search_bar, text="Сбросить", command=lambda: self.search_var.set("")).pack(side='left')
+        self.lbl_found = ttk.Label(search_bar, text="")
+        self.lbl_found.pack(side='left', padx=12)
+        self.bind('<Control-f>', lambda e: self.search_entry.focus_set())
 
         # === Treeview ===
         columns = ('checkbox', 'name', 'number', 'total', 'remaining', 'diff', 'without',
                    'vat_now', 'vat_fut', 'diff_with', 'new_cost', 'vat_diff')
-        self.tree = ttk.Treeview(self, columns=columns, show='headings', selectmode='browse')
-        
+        self.contract_grid = VirtualGrid(self, columns, self._row_values, selectmode='browse')
+        self.tree = self.contract_grid.tree
+
         self.tree.heading('checkbox', text="")
         self.tree.heading('name', text='Название')
         self.tree.heading('number', text='№')
@@ -56,6 +120,10 @@ class ProjectEditor(tk.Toplevel):
         self.tree.heading('new_cost', text='Новая стоимость')
         self.tree.heading('vat_diff', text='Доп. НДС')
 
+        self._heading_texts = {column: self.tree.heading(column, 'text') for column in columns}
+        for column in columns:
+            self.tree.heading(column, command=lambda c=column: self.sort_by(c))
+
         self.tree.column('checkbox', width=50, anchor='center')
         self.tree.column('name', width=280)
         self.tree.column('number', width=90, anchor='center')
@@ -69,7 +137,7 @@ class ProjectEditor(tk.Toplevel):
         self.tree.column('new_cost', width=140, anchor='e')
         self.tree.column('vat_diff', width=130, anchor='e')
 
-        self.tree.pack(fill='both', expand=True, padx=12, pady=(0, 10))
+        self.contract_grid.pack(fill='both', expand=True, padx=12, pady=(0, 10))
 
         self.tree.bind('<Double-1>', self.edit_selected)
         self.tree.bind('<Button-1>', self._on_tree_click)
@@ -91,6 +159,16 @@ class ProjectEditor(tk.Toplevel):
         self.lbl_without = ttk.Label(left_frame, text="Общая база без НДС: 0,00 ₽", font=('Segoe UI', 10))
         self.lbl_without.pack(anchor='w', pady=2)
 
+        # Середина — найденные поиском
+        found_frame = ttk.LabelFrame(summary_frame, text=" Найденные договоры ", padding=15)
+        found_frame.pack(side='left', fill='x', expand=True, padx=10)
+
+        self.lbl_found_diff = ttk.Label(found_frame, text="Доп. НДС: —", font=('Segoe UI', 13, 'bold'), foreground='#388e3c')
+        self.lbl_found_diff.pack(anchor='w', pady=4)
+
+        self.lbl_found_count = ttk.Label(found_frame, text="Поиск не задан", font=('Segoe UI', 10))
+        self.lbl_found_count.pack(anchor='w')
+
         # Правая часть — только отмеченные
         right_frame = ttk.LabelFrame(summary_frame, text=" Только отмеченные договоры ", padding=15)
         right_frame.pack(side='right', fill='x', expand=True)
@@ -101,51 +179,105 @@ class ProjectEditor(tk.Toplevel):
         self.lbl_checked_count = ttk.Label(right_frame, text="Отмечено: 0", font=('Segoe UI', 10))
         self.lbl_checked_count.pack(anchor='w')
 
+    def _table_index(self, row):
+        """Строка таблицы на экране → индекс договора в проекте (с учётом поиска)."""
+        return row if self.visible is None else self.visible[row]
+
+    def _grid_row(self, index):
+        """Индекс договора → строка на экране; None, если договор скрыт поиском."""
+        if self.visible is None:
+            return index
+        try:
+            return self.visible.index(index)
+        except ValueError:
+            return None
+
+    def sort_by(self, column):
+        """Щелчок по заголовку: по возрастанию → по убыванию → исходный порядок."""
+        if column != self.sort_column:
+            self.sort_column, self.sort_descending = column, False
+        elif not self.sort_descending:
+            self.sort_descending = True
+        else:
+            self.sort_column = None
+        for name, text in self._heading_texts.items():
+            arrow = ""
+            if name == self.sort_column:
+                arrow = " ▼" if self.sort_descending else " ▲"
+            self.tree.heading(name, text=text + arrow)
+        self.contract_grid.selected_index = None
+        self.refresh_contracts()
+
+    def _schedule_search(self):
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(SEARCH_DELAY_MS, self._apply_search)
+
+    def _apply_search(self):
+        self._search_after = None
+        self.contract_grid.selected_index = None
+        self.contract_grid.offset = 0
+        self.refresh_contracts()
+
     def _on_tree_click(self, event):
         col = self.tree.identify_column(event.x)
-        row_id = self.tree.identify_row(event.y)
-        if col != '#1' or not row_id:
+        row = self.contract_grid.index_at(event.y)
+        if col != '#1' or row is None:
             return
 
-        index = self.tree.index(row_id)
+        index = self._table_index(row)
         contract = self.project.contracts[index]
         contract.is_modified = not contract.is_modified
-        self.refresh_contracts()
+        self.refresh_contract(index)
+        self.mark_dirty()
+
+    def _row_values(self, row):
+        """Значения строки таблицы — запрашиваются только для видимых строк."""
+        contract = self.project.contracts[self._table_index(row)]
+        new_cost = contract.getNewCost()
+        return (
+            "✓" if contract.is_modified else "☐",
+            contract.name,
+            contract.number or "—",
+            format_rub(contract.total_cost_with_vat),
+            format_rub(contract.remaining_cost),
+            format_rub(contract.get_difference()),
+            format_rub(contract.get_without()),
+            format_rub(contract.getVAT()),
+            format_rub(contract.getVATfut()),
+            format_rub(new_cost),
+            format_rub(new_cost),
+            format_rub(contract.get_vat_difference())
+        )
 
+    @timed("ProjectEditor.refresh_contracts", rows=lambda _, editor: len(editor.project.contracts))
     def refresh_contracts(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        total_diff = total_new = total_without = 0.0
-        checked_diff = checked_count = 0
-
-        for contract in self.project.contracts:
-            diff = contract.get_vat_difference()
-            without = contract.get_without()
-            new_cost = contract.getNewCost()
-
-            total_diff += diff
-            total_without += without
-            total_new += new_cost
-
-            if contract.is_modified:
-                checked_diff += diff
-                checked_count += 1
-
-            self.tree.insert('', 'end', values=(
-                "✓" if contract.is_modified else "☐",
-                contract.name,
-                contract.number or "—",
-                format_money(contract.total_cost_with_vat) + " ₽",
-                format_money(contract.remaining_cost) + " ₽",
-                format_money(contract.get_difference()) + " ₽",
-                format_money(without) + " ₽",
-                format_money(contract.getVAT()) + " ₽",
-                format_money(contract.getVATfut()) + " ₽",
-                format_money(contract.getDiffWith()) + " ₽",
-                format_money(new_cost) + " ₽",
-                format_money(diff) + " ₽"
-            ))
+        """Полное обновление: фильтр поиска, число строк, видимые строки и итоги."""
+        self.found = self.search.search(self.search_var.get())
+        if self.sort_column is None:
+            self.visible = self.found
+        else:
+            # Перестановки кешируются по колонкам — повторная сортировка не пересчитывается
+            self.visible = self.sorter.order(SORT_KEYS[self.sort_column], self.sort_descending, self.found)
+        self.contract_grid.set_row_count(len(self.project.contracts) if self.visible is None else len(self.visible))
+        self.update_totals()
+
+    def refresh_contract(self, index):
+        """Обновление после изменения одного договора."""
+        if self.visible is not None:
+            # Договор мог сменить место в сортировке или перестать подходить под поиск
+            self.refresh_contracts()
+            return
+        self.contract_grid.refresh_row(index)
+        self.update_totals()
+
+    def update_totals(self):
+        totals = self.project.totals
+        total_diff = totals.vat_difference
+        total_new = totals.new_cost
+        total_without = totals.without
+        checked_diff = totals.checked_vat_difference
+        checked_count = totals.checked_count
 
         # Обновляем итоги
         self.lbl_total_diff.config(text=f"Дополнительный НДС: {format_money(total_diff)} ₽")
@@ -159,12 +291,25 @@ class ProjectEditor(tk.Toplevel):
             self.lbl_checked_diff.config(text="Доп. НДС: —")
             self.lbl_checked_count.config(text="Отмечено: 0")
 
+        if self.found is None:
+            self.lbl_found.config(text="")
+            self.lbl_found_diff.config(text="Доп. НДС: —")
+            self.lbl_found_count.config(text="Поиск не задан")
+        else:
+            found = subset_totals(self.project.contracts, self.found)
+            self.lbl_found.config(text=f"Найдено: {found.count} из {len(self.project.contracts)}")
+            self.lbl_found_diff.config(text=f"Доп. НДС: {format_money(found.vat_difference)} ₽")
+            self.lbl_found_count.config(
+                text=f"Договоров: {found.count}, новая стоимость: {format_money(found.new_cost)} ₽\n"
+                     f"Отмечено: {found.checked_count} ({format_money(found.checked_vat_difference)} ₽)")
+
     def edit_selected(self, event=None):
-        selection = self.tree.selection()
-        if not selection:
+        row = self.contract_grid.index_at(event.y) if event is not None else None
+        if row is None:
+            row = self.contract_grid.selected()
+        if row is None:
             return
-        index = self.tree.index(selection[0])
-        contract = self.project.contracts[index]
+        contract = self.project.contracts[self._table_index(row)]
         self.edit_contract(contract, is_new=False)
 
     def add_contract(self):
@@ -212,11 +357,18 @@ class ProjectEditor(tk.Toplevel):
             contract.remaining_cost = max(0.0, remain_var.get())
             contract.is_modified = True
 
+            win.destroy()
             if is_new:
                 if contract.total_cost_with_vat > 0 or contract.remaining_cost > 0:
                     self.project.contracts.append(contract)
-            win.destroy()
-            self.refresh_contracts()
+                    self.refresh_contracts()
+                    row = self._grid_row(len(self.project.contracts) - 1)
+                    if row is not None:
+                        self.contract_grid.select(row)
+                    self.mark_dirty()
+            elif contract in self.project.contracts:
+                self.refresh_contract(self.project.contracts.index(contract))
+                self.mark_dirty()
 
         # Кнопка Сохранить — всегда справа
         ttk.Button(button_frame, text="Сохранить", command=save).pack(side='right', padx=(8, 0))
@@ -231,6 +383,7 @@ class ProjectEditor(tk.Toplevel):
                         self.project.contracts.remove(contract)
                     win.destroy()
                     self.refresh_contracts()
+                    self.mark_dirty()
 
             ttk.Button(button_frame, text="Удалить договор", 
                     style="Danger.TButton", command=delete).pack(side='left')
@@ -244,35 +397,255 @@ class ProjectEditor(tk.Toplevel):
         win.wait_window()
 
     def add_from_excel(self):
-        path = filedialog.askopenfilename(filetypes=[("Excel файлы", "*.xlsx;*.xls")])
-        if not path:
+        """
+        Импорт одного или нескольких реестров (Excel, CSV/TSV). Из книги читается активный лист;
+        если в выбранных книгах несколько листов, можно импортировать все — каждый как отдельный реестр.
+        """
+        paths = filedialog.askopenfilenames(filetypes=IMPORT_FILETYPES, parent=self)
+        if not paths:
             return
-        try:
-            data = read_input_excel(path)
-            added = 0
-            for row in data[1:]:
-                if len(row) < 5:
-                    continue
-                c = Contract(
-                    name=str(row[0]) if row[0] else "Договор",
-                    number=str(row[1]) if len(row) > 1 and row[1] else "",
-                    total_cost_with_vat=float(row[3]) if row[3] else 0.0,
-                    remaining_cost=float(row[4]) if row[4] else 0.0,
-                )
-                self.project.contracts.append(c)
-                added += 1
-            self.project.modified = datetime.now()
-            self.refresh_contracts()
-            messagebox.showinfo("Готово", f"Добавлено {added} договоров")
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось импортировать:\n{e}")
 
-    def save_project(self):
+        from utils.csv_processor import is_csv_path
+        from utils.excel_processor import sheet_count
+        all_sheets = False
+        if any(sheet_count(path) > 1 for path in paths if not is_csv_path(path)):
+            answer = messagebox.askyesnocancel(
+                "Импорт из Excel",
+                "В книге несколько листов. Импортировать все листы?\n\n"
+                "Да — каждый лист как отдельный реестр.\n"
+                "Нет — только активный лист.",
+                parent=self)
+            if answer is None:
+                return
+            all_sheets = answer
+
+        # Повторный импорт обновлённого реестра не должен дублировать договоры
+        update = False
+        if self.project.contracts:
+            answer = messagebox.askyesnocancel(
+                "Импорт из Excel",
+                "Обновить договоры, которые уже есть в проекте?\n\n"
+                "Да — договоры с тем же № (без номера — с тем же названием) получат новые суммы, "
+                "отметки сохранятся, новые договоры добавятся.\n"
+                "Нет — добавить все строки файла как новые договоры.",
+                parent=self)
+            if answer is None:
+                return
+            update = answer
+
+        def work(job):
+            def file_done(info, done, total):
+                name = os.path.basename(info.path)
+                status = f"не прочитан ({info.error})" if info.error else f"строк {info.rows}"
+                job.progress(done, total, f"Файлов: {done} из {total}. {name}: {status}")
+
+            staging = ContractTable()
+            report = import_files(staging, paths, all_sheets=all_sheets, progress=file_done,
+                                  row_progress=lambda n: job.progress(n, None, f"Прочитано строк: {n}"))
+            return staging, report
+
+        def done(result):
+            staging, report = result
+            if update:
+                merge_table(self.project.contracts, staging, report)
+            else:
+                self.project.contracts.extend_table(staging)
+            self.refresh_contracts()
+            if report.added or report.updated:
+                self.mark_dirty()
+            if report.errors or report.unreadable:
+                messagebox.showwarning("Импорт завершён с ошибками", report.summary(), parent=self)
+            else:
+                messagebox.showinfo("Готово", report.summary(), parent=self)
+
+        text = "Чтение файла…" if len(paths) == 1 else f"Чтение файлов: {len(paths)}…"
+        run_with_progress(self, self.jobs, "Импорт из Excel", text, work, done,
+                          error_text="Не удалось импортировать")
+
+    def save_project(self, on_saved=None):
+        """on_saved() вызывается после успешной записи (например, закрытие окна)."""
         name = self.name_var.get().strip() or "Без имени"
         self.project.name = name
-        self.project.save()
-        messagebox.showinfo("Сохранено", f"Проект «{name}» успешно сохранён")
-        self.project_manager.projects = VATProject.list_projects()
+        key = str(self.project.project_dir)
+        if self.jobs.is_busy(key):
+            messagebox.showwarning("Подождите", "Проект ещё сохраняется", parent=self)
+            return
+        task = self.project.prepare_save()
+        update_index = self.project_manager.prepare_index_update(self.project)
+        self._clear_dirty()
+
+        def work(job):
+            task.run()
+            return update_index()
+
+        def done(summary):
+            self.project_manager.project_saved(self.project, summary)
+            self._autosave_failures = 0
+            self._drop_recovery()
+            self.lbl_autosave.config(text=f"Сохранено в {datetime.now():%H:%M:%S}")
+            messagebox.showinfo("Сохранено", f"Проект «{name}» успешно сохранён", parent=self)
+            if on_saved:
+                on_saved()
+
+        def failed(_):
+            # Правки не записаны — закрытие окна снова спросит, сохранять ли их
+            self.dirty = True
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            self.lbl_autosave.config(text="Проект не сохранён")
+
+        job = run_with_progress(self, self.jobs, "Сохранение", "Сохранение проекта…",
+                                work, done, key=key, error_text="Не удалось сохранить проект", on_error=failed)
+        if job is None:
+            self.project._full_save_needed = True
+            self.dirty = True
+
+    # ========================
+    # Автосохранение
+    # ========================
+
+    def mark_dirty(self):
+        """
+        Правка, отметка или импорт. Серия изменений записывается одним фоновым сохранением
+        после паузы AUTOSAVE_DELAY_MS; при непрерывных правках — не позже AUTOSAVE_MAX_DELAY_MS.
+        """
+        self.project.modified = datetime.now()
+        self.dirty = True
+        if not get_autosave():
+            return
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+            self.lbl_autosave.config(text="Есть несохранённые изменения")
+        if self._autosave_failures and self._autosave_after is not None:
+            return  # Повтор после неудачной записи уже назначен — эти правки уйдут с ним
+        delay = min(AUTOSAVE_DELAY_MS, AUTOSAVE_MAX_DELAY_MS - (now - self._dirty_since) * 1000)
+        self._schedule_autosave(max(0, int(delay)))
+
+    def _schedule_autosave(self, delay):
+        if self._autosave_after is not None:
+            self.after_cancel(self._autosave_after)
+        self._autosave_after = self.after(delay, self.autosave)
+
+    def _clear_dirty(self):
+        """Всё текущее состояние ушло в запись — отложенное автосохранение не нужно."""
+        if self._autosave_after is not None:
+            self.after_cancel(self._autosave_after)
+            self._autosave_after = None
+        self.dirty = False
+        self._dirty_since = None
+
+    def _autosave_key(self):
+        """Ключ JobRunner записи: папка проекта (как у «Сохранить проект») или копия восстановления."""
+        if self.project.is_saved:
+            return str(self.project.project_dir)
+        return 'recovery', self.recovery_key
+
+    def autosave(self):
+        """
+        Записывает накопленные изменения в фоне. Сохранённый проект дописывается журналом
+        в свою папку; новый или переименованный (ещё не сохранённый под новым именем) —
+        в копию восстановления. В главном потоке только собираются данные для записи.
+        """
+        self._autosave_after = None
+        if not self.dirty:
+            return
+        project = self.project
+        if not project.is_saved and self.recovery_key is None:
+            self.recovery_key = new_recovery_key()
+        key = self._autosave_key()
+        if self.jobs.is_busy(key):
+            # Прошлая запись ещё идёт — эти изменения запишутся следующей
+            self._schedule_autosave(AUTOSAVE_DELAY_MS)
+            return
+
+        saved = project.is_saved
+        if saved:
+            task = project.prepare_save()
+            update_index = self.project_manager.prepare_index_update(project)
+
+            def work(job):
+                task.run()
+                return update_index()
+
+            status = "Автосохранение"
+        else:
+            recovery_key, data = self.recovery_key, project.to_data()
+            work = lambda job: write_recovery(recovery_key, data)
+            status = "Копия для восстановления"
+        self._clear_dirty()
+        self.lbl_autosave.config(text=f"{status}…")
+
+        def done(summary):
+            self._autosave_failures = 0
+            if saved:
+                self.project_manager.project_saved(project, summary)
+            if not self.dirty:
+                self.lbl_autosave.config(text=f"{status}: {datetime.now():%H:%M:%S}")
+
+        def failed(e):
+            # Журнал после неудачной записи не используется — следующая запись будет полной.
+            # Повтор — с паузой, которая удваивается после каждой неудачи (диск занят, сеть пропала)
+            print(f"[Autosave] Не удалось сохранить «{project.name}»: {e}")
+            self._autosave_failures += 1
+            self.dirty = True
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            delay = min(AUTOSAVE_MAX_DELAY_MS, AUTOSAVE_DELAY_MS * 2 ** self._autosave_failures)
+            self.lbl_autosave.config(text=f"Автосохранение не удалось — повтор через {delay // 1000} с")
+            if self.state() != 'withdrawn':
+                self._schedule_autosave(delay)
+
+        self.jobs.submit(work, key=key, on_done=done, on_error=failed)
+
+    def _drop_recovery(self):
+        """Удаляет копию восстановления; если её ещё пишут — после записи."""
+        if self.recovery_key is None:
+            return
+        if self.jobs.is_busy(('recovery', self.recovery_key)):
+            self.after(BUSY_POLL_MS, self._drop_recovery)
+            return
+        remove_recovery(self.recovery_key)
+        self.recovery_key = None
+
+    def close(self):
+        """
+        Закрытие окна: незаписанные правки сохранённого проекта дописываются, а если их
+        некуда дописать (новый или переименованный проект, автосохранение выключено) —
+        предлагается сохранить проект. Копия восстановления удаляется. Окно скрывается
+        сразу, а закрывается, когда фоновые записи закончены.
+        """
+        if self.state() != 'withdrawn' and self.dirty and not (get_autosave() and self.project.is_saved):
+            answer = messagebox.askyesnocancel(
+                "Закрытие проекта", "Изменения не сохранены. Сохранить проект перед закрытием?", parent=self)
+            if answer is None:
+                return
+            if answer:
+                self.save_project(on_saved=self.close)
+                return
+            self._clear_dirty()
+        self.withdraw()
+        if self._autosave_after is not None:
+            self.after_cancel(self._autosave_after)
+            self._autosave_after = None
+        if self.jobs.is_busy(str(self.project.project_dir)) or (
+                self.recovery_key is not None and self.jobs.is_busy(('recovery', self.recovery_key))):
+            self.after(BUSY_POLL_MS, self.close)
+            return
+        if self.dirty and get_autosave() and self.project.is_saved:
+            try:
+                self.project.prepare_save().run()
+                self.project_manager.project_saved(self.project)
+            except Exception as e:
+                self.deiconify()
+                messagebox.showerror("Ошибка", f"Не удалось сохранить изменения:\n{e}", parent=self)
+                return
+        if self.recovery_key is not None:
+            remove_recovery(self.recovery_key)
+        self.destroy()
+
+    def open_scenarios(self):
+        ScenarioWindow(self, self.project)
 
     def export_simple_excel(self):
         if not self.project.contracts:
@@ -282,14 +655,25 @@ class ProjectEditor(tk.Toplevel):
         default_name = f"{self.project.name.replace(' ', '_')}.xlsx"
         filename = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Excel файлы", "*.xlsx")],
+            filetypes=EXPORT_FILETYPES,
             initialfile=default_name
         )
         if not filename:
             return
 
-        from utils.excel_processor import write_output_excel_simple
-        data = self.project.get_export_data()
-        if write_output_excel_simple(data, filename):
-            total = sum(c.get_vat_difference() for c in self.project.contracts)
-            messagebox.showinfo("Успех", f"Экспорт завершён!\n\nФайл: {filename}\n\nИтого доп. НДС: {format_money(total)} ₽")
\ No newline at end of file
+        from utils.csv_processor import is_csv_path, write_project_csv
+        from utils.excel_processor import write_project_xlsx
+        write = write_project_csv if is_csv_path(filename) else write_project_xlsx
+        snapshot = self.project.snapshot()
+
+        def work(job):
+            write(snapshot, filename,
+                  progress=lambda done, total: job.progress(done, total, f"Записано строк: {done}"))
+
+        def done(_):
+            total = snapshot.totals.vat_difference
+            messagebox.showinfo("Успех", f"Экспорт завершён!\n\nФайл: {filename}\n\nИтого доп. НДС: {format_money(total)} ₽",
+                                parent=self)
+
+        run_with_progress(self, self.jobs, "Экспорт в Excel", "Запись файла…", work, done,
+                          key=filename, error_text="Не удалось экспортировать")
@@ -1,7 +1,10 @@
 # gui/widgets/project_viewer.py
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from utils.excel_processor import write_output_excel_simple
+from gui.job_runner import JobRunner
+from gui.widgets.progress_dialog import run_with_progress
+from gui.widgets.file_selector import EXPORT_FILETYPES
+from utils.format import format_kopeck_column, format_money_column, format_rub
 
 
 class ProjectViewer(tk.Toplevel):
@@ -10,6 +13,7 @@ class ProjectViewer(tk.Toplevel):
         self.project = project
         self.title(f"Проект: {project.name} — Экспорт")
         self.geometry("1000x650")
+        self.jobs = JobRunner(self)
         self._create_widgets()
         self._show_summary()
 
@@ -58,42 +62,48 @@ class ProjectViewer(tk.Toplevel):
         btn_frame = ttk.Frame(self)
         btn_frame.pack(fill="x", padx=10, pady=(0, 10))
 
-        ttk.Button(btn_frame, text="Экспорт в Excel", command=self.export_to_excel).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Экспорт в Excel/CSV", command=self.export_to_excel).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Закрыть", command=self.destroy).pack(side="right", padx=5)
 
     def export_to_excel(self):
         default_name = f"{self.project.name.replace(' ', '_')}_доп_НДС_22.xlsx"
         filename = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
+            filetypes=EXPORT_FILETYPES,
             initialfile=default_name
         )
-        if filename:
-            try:
-                data = self.project.get_export_data()
-                write_output_excel_simple(data, filename)
-                messagebox.showinfo("Успех", f"Экспорт завершён!\n{filename}")
-            except Exception as e:
-                messagebox.showerror("Ошибка", f"Не удалось экспортировать:\n{e}")
+        if not filename:
+            return
+
+        from utils.csv_processor import is_csv_path, write_project_csv
+        from utils.excel_processor import write_project_xlsx
+        write = write_project_csv if is_csv_path(filename) else write_project_xlsx
+        snapshot = self.project.snapshot()
+
+        def work(job):
+            write(snapshot, filename,
+                  progress=lambda done, total: job.progress(done, total, f"Записано строк: {done}"))
+
+        run_with_progress(self, self.jobs, "Экспорт в Excel", "Запись файла…", work,
+                          lambda _: messagebox.showinfo("Успех", f"Экспорт завершён!\n{filename}", parent=self),
+                          key=filename, error_text="Не удалось экспортировать")
 
     def _show_summary(self):
-        total_diff = 0.0
-        for contract in self.project.contracts:
-            diff = contract.get_vat_difference()
-            total_diff += diff
-            self.tree.insert("", "end", values=(
-                contract.name,
-                contract.number or "—",
-                f"{contract.total_cost_with_vat:,.2f}",
-                f"{contract.remaining_cost:,.2f}",
-                f"{diff:,.2f}"
-            ))
+        table = self.project.contracts
+        total_diff = self.project.totals.vat_difference
+        # Суммы форматируются целыми колонками — в том же виде, что в редакторе
+        totals = format_money_column(table.total, currency=True)
+        remainings = format_money_column(table.remaining, currency=True)
+        vat_differences = format_kopeck_column(table.compute().vat_difference, currency=True)
+        for name, number, total, remaining, diff in zip(
+                table.names, table.numbers, totals, remainings, vat_differences):
+            self.tree.insert("", "end", values=(name, number or "—", total, remaining, diff))
 
         # Итоговая строка
         self.tree.insert("", "end", values=(
-            "ИТОГО", "", "", "", f"{total_diff:,.2f}"
+            "ИТОГО", "", "", "", format_rub(total_diff)
         ), tags=("total",))
         self.tree.tag_configure("total", background="#fff8e1", font=("Segoe UI", 10, "bold"))
 
         # Заголовок окна с итогом
-        self.title(f"Проект: {self.project.name} — Доп. НДС: {total_diff:,.0f} ₽")
\ No newline at end of file
+        self.title(f"Проект: {self.project.name} — Доп. НДС: {format_rub(total_diff)}")
\ No newline at end of file
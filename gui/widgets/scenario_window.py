@@ -0,0 +1,140 @@
+# gui/widgets/scenario_window.py
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from core.scenarios import DEFAULT_SCENARIOS_TEXT, ScenarioMatrix, parse_scenarios
+from utils.format import format_rub
+from gui.job_runner import JobRunner
+from gui.widgets.progress_dialog import run_with_progress
+from gui.widgets.settings_dialog import set_icon
+from gui.widgets.virtual_grid import VirtualGrid
+
+
+class ScenarioWindow(tk.Toplevel):
+    """
+    Сравнение сценариев ставок НДС: доп. НДС каждого договора для нескольких пар
+    ставок сразу. Ставки в настройках и в самом проекте не меняются.
+    """
+    def __init__(self, parent, project):
+        super().__init__(parent)
+        self.project = project
+        self.snapshot = None      # Копия проекта, по которой посчитана матрица
+        self.matrix = None
+        self.title(f"Сценарии ставок: {project.name}")
+        self.geometry("1200x700")
+        self.minsize(900, 500)
+        self.jobs = JobRunner(self)
+
+        self._create_widgets()
+        set_icon(self)
+        self.calculate()
+
+    def _create_widgets(self):
+        # === Сценарии ===
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill='x', padx=12, pady=8)
+
+        ttk.Label(toolbar, text="Сценарии (текущая→будущая ставка через «;»):").pack(side='left')
+        self.scenarios_var = tk.StringVar(value=DEFAULT_SCENARIOS_TEXT)
+        entry = ttk.Entry(toolbar, textvariable=self.scenarios_var, width=40)
+        entry.pack(side='left', padx=8)
+        entry.bind('<Return>', lambda e: self.calculate())
+
+        ttk.Button(toolbar, text="Рассчитать", command=self.calculate).pack(side='left', padx=4)
+        ttk.Button(toolbar, text="Экспорт в Excel", command=self.export_to_excel).pack(side='right', padx=4)
+
+        # === Итоги по сценариям ===
+        totals_frame = ttk.LabelFrame(self, text=" Итоги по сценариям ", padding=8)
+        totals_frame.pack(fill='x', padx=12, pady=(0, 8))
+
+        columns = ('scenario', 'without', 'new_cost', 'vat_diff', 'checked_diff')
+        self.totals_tree = ttk.Treeview(totals_frame, columns=columns, show='headings', height=4)
+        for column, text, width in (('scenario', "Сценарий", 120), ('without', "Остаток без НДС", 180),
+                                    ('new_cost', "Новая стоимость", 180), ('vat_diff', "Доп. НДС", 180),
+                                    ('checked_diff', "Доп. НДС (отмеченные)", 180)):
+            self.totals_tree.heading(column, text=text)
+            self.totals_tree.column(column, width=width, anchor='w' if column == 'scenario' else 'e')
+        self.totals_tree.pack(fill='x')
+
+        # === Матрица договоров ===
+        self.grid_frame = ttk.Frame(self)
+        self.grid_frame.pack(fill='both', expand=True, padx=12, pady=(0, 12))
+        self.matrix_grid = None
+
+    def calculate(self):
+        try:
+            scenarios = parse_scenarios(self.scenarios_var.get())
+        except ValueError as e:
+            messagebox.showerror("Ошибка", str(e), parent=self)
+            return
+
+        snapshot = self.project.snapshot()
+
+        def work(job):
+            job.progress(0, None, f"Расчёт сценариев: {len(scenarios)}")
+            return snapshot, ScenarioMatrix(snapshot.contracts, scenarios)
+
+        run_with_progress(self, self.jobs, "Сценарии ставок", "Расчёт…", work, self._show_matrix,
+                          key=("scenarios", id(self)), error_text="Не удалось рассчитать сценарии")
+
+    def _show_matrix(self, result):
+        self.snapshot, self.matrix = result
+        matrix = self.matrix
+
+        self.totals_tree.delete(*self.totals_tree.get_children())
+        for scenario, totals in zip(matrix.scenarios, matrix.totals):
+            self.totals_tree.insert("", "end", values=(
+                scenario.label,
+                format_rub(totals.without),
+                format_rub(totals.new_cost),
+                format_rub(totals.vat_difference),
+                format_rub(totals.checked_vat_difference),
+            ))
+        self.totals_tree.configure(height=min(max(len(matrix.scenarios), 1), 8))
+
+        # Число колонок зависит от сценариев — таблицу создаём заново
+        if self.matrix_grid is not None:
+            self.matrix_grid.destroy()
+        columns = ['name', 'number', 'difference'] + [f's{i}' for i in range(len(matrix.scenarios))]
+        self.matrix_grid = VirtualGrid(self.grid_frame, columns, self._row_values, selectmode='browse')
+        tree = self.matrix_grid.tree
+        for column, text in zip(columns, matrix.headers()):
+            tree.heading(column, text=text)
+        tree.column('name', width=300)
+        tree.column('number', width=90, anchor='center')
+        tree.column('difference', width=140, anchor='e')
+        for column in columns[3:]:
+            tree.column(column, width=140, anchor='e')
+        self.matrix_grid.pack(fill='both', expand=True)
+        self.matrix_grid.set_row_count(len(matrix))
+
+    def _row_values(self, index):
+        matrix = self.matrix
+        return (
+            matrix.names[index],
+            matrix.numbers[index] or "—",
+            format_rub(matrix.difference[index] / 100),
+        ) + tuple(map(format_rub, matrix.row(index)))
+
+    def export_to_excel(self):
+        if self.matrix is None:
+            return
+        default_name = f"{self.project.name.replace(' ', '_')}_сценарии_НДС.xlsx"
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx")],
+            initialfile=default_name
+        )
+        if not filename:
+            return
+
+        from utils.excel_processor import write_scenarios_xlsx
+        snapshot, matrix = self.snapshot, self.matrix
+
+        def work(job):
+            write_scenarios_xlsx(snapshot, matrix, filename,
+                                 progress=lambda done, total: job.progress(done, total, f"Записано строк: {done}"))
+
+        run_with_progress(self, self.jobs, "Экспорт сценариев", "Запись файла…", work,
+                          lambda _: messagebox.showinfo("Успех", f"Экспорт завершён!\n{filename}", parent=self),
+                          key=filename, error_text="Не удалось экспортировать")
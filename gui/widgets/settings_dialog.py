@@ -3,7 +3,8 @@ from tkinter import ttk, messagebox, filedialog
 import os
 import sys
 import json
-from core.config import get_projects_dir, get_current_vat, get_future_vat, CONFIG_FILE
+from core.config import get_projects_dir, get_current_vat, get_future_vat, get_watch_projects_dir, get_autosave, reload_config, CONFIG_FILE
+from core.contracts import reload_vat_rates
 
 def resource_path(relative_path):
     """Получает путь к ресурсу в bundled-приложении."""
@@ -24,11 +25,12 @@ def set_icon(root):
 
 class SettingsDialog(tk.Toplevel):
     """
-    Диалог настроек приложения.
+    Диалог настроек приложения. on_saved() вызывается после записи настроек.
     """
-    def __init__(self, parent):
+    def __init__(self, parent, on_saved=None):
         super().__init__(parent)
         self.parent = parent
+        self.on_saved = on_saved
         self.title("Настройки приложения")
         self.geometry("500x400")
         self.resizable(False, False)
@@ -60,6 +62,9 @@ class SettingsDialog(tk.Toplevel):
         self.projects_path_var = tk.StringVar()
         ttk.Entry(paths_frame, textvariable=self.projects_path_var, width=50).grid(row=1, column=0, sticky='we', pady=5)
         ttk.Button(paths_frame, text="Обзор...", command=self._browse_projects_folder).grid(row=1, column=1, padx=(5, 0), pady=5)
+        self.watch_projects_var = tk.BooleanVar(value=get_watch_projects_dir())
+        ttk.Checkbutton(paths_frame, text="Следить за изменениями в папке (для общей папки)",
+                        variable=self.watch_projects_var).grid(row=2, column=0, columnspan=2, sticky='w', pady=(5, 0))
         paths_frame.columnconfigure(0, weight=1)
 
         app_frame = ttk.LabelFrame(main_frame, text="Настройки приложения", padding="10")
@@ -73,6 +78,10 @@ class SettingsDialog(tk.Toplevel):
         self.default_future_vat_var = tk.DoubleVar(value=get_future_vat())
         ttk.Entry(app_frame, textvariable=self.default_future_vat_var, width=10).grid(row=3, column=1, sticky='w', padx=10, pady=5)
 
+        self.autosave_var = tk.BooleanVar(value=get_autosave())
+        ttk.Checkbutton(app_frame, text="Автосохранение проекта после паузы в правках",
+                        variable=self.autosave_var).grid(row=4, column=0, columnspan=2, sticky='w', pady=(5, 0))
+
         button_frame = ttk.Frame(main_frame, padding="10")
         button_frame.pack(fill='x')
 
@@ -90,6 +99,8 @@ class SettingsDialog(tk.Toplevel):
                 self.projects_path_var.set(config.get('projects_dir', str(get_projects_dir()))) 
                 self.default_current_vat_var.set(config.get('default_current_vat', get_current_vat())) 
                 self.default_future_vat_var.set(config.get('default_future_vat', get_future_vat()))  
+                self.watch_projects_var.set(config.get('watch_projects_dir', get_watch_projects_dir()))
+                self.autosave_var.set(config.get('autosave', get_autosave()))
             else:
                 self.projects_path_var.set(str(get_projects_dir()))  
         except Exception as e:
@@ -122,15 +133,21 @@ class SettingsDialog(tk.Toplevel):
                 'projects_dir': self.projects_path_var.get(),
                 'default_current_vat': current_vat,
                 'default_future_vat': future_vat,
+                'watch_projects_dir': self.watch_projects_var.get(),
+                'autosave': self.autosave_var.get(),
             }
 
             # Сохраняем в файл
             CONFIG_FILE.parent.mkdir(parents=True, exist_ok=True)
             with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=4, ensure_ascii=False)
+            reload_config()
+            reload_vat_rates()   # Иначе заголовки покажут новые ставки, а суммы — по старым
 
             messagebox.showinfo("Настройки", "Настройки успешно сохранены!\nДля применения некоторых настроек может потребоваться перезапуск приложения.")
             self.destroy()
+            if self.on_saved:
+                self.on_saved()
             
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось сохранить настройки: {e}")
@@ -0,0 +1,183 @@
+# gui/widgets/virtual_grid.py
+from tkinter import ttk
+
+
+class VirtualGrid(ttk.Frame):
+    """
+    Таблица на базе Treeview, в которой существуют только видимые строки (плюс небольшой запас).
+
+    Данные не хранятся в виджете: значения строки запрашиваются через row_values(index)
+    в момент показа. Прокрутка сдвигает «окно» по данным и переписывает значения тех же
+    элементов Treeview, поэтому стоимость перерисовки не зависит от числа строк.
+    """
+    BUFFER_ROWS = 2
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, columns, row_values, row_tags=None, **tree_options):
+        super().__init__(parent)
+        self.row_values = row_values      # index -> кортеж значений колонок
+        self.row_tags = row_tags          # index -> кортеж тегов (необязательно)
+        self.row_count = 0
+        self.offset = 0                   # Индекс первой показанной строки
+        self.selected_index = None
+        self._items = []                  # Элементы Treeview — по одному на видимый слот
+        self._item_rows = {}              # item id -> индекс строки данных
+
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', **tree_options)
+        self.vsb = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        # Собственная прокрутка Treeview не нужна: все элементы и так помещаются в окно
+        self.tree.configure(yscrollcommand=self._pin_tree_view)
+        self.vsb.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-self.WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(self.WHEEL_ROWS))
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self._move_selection(-self.page_size))
+        self.tree.bind('<Next>', lambda e: self._move_selection(self.page_size))
+
+    # ========================
+    # Публичный API
+    # ========================
+
+    @property
+    def page_size(self) -> int:
+        return max(1, len(self._items) - self.BUFFER_ROWS)
+
+    def set_row_count(self, count):
+        """Меняет число строк данных и перерисовывает видимое окно."""
+        self.row_count = count
+        if self.selected_index is not None and self.selected_index >= count:
+            self.selected_index = None
+        self._clamp_offset()
+        self.refresh()
+
+    def refresh(self):
+        """Перерисовывает все видимые строки."""
+        self._item_rows.clear()
+        selected_item = None
+        for slot, item in enumerate(self._items):
+            index = self.offset + slot
+            if index < self.row_count:
+                tags = self.row_tags(index) if self.row_tags else ()
+                self.tree.item(item, values=self.row_values(index), tags=tags)
+                self._item_rows[item] = index
+                if index == self.selected_index:
+                    selected_item = item
+            else:
+                self.tree.item(item, values=(), tags=())
+        self._set_tree_selection(selected_item)
+        self._update_scrollbar()
+
+    def refresh_row(self, index):
+        """Перерисовывает одну строку, если она сейчас видна."""
+        slot = index - self.offset
+        if 0 <= slot < len(self._items) and index < self.row_count:
+            tags = self.row_tags(index) if self.row_tags else ()
+            self.tree.item(self._items[slot], values=self.row_values(index), tags=tags)
+
+    def index_of(self, item):
+        """Индекс строки данных для элемента Treeview (или None)."""
+        return self._item_rows.get(item)
+
+    def index_at(self, y):
+        """Индекс строки данных под координатой y (или None)."""
+        return self.index_of(self.tree.identify_row(y))
+
+    def selected(self):
+        return self.selected_index
+
+    def see(self, index):
+        """Прокручивает так, чтобы строка index была видна."""
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.page_size:
+            self.offset = index - self.page_size + 1
+        self._clamp_offset()
+        self.refresh()
+
+    def select(self, index):
+        self.selected_index = index
+        self.see(index)
+
+    def scroll(self, rows):
+        self.offset += rows
+        self._clamp_offset()
+        self.refresh()
+        return 'break'
+
+    # ========================
+    # Служебное
+    # ========================
+
+    def _row_height(self) -> int:
+        style = ttk.Style(self)
+        height = style.lookup(self.tree.cget('style') or 'Treeview', 'rowheight')
+        try:
+            return max(1, int(height))
+        except (TypeError, ValueError):
+            return 20
+
+    def _pin_tree_view(self, first, last):
+        if float(first) > 0:
+            self.tree.yview_moveto(0)
+
+    def _on_resize(self, event):
+        # Строка заголовков занимает примерно одну строку таблицы
+        visible = max(1, event.height // self._row_height() - 1)
+        wanted = visible + self.BUFFER_ROWS
+        while len(self._items) < wanted:
+            self._items.append(self.tree.insert('', 'end', values=()))
+        while len(self._items) > wanted:
+            self.tree.delete(self._items.pop())
+        self._clamp_offset()
+        self.refresh()
+
+    def _clamp_offset(self):
+        max_offset = max(0, self.row_count - self.page_size)
+        self.offset = max(0, min(self.offset, max_offset))
+
+    def _update_scrollbar(self):
+        if self.row_count <= 0:
+            self.vsb.set(0, 1)
+            return
+        first = self.offset / self.row_count
+        last = min(1.0, (self.offset + self.page_size) / self.row_count)
+        self.vsb.set(first, last)
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.offset = int(float(args[0]) * self.row_count)
+        elif action == 'scroll':
+            amount, unit = int(args[0]), args[1]
+            self.offset += amount * (self.page_size if unit == 'pages' else 1)
+        self._clamp_offset()
+        self.refresh()
+
+    def _on_wheel(self, event):
+        step = -self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS
+        return self.scroll(step)
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection and selection[0] in self._item_rows:
+            self.selected_index = self._item_rows[selection[0]]
+
+    def _set_tree_selection(self, item):
+        current = self.tree.selection()
+        if item is None:
+            if current:
+                self.tree.selection_remove(*current)
+        elif current != (item,):
+            self.tree.selection_set(item)
+
+    def _move_selection(self, step):
+        if not self.row_count:
+            return 'break'
+        index = 0 if self.selected_index is None else self.selected_index + step
+        self.select(max(0, min(self.row_count - 1, index)))
+        return 'break'
@@ -1,4 +1,27 @@
-from gui.main_window import run_app
+import time
+STARTED = time.perf_counter()   # Отсчёт времени запуска — до остальных импортов
+
+import sys
+import multiprocessing
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'batch':
+        # Пакетный режим без GUI: tkinter не импортируется
+        from core.batch import main as batch_main
+        return batch_main(argv[1:])
+
+    # --startup-report ФАЙЛ.json: замер времени запуска (в т.ч. у собранного .exe) и выход
+    startup_report = None
+    if len(argv) >= 2 and argv[0] == '--startup-report':
+        startup_report = argv[1]
+
+    from gui.main_window import run_app
+    run_app(STARTED, startup_report)
+    return 0
+
 
 if __name__ == '__main__':
-    run_app()
+    multiprocessing.freeze_support()
+    sys.exit(main())
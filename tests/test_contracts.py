@@ -0,0 +1,35 @@
+# tests/test_contracts.py
+import unittest
+
+import core.config as config
+from core.contract_table import ContractTable
+from core.contracts import Contract, reload_vat_rates
+from core.project_manager import export_headers
+
+
+class ReloadVatRatesTest(unittest.TestCase):
+
+    def setUp(self):
+        cache, rates = config._config_cache, (Contract.current_vat_rate, Contract.future_vat_rate)
+
+        def restore():
+            config._config_cache = cache
+            Contract.current_vat_rate, Contract.future_vat_rate = rates
+        self.addCleanup(restore)
+
+    def test_rates_follow_reloaded_settings(self):
+        config._config_cache = {'default_current_vat': 20.0, 'default_future_vat': 22.0}
+        reload_vat_rates()
+        table = ContractTable()
+        table.append(Contract(name="Поставка", total_cost_with_vat=1200.0, remaining_cost=0.0))
+        before = table.totals.vat_difference
+
+        config._config_cache = {'default_current_vat': 18.0, 'default_future_vat': 22.0}
+        reload_vat_rates()
+        self.assertEqual((Contract.current_vat_rate, Contract.future_vat_rate), (1.18, 1.22))
+        self.assertNotEqual(table.totals.vat_difference, before)
+        self.assertTrue(any("18%" in header for header in export_headers()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+# tests/test_format.py
+import unittest
+
+from utils.format import format_money, format_money_column, format_rub, parse_money
+
+
+class FormatMoneyTest(unittest.TestCase):
+
+    def test_non_breaking_thousands_separator(self):
+        self.assertEqual(format_money(1234567.89), "1\u00a0234\u00a0567,89")
+        self.assertEqual(format_rub(-1500.5), "-1\u00a0500,50 ₽")
+        self.assertEqual(format_money(0.0), "0,00")
+
+    def test_column_matches_single_values(self):
+        values = [1234567.89, 0.0, -0.0, 1234567.89, 999.999]
+        self.assertEqual(format_money_column(values), [format_money(v) for v in values])
+        self.assertEqual(format_money_column([1234567.89], currency=True), ["1\u00a0234\u00a0567,89 ₽"])
+
+    def test_round_trip(self):
+        self.assertEqual(parse_money(format_rub(1234567.89)), 1234567.89)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# tests/test_importer.py
+import os
+import tempfile
+import unittest
+
+from openpyxl import Workbook
+
+from core.contract_table import ContractTable
+from core.importer import import_files
+from utils.excel_processor import sheet_count
+
+HEADER = ["Название", "Номер", "Дата", "Сумма", "Факт"]
+
+
+class Cancelled(Exception):
+    pass
+
+
+class ImportFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_book(self):
+        path = os.path.join(self.tmp.name, "book.xlsx")
+        wb = Workbook()
+        first = wb.active
+        first.title = "Первый"
+        first.append(HEADER)
+        first.append(["Поставка", "Д-1", "", 1200, 600])
+        second = wb.create_sheet("Второй")
+        second.append(HEADER)
+        second.append(["Аренда", "Д-2", "", 2400, 2400])
+        wb.save(path)
+        return path
+
+    def test_active_sheet_by_default(self):
+        path = self.write_book()
+        self.assertEqual(sheet_count(path), 2)
+
+        contracts = ContractTable()
+        report = import_files(contracts, [path])
+        self.assertEqual(report.added, 1)
+        self.assertEqual(contracts[0].name, "Поставка")
+
+        contracts = ContractTable()
+        report = import_files(contracts, [path], all_sheets=True)
+        self.assertEqual(report.added, 2)
+        self.assertEqual(report.files[0].sheets, 2)
+
+    def test_row_progress_exception_cancels_import(self):
+        path = os.path.join(self.tmp.name, "input.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(";".join(HEADER) + "\nПоставка;Д-1;;1200;600\n")
+
+        def cancel(count):
+            raise Cancelled()
+
+        with self.assertRaises(Cancelled):
+            import_files(ContractTable(), [path], row_progress=cancel)
+
+    def test_unreadable_file_is_reported(self):
+        path = os.path.join(self.tmp.name, "broken.xlsx")
+        with open(path, "wb") as f:
+            f.write(b"not a workbook")
+
+        report = import_files(ContractTable(), [path], row_progress=lambda count: None)
+        self.assertEqual(report.added, 0)
+        self.assertTrue(report.files[0].error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+# tests/test_job_runner.py
+import unittest
+
+from gui.job_runner import Job, JobRunner
+
+
+class JobRunnerTest(unittest.TestCase):
+
+    def run_job(self, func, cancel=False):
+        runner = JobRunner(widget=None)
+        job = Job(runner)
+        if cancel:
+            job.cancel()
+        runner._run(job, func)
+        _, kind, payload = runner._queue.get_nowait()
+        return kind, payload
+
+    def test_finished_job_is_done_even_if_cancel_was_pressed(self):
+        self.assertEqual(self.run_job(lambda job: 42, cancel=True), ('done', 42))
+
+    def test_progress_after_cancel_stops_job(self):
+        self.assertEqual(self.run_job(lambda job: job.progress(1), cancel=True), ('cancel', None))
+
+    def test_error(self):
+        kind, payload = self.run_job(lambda job: 1 / 0)
+        self.assertEqual(kind, 'error')
+        self.assertIsInstance(payload, ZeroDivisionError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+# tests/test_scenarios.py
+import unittest
+
+from core.scenarios import DEFAULT_SCENARIOS_TEXT, Scenario, parse_scenarios
+
+
+class ParseScenariosTest(unittest.TestCase):
+
+    def test_several_transitions_on_one_line(self):
+        self.assertEqual(parse_scenarios("18→20,20→22"), [Scenario(18, 20), Scenario(20, 22)])
+        self.assertEqual(parse_scenarios("18→20, 20-22, 20/25"),
+                         [Scenario(18, 20), Scenario(20, 22), Scenario(20, 25)])
+
+    def test_separators_and_duplicates(self):
+        self.assertEqual(parse_scenarios(DEFAULT_SCENARIOS_TEXT),
+                         [Scenario(18, 20), Scenario(20, 22), Scenario(20, 25)])
+        self.assertEqual(parse_scenarios("20→22\n20→22;;18→20,"), [Scenario(20, 22), Scenario(18, 20)])
+
+    def test_decimal_comma(self):
+        self.assertEqual(parse_scenarios("18,5→20,5,20→22"), [Scenario(18.5, 20.5), Scenario(20, 22)])
+        self.assertEqual(parse_scenarios("20→22,5"), [Scenario(20, 22.5)])
+
+    def test_errors(self):
+        for text in ("", "abc", "18→20, x", "20→120"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_scenarios(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+# tests/test_storage.py
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from core.storage import ProjectData, ProjectStore
+
+ROW = {'id': 1, 'name': "Поставка", 'number': "Д-1", 'remaining': 0.0, 'checked': False}
+
+
+def project_data(total):
+    now = datetime(2025, 1, 1)
+    return ProjectData("Проект", now, now, {}, next_id=2, ids=[1], names=["Поставка"], numbers=["Д-1"],
+                       totals=[total], remainings=[0.0], checked=[False])
+
+
+class CompactingStore(ProjectStore):
+    """Сжатие журнала успевает пройти между чтением основного файла и журналов."""
+
+    compacted = False
+
+    def read_base(self):
+        data = super().read_base()
+        if not self.compacted:
+            self.compacted = True
+            self.start_compaction(project_data(200.0)).join()
+        return data
+
+
+class ProjectStoreReadTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.project_dir = Path(tmp.name) / "Проект"
+
+    def test_journal_is_applied(self):
+        store = ProjectStore(self.project_dir)
+        store.write_full(project_data(100.0))
+        store.append({'name': "Проект"}, [dict(ROW, total=200.0)], [])
+        self.assertEqual(list(store.read().totals), [200.0])
+
+    def test_compaction_during_read(self):
+        ProjectStore(self.project_dir).write_full(project_data(100.0))
+        store = CompactingStore(self.project_dir)
+        store.append({'name': "Проект"}, [dict(ROW, total=200.0)], [])
+        self.assertEqual(list(store.read().totals), [200.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
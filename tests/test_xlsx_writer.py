@@ -0,0 +1,26 @@
+# tests/test_xlsx_writer.py
+import os
+import tempfile
+import unittest
+
+from openpyxl import load_workbook
+
+from utils.xlsx_writer import MONEY_FORMAT, XlsxStreamWriter
+
+
+class XlsxStreamWriterTest(unittest.TestCase):
+
+    def test_counts_without_money_format(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "book.xlsx")
+            with XlsxStreamWriter(path) as writer:
+                writer.add_sheet("Портфель", ["Проект", "Договоров", "Доп. НДС"], [("Проект", 50, 1234.5)])
+            wb = load_workbook(path)
+            _, count, money = wb.active[2]
+            self.assertEqual((count.value, count.number_format), (50, "General"))
+            self.assertEqual((money.value, money.number_format), (1234.5, MONEY_FORMAT))
+            wb.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
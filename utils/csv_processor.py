@@ -0,0 +1,94 @@
+# utils/csv_processor.py
+"""
+Быстрый путь импорта и экспорта через CSV/TSV — без openpyxl.
+
+Импорт — тот же формат из 5 колонок, что и у Excel (первая строка — шапка); кодировка
+(utf-8 или windows-1251) и разделитель («;», «,» или табуляция) определяются по началу файла,
+суммы разбираются parse_money. Экспорт — те же 12 колонок, что write_project_xlsx, в utf-8
+с BOM, разделитель «;» (.csv) или табуляция (.tsv), дробная часть через запятую — файл
+открывается двойным щелчком в русском Excel. Файлы читаются и пишутся потоково.
+"""
+import csv
+from itertools import islice
+from pathlib import Path
+
+from core.project_manager import export_headers
+from utils.diagnostics import timed
+
+CSV_SUFFIXES = (".csv", ".tsv", ".txt")
+TAB_SUFFIXES = (".tsv", ".txt")
+SNIFF_BYTES = 64 * 1024
+CHUNK_ROWS = 5000
+
+
+def is_csv_path(path) -> bool:
+    """Файл импорта/экспорта в текстовом формате (по расширению)."""
+    return Path(path).suffix.lower() in CSV_SUFFIXES
+
+
+def _detect_format(path):
+    """(кодировка, разделитель) по первым SNIFF_BYTES файла."""
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    try:
+        text, encoding = head.decode("utf-8-sig"), "utf-8-sig"
+    except UnicodeDecodeError as e:
+        if e.reason == "unexpected end of data":   # Кусок оборвался посреди символа
+            text, encoding = head[:e.start].decode("utf-8-sig"), "utf-8-sig"
+        else:
+            text, encoding = head.decode("cp1251"), "cp1251"
+    if Path(path).suffix.lower() in TAB_SUFFIXES:
+        return encoding, "\t"
+    header = text.split("\n", 1)[0]
+    return encoding, max(("\t", ";", ","), key=header.count)
+
+
+def iter_input_csv(path):
+    """Потоково читает CSV/TSV для импорта: (номер строки, значения) — как iter_input_rows."""
+    encoding, delimiter = _detect_format(path)
+    with open(path, newline="", encoding=encoding) as f:
+        yield from enumerate(csv.reader(f, delimiter=delimiter), 1)
+
+
+def csv_money(value) -> str:
+    """Сумма для CSV под русский Excel: дробная часть через запятую, без разделителей тысяч."""
+    return f"{value:.2f}".replace(".", ",")
+
+
+def _cell(value):
+    return csv_money(value) if isinstance(value, float) else value
+
+
+def _money_column(values) -> list:
+    """Колонка сумм одним форматированием и одной заменой точки на запятую."""
+    return (("%.2f\n" * len(values)) % tuple(values)).replace(".", ",").split("\n")[:-1]
+
+
+@timed("write_project_csv", rows=lambda _, project, *__, **___: len(project.contracts))
+def write_project_csv(project, path, progress=None):
+    """
+    Потоковый экспорт проекта в CSV/TSV (разделитель — по расширению файла).
+    Строки пишутся пачками по CHUNK_ROWS, суммы форматируются по колонке на пачку.
+    progress(записано строк, всего) и обработка ошибок — как в write_project_xlsx.
+    """
+    delimiter = "\t" if Path(path).suffix.lower() in TAB_SUFFIXES else ";"
+    total = len(project.contracts) + 1
+    rows = project.iter_export_rows()
+    done = 0
+    try:
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(export_headers())
+            while chunk := list(islice(rows, CHUNK_ROWS)):
+                done += len(chunk)
+                total_row = chunk.pop() if chunk[-1][0] == "ИТОГО" else None
+                if chunk:
+                    checked, names, numbers, *amounts = zip(*chunk)
+                    writer.writerows(zip(checked, names, numbers, *map(_money_column, amounts)))
+                if total_row:
+                    writer.writerow(list(map(_cell, total_row)))
+                if progress:
+                    progress(done, total)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,126 @@
+# utils/diagnostics.py
+"""
+Замеры времени основных операций (загрузка, сохранение, импорт, экспорт) для окна
+«Диагностика» и файла трассировки.
+
+Замеры выключены по умолчанию: обёртка @timed тогда лишь проверяет флаг и вызывает
+функцию. Включаются в окне диагностики или переменной окружения VAT_DIAGNOSTICS=1.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+MAX_SPANS = 2000
+
+_enabled = os.environ.get("VAT_DIAGNOSTICS", "") not in ("", "0")
+_spans = deque(maxlen=MAX_SPANS)   # Последние замеры; append потокобезопасен
+_origin = time.perf_counter()
+
+
+class Span:
+    """Замер одной операции: начало (с от запуска программы), длительность (с), число строк, поток."""
+    __slots__ = ('name', 'start', 'duration', 'rows', 'thread', 'error')
+
+    def __init__(self, name, start, duration, rows, thread, error):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.rows = rows
+        self.thread = thread
+        self.error = error
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def recent() -> list:
+    """Замеры от старых к новым."""
+    return list(_spans)
+
+
+def clear():
+    _spans.clear()
+
+
+def record(name, start, duration, rows=None, error=None):
+    """Добавляет готовый замер (start — time.perf_counter() в начале операции)."""
+    _spans.append(Span(name, start - _origin, duration, rows, threading.current_thread().name, error))
+
+
+def timed(name, rows=None):
+    """
+    Декоратор замера. rows(result, *args, **kwargs) возвращает число обработанных строк:
+    @timed("VATProject.load", rows=lambda project, *_: len(project.contracts))
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                record(name, start, time.perf_counter() - start, error=type(e).__name__)
+                raise
+            duration = time.perf_counter() - start
+            count = None
+            if rows is not None:
+                try:
+                    count = rows(result, *args, **kwargs)
+                except Exception:
+                    pass
+            record(name, start, duration, count)
+            return result
+        return wrapper
+    return decorator
+
+
+def summary() -> list:
+    """По операциям: (имя, число вызовов, последняя, средняя, максимальная длительность в с)."""
+    stats = {}
+    for span in _spans:
+        count, total, longest, _ = stats.get(span.name, (0, 0.0, 0.0, 0.0))
+        stats[span.name] = (count + 1, total + span.duration, max(longest, span.duration), span.duration)
+    return [(name, count, last, total / count, longest)
+            for name, (count, total, longest, last) in sorted(stats.items())]
+
+
+def dump_trace(path):
+    """
+    Сохраняет замеры в JSON формата Trace Event (открывается в chrome://tracing и Perfetto).
+    """
+    pid = os.getpid()
+    events = []
+    threads = {}   # Имя потока → номер (tid в формате — число)
+    for span in recent():
+        if span.thread not in threads:
+            threads[span.thread] = len(threads) + 1
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': threads[span.thread],
+                           'args': {'name': span.thread}})
+        args = {}
+        if span.rows is not None:
+            args['rows'] = span.rows
+        if span.error:
+            args['error'] = span.error
+        events.append({
+            'name': span.name,
+            'ph': 'X',
+            'ts': round(span.start * 1e6),
+            'dur': round(span.duration * 1e6),
+            'pid': pid,
+            'tid': threads[span.thread],
+            'args': args,
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False, indent=1)
+    return len(events) - len(threads)
@@ -1,41 +1,68 @@
 # utils/excel_processor.py
-from openpyxl import load_workbook, Workbook
-from openpyxl.utils import get_column_letter
-from core.config import get_current_vat, get_future_vat
+import zipfile
+from itertools import chain
+from pathlib import Path
+from xml.etree import ElementTree
+from core.money import to_kopecks
+from core.portfolio import PORTFOLIO_HEADERS
+from core.project_manager import export_headers
+from utils.diagnostics import timed
+from utils.xlsx_writer import XlsxStreamWriter
 
+EXPORT_COLUMN_WIDTHS = [10, 40, 16, 20, 20, 20, 22, 20, 20, 23, 23, 24]
 
+
+def sheet_count(path) -> int:
+    """Число листов книги — по xl/workbook.xml, без загрузки самой книги (для вопроса перед импортом)."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return 1    # Не книга xlsx — ошибку покажет сам импорт
+    return len(root.findall("{*}sheets/{*}sheet"))
+
+
+def iter_input_sheets(path, all_sheets=False):
+    """
+    Потоково читает листы Excel для импорта: (название листа, поток (номер строки, значения)).
+    По умолчанию — только активный лист, all_sheets=True — все листы книги. Книга открывается один раз в режиме read_only,
+    поэтому потоки листов читаются по очереди, и в памяти только текущая строка.
+    """
+    from openpyxl import load_workbook   # openpyxl тяжёлый — импортируется при первом чтении, а не при запуске
+    wb = load_workbook(filename=path, read_only=True, data_only=True)
+    try:
+        for sheet in (wb.worksheets if all_sheets else [wb.active]):
+            yield sheet.title, enumerate(sheet.iter_rows(values_only=True), 1)
+    finally:
+        wb.close()
+
+
+def iter_input_rows(path):
+    """Потоково читает активный лист Excel для импорта: (номер строки, значения)."""
+    for _, rows in iter_input_sheets(path):
+        yield from rows
+
+
+@timed("read_input_excel", rows=lambda rows, *_: len(rows))
 def read_input_excel(path):
     """Простое чтение Excel для импорта из Excel"""
-    wb = load_workbook(filename=path, data_only=True)
-    sheet = wb.active
-    return [list(row) for row in sheet.iter_rows(values_only=True)]
+    return [list(row) for _, row in iter_input_rows(path)]
 
 
+@timed("write_output_excel_simple", rows=lambda ok, data, *_: len(data))
 def write_output_excel_simple(data, path):
     """
     Максимально быстрый и надёжный экспорт в Excel.
     Никаких стилей, цветов, шрифтов — только голые данные.
     Идеально для бухгалтерии и корпоративных сред.
     """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
     wb = Workbook()
     ws = wb.active
     ws.title = "Доп НДС 20 to 22%"
 
-    # Новые 10 колонок — как у тебя в таблице
-    headers = [
-        "Выполнено",
-        "Название договора",
-        "№ договора",
-        "Сумма договора",
-        "Факт на 31.12.2025",
-        "Остаток на 2026",
-        "Остаток без НДС",
-        f"НДС - {int(get_current_vat())}%",
-        f"НДС - {int(get_future_vat())}%",
-        "Остаток с будущим НДС",
-        "Новая стоимость договора",
-        "Сумма увеличения по ДС"
-    ]
+    headers = export_headers()
 
     ws.append(headers)
 
@@ -58,8 +85,7 @@ def write_output_excel_simple(data, path):
         ws.append(row)
 
     # Только одно улучшение — ширина колонок (это не стиль, это удобно)
-    column_widths = [10, 40, 16, 20, 20, 20, 22, 20, 20, 23, 23, 24]
-    for i, width in enumerate(column_widths, 1):
+    for i, width in enumerate(EXPORT_COLUMN_WIDTHS, 1):
         ws.column_dimensions[get_column_letter(i)].width = width
 
     # Заморозка шапки — чисто утилитарно
@@ -70,4 +96,113 @@ def write_output_excel_simple(data, path):
         return True
     except Exception as e:
         print(f"Ошибка при сохранении: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def _with_progress(rows, progress, total, every=5000):
+    for done, row in enumerate(rows, 1):
+        if done % every == 0:
+            progress(done, total)
+        yield row
+
+
+@timed("write_project_xlsx", rows=lambda _, project, *__, **___: len(project.contracts))
+def write_project_xlsx(project, path, progress=None):
+    """
+    Потоковый экспорт проекта в .xlsx: строки пишутся прямо в XML листа,
+    суммы — числовыми ячейками с денежным форматом.
+    progress(записано строк, всего) вызывается по ходу записи.
+    При ошибке недописанный файл удаляется, а исключение пробрасывается.
+    """
+    rows = project.iter_export_rows()
+    if progress:
+        rows = _with_progress(rows, progress, len(project.contracts) + 1)
+    try:
+        with XlsxStreamWriter(path) as writer:
+            writer.add_sheet("Доп НДС 20 to 22%", export_headers(), rows,
+                             column_widths=EXPORT_COLUMN_WIDTHS)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+
+
+SCENARIO_SUMMARY_HEADERS = ["Сценарий", "Остаток без НДС", "НДС текущий", "НДС будущий",
+                            "Новая стоимость", "Доп. НДС", "Доп. НДС (отмеченные)"]
+
+
+def write_scenarios_xlsx(project, matrix, path, progress=None):
+    """
+    Экспорт сценариев ставок (core.scenarios.ScenarioMatrix) в одну книгу:
+    сводка по сценариям, сравнение доп. НДС по договорам и полный расчёт
+    на отдельном листе для каждого сценария. Ошибки — как в write_project_xlsx.
+    """
+    count = len(project.contracts) + 1
+    total = count * (len(matrix.scenarios) + 1)
+    written = 0
+
+    def rows_with_progress(rows):
+        nonlocal written
+        for row in rows:
+            written += 1
+            if progress and written % 5000 == 0:
+                progress(written, total)
+            yield row
+
+    summary = ((s.label,) + tuple(t) for s, t in zip(matrix.scenarios, matrix.totals))
+    comparison = rows_with_progress(chain(matrix.iter_rows(), [matrix.total_row()]))
+    try:
+        with XlsxStreamWriter(path) as writer:
+            writer.add_sheet("Сводка по сценариям", SCENARIO_SUMMARY_HEADERS, summary,
+                             column_widths=[16, 22, 22, 22, 22, 22, 24])
+            writer.add_sheet("Сравнение", matrix.headers(), comparison,
+                             column_widths=[40, 16, 20] + [22] * len(matrix.scenarios))
+            for scenario in matrix.scenarios:
+                writer.add_sheet(scenario.label, export_headers(scenario.current, scenario.future),
+                                 rows_with_progress(project.iter_export_rows(scenario.rates)),
+                                 column_widths=EXPORT_COLUMN_WIDTHS)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+
+
+def write_portfolio_xlsx(portfolio, path, load_project, progress=None):
+    """
+    Общая книга по всем проектам (core.portfolio.PortfolioTotals): сводка по проектам
+    и все договоры на одном листе с колонкой «Проект». Проекты загружаются по одному
+    через load_project(summary), поэтому в памяти не больше одного проекта.
+    progress(обработано проектов, всего) вызывается после каждого проекта.
+    """
+    summaries = portfolio.summaries
+
+    def all_rows():
+        total_k = 0
+        for done, summary in enumerate(summaries, 1):
+            project = load_project(summary)
+            *rows, total_row = project.iter_export_rows()
+            # Строку ИТОГО проекта заменяет общая строка ИТОГО в конце листа
+            for row in rows:
+                yield (project.name,) + row
+            total_k += to_kopecks(total_row[-1])
+            if progress:
+                progress(done, len(summaries))
+        yield ("ИТОГО",) + ("",) * 11 + (total_k / 100,)
+
+    try:
+        with XlsxStreamWriter(path) as writer:
+            writer.add_sheet("Портфель", PORTFOLIO_HEADERS, portfolio.iter_rows(),
+                             column_widths=[40, 12, 12, 22, 24, 24, 22])
+            writer.add_sheet("Все договоры", ["Проект"] + export_headers(), all_rows(),
+                             column_widths=[30] + EXPORT_COLUMN_WIDTHS)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+
+
+def export_project_xlsx(project, path):
+    """То же, что write_project_xlsx, но ошибки не пробрасываются: True — файл записан."""
+    try:
+        write_project_xlsx(project, path)
+        return True
+    except Exception as e:
+        print(f"Ошибка при сохранении: {e}")
+        return False
@@ -1,6 +1,77 @@
 # utils/format.py
+"""
+Единый формат денежных сумм для редактора, просмотра и экспорта: 1 234 567,89
+(разделитель тысяч — неразрывный пробел, дробной части — запятая).
+
+Отдельные значения (видимые строки таблиц, итоги) кешируются в LRU ограниченного
+размера. Целые колонки форматируются одним вызовом format_money_column: повторяющиеся
+суммы форматируются один раз, а разделители заменяются сразу во всей колонке.
+Обратное преобразование для импорта текста (CSV) — parse_money.
+"""
+from functools import lru_cache
+
+NBSP = "\u00a0"
+CURRENCY = " ₽"
+CACHE_SIZE = 65536
+
+# Пробелы-разделители тысяч и знак валюты, которые отбрасываются при разборе суммы
+_IGNORED_CHARS = str.maketrans("", "", " \t\u00a0\u202f\u2009'₽")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
 def format_money(value: float) -> str:
     """Форматирует число: 1234567.89 → 1 234 567,89"""
     if value == 0:
         return "0,00"
-    return f"{value:,.2f}".replace(",", " ").replace(".", ",").replace(" ", " ")  # неразрывный пробел
\ No newline at end of file
+    return f"{value:,.2f}".replace(",", NBSP).replace(".", ",")
+
+
+def format_rub(value: float) -> str:
+    """Сумма со знаком рубля: 1 234 567,89 ₽"""
+    return format_money(value) + CURRENCY
+
+
+def format_money_column(values, currency=False) -> list:
+    """Форматирует всю колонку за один вызов; currency=True — со знаком рубля."""
+    values = list(values)
+    unique = list(dict.fromkeys(values))   # 0.0 и -0.0 — один ключ, как в format_money
+    if not unique:
+        return []
+    text = "\n".join([f"{v or 0.0:,.2f}" for v in unique])
+    formatted = text.replace(",", NBSP).replace(".", ",").split("\n")
+    if currency:
+        formatted = [value + CURRENCY for value in formatted]
+    if len(unique) == len(values):
+        return formatted
+    return list(map(dict(zip(unique, formatted)).__getitem__, values))
+
+
+def format_kopeck_column(values, currency=False) -> list:
+    """Колонка сумм в целых копейках (ContractTable.compute()) → строки."""
+    # k / 100 — ближайшее к точному значению double, поэтому .2f даёт ровно k копеек
+    return format_money_column([k / 100 for k in values], currency)
+
+
+def parse_money(text: str) -> float:
+    """
+    Разбирает сумму, записанную по-русски или по-английски: «1 234 567,89», «1234567.89»,
+    «1,234,567.89», «1.234.567,89 ₽». Если есть и точка, и запятая, дробная часть — после
+    последнего из них; одна запятая — дробная (русский формат), повторяющийся знак — тысячи.
+    ValueError — не число.
+    """
+    try:
+        return float(text.replace(",", "."))   # Частый случай: «1234,56» или «1234.56»
+    except ValueError:
+        pass
+    text = text.translate(_IGNORED_CHARS)
+    if text.endswith("руб."):
+        text = text[:-4]
+    comma, dot = text.rfind(","), text.rfind(".")
+    if comma >= 0 and dot >= 0:
+        thousands = "." if comma > dot else ","
+        text = text.replace(thousands, "")
+    elif text.count(",") > 1:
+        text = text.replace(",", "")
+    elif text.count(".") > 1:
+        text = text.replace(".", "")
+    return float(text.replace(",", "."))
@@ -0,0 +1,191 @@
+# utils/xlsx_writer.py
+import math
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# Формат денежных ячеек: 1 234 567,89 (разделители берутся из локали Excel)
+MONEY_FORMAT = '#,##0.00'
+_CHUNK_ROWS = 2000
+
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_ILLEGAL_SHEET = re.compile(r'[\[\]:*?/\\]')
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    f'<numFmts count="1"><numFmt numFmtId="164" formatCode="{MONEY_FORMAT}"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def column_letter(index: int) -> str:
+    """1 → A, 27 → AA."""
+    letters = ""
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _sheet_title(title: str, used: set) -> str:
+    title = _ILLEGAL_SHEET.sub("_", title).strip("'")[:31] or "Лист"
+    base, n = title, 2
+    while title.lower() in used:
+        suffix = f" ({n})"
+        title = base[:31 - len(suffix)] + suffix
+        n += 1
+    used.add(title.lower())
+    return title
+
+
+def _text_cell(ref: str, value: str) -> str:
+    value = _ILLEGAL_XML.sub("", value)
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+
+
+class XlsxStreamWriter:
+    """
+    Потоковая запись .xlsx без объектной модели openpyxl.
+
+    Строки листа сразу пишутся в XML внутри zip-архива, поэтому память не зависит
+    от числа строк. Дробные числа (суммы) записываются с денежным форматом, целые
+    (количества) — без него, строки — inline-строками (без общей таблицы строк).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+        self._sheets = []
+        self._titles = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zip.close()
+
+    def add_sheet(self, title, headers, rows, column_widths=None, freeze_header=True):
+        """Записывает лист: шапку и все строки из итератора rows. Возвращает число строк данных."""
+        title = _sheet_title(title, self._titles)
+        sheet_no = len(self._sheets) + 1
+        self._sheets.append(title)
+
+        refs = [column_letter(i) for i in range(1, len(headers) + 1)]
+        with self._zip.open(f'xl/worksheets/sheet{sheet_no}.xml', 'w', force_zip64=True) as f:
+            head = [
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            ]
+            if freeze_header:
+                head.append('<sheetViews><sheetView workbookViewId="0">'
+                            '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                            '</sheetView></sheetViews>')
+            if column_widths:
+                head.append('<cols>')
+                head.extend(f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>'
+                            for i, w in enumerate(column_widths, 1))
+                head.append('</cols>')
+            head.append('<sheetData>')
+            head.append(self._row_xml(1, refs, headers))
+            f.write("".join(head).encode('utf-8'))
+
+            chunk = []
+            row_no = 1
+            for row in rows:
+                row_no += 1
+                chunk.append(self._row_xml(row_no, refs, row))
+                if len(chunk) >= _CHUNK_ROWS:
+                    f.write("".join(chunk).encode('utf-8'))
+                    chunk.clear()
+            if chunk:
+                f.write("".join(chunk).encode('utf-8'))
+            f.write(b'</sheetData></worksheet>')
+        return row_no - 1
+
+    @staticmethod
+    def _row_xml(row_no, refs, values) -> str:
+        cells = []
+        for letter, value in zip(refs, values):
+            if value is None or value == "":
+                continue
+            ref = f"{letter}{row_no}"
+            if isinstance(value, str):
+                cells.append(_text_cell(ref, value))
+            elif isinstance(value, bool):
+                cells.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, int):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')   # Количества — без денежного формата
+            elif isinstance(value, float) and math.isfinite(value):
+                cells.append(f'<c r="{ref}" s="1"><v>{value!r}</v></c>')
+            else:
+                cells.append(_text_cell(ref, str(value)))
+        return f'<row r="{row_no}">{"".join(cells)}</row>'
+
+    def close(self):
+        """Дописывает служебные части книги и закрывает архив."""
+        if not self._sheets:
+            self.add_sheet("Лист1", [], ())
+        z = self._zip
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(self._sheets) + 1)
+        )
+        z.writestr('[Content_Types].xml', _CONTENT_TYPES_HEAD + overrides + '</Types>')
+        z.writestr('_rels/.rels', _ROOT_RELS)
+        sheets = "".join(
+            f'<sheet name="{escape(title, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, title in enumerate(self._sheets, 1)
+        )
+        z.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+        rels = "".join(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(self._sheets) + 1)
+        )
+        styles_id = len(self._sheets) + 1
+        z.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{rels}<Relationship Id="rId{styles_id}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>'
+        ))
+        z.writestr('xl/styles.xml', _STYLES)
+        z.close()